@@ -0,0 +1,260 @@
+"""
+Binary capture container for LiDAR frames and cone labels.
+
+One run is written into a single directory:
+
+    run_dir/
+        points.f32    raw float32 (x, y, z, intensity) rows of every frame, back to back
+        index.npy     one INDEX_DTYPE row per frame (frame id, timestamp, offsets, counts)
+        labels.npy    LABEL_DTYPE rows of every frame, back to back
+        meta.json     format version and totals
+
+`points.f32` is preallocated in chunks and trimmed on close, so frames are
+appended without per-frame file creation. All disk I/O happens on a
+background thread fed by a bounded queue; the simulation loop only hands
+over arrays.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+POINTS_FILE = "points.f32"
+INDEX_FILE = "index.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+
+POINT_DTYPE = np.float32
+POINT_COLUMNS = 4  # x, y, z, intensity
+
+INDEX_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("timestamp", np.float64),
+    ("point_offset", np.int64),   # row offset into points.f32
+    ("point_count", np.int64),
+    ("label_offset", np.int64),   # row offset into labels.npy
+    ("label_count", np.int64),
+])
+
+LABEL_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("actor_id", np.int32),
+    ("type_id", "S48"),
+    ("center_world", np.float64, (3,)),
+    ("extent", np.float32, (3,)),
+    ("rotation_world", np.float32, (3,)),  # pitch, yaw, roll
+])
+
+_STOP = object()
+
+
+class FrameBuffer(object):
+    """
+    Hands sensor frames from the CARLA callback thread to the main loop.
+    The main loop blocks on a condition variable instead of polling.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._cond = threading.Condition()
+
+    def put(self, frame, data):
+        with self._cond:
+            self._frames[frame] = data
+            self._cond.notify_all()
+
+    def pop(self, frame, timeout=5.0):
+        """Wait until `frame` arrived and return it, or None after `timeout` seconds"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: frame in self._frames, timeout):
+                return None
+            data = self._frames.pop(frame)
+            # Drop anything older; those frames will never be requested again
+            for stale in [f for f in self._frames if f < frame]:
+                del self._frames[stale]
+            return data
+
+
+class CaptureWriter(object):
+    """
+    Appends LiDAR frames and their labels to a run directory on a background thread.
+
+    Usage:
+        with CaptureWriter(run_dir) as writer:
+            writer.write(frame, timestamp, points, labels)
+        print(writer.stats())
+    """
+
+    def __init__(self, run_dir, queue_size=64, chunk_mb=64, expected_labels=64):
+        """
+        :param run_dir: directory that will hold the container, created if missing
+        :param queue_size: frames that may wait for the writer thread before write() blocks
+        :param chunk_mb: preallocation step of the point file in MiB
+        :param expected_labels: initial capacity of the in-memory label array
+        """
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+
+        self._chunk_bytes = max(1, int(chunk_mb)) * 1024 * 1024
+        self._row_bytes = POINT_COLUMNS * np.dtype(POINT_DTYPE).itemsize
+
+        self._points_file = open(self.run_dir / POINTS_FILE, "wb")
+        self._capacity = 0
+        self._used = 0
+
+        self._index = np.zeros(1024, dtype=INDEX_DTYPE)
+        self._labels = np.zeros(max(1, expected_labels), dtype=LABEL_DTYPE)
+        self._num_frames = 0
+        self._num_labels = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._t_start = None
+        self._t_end = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="CaptureWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, frame, timestamp, points, labels=None):
+        """
+        Queue one frame for writing. Blocks only if the writer thread is queue_size frames behind.
+
+        :param frame: simulator frame id
+        :param timestamp: simulation time in seconds
+        :param points: (N, 4) float32 array; it must not be modified after the call
+        :param labels: LABEL_DTYPE array for this frame or None
+        """
+        if self._error is not None:
+            raise RuntimeError("capture writer failed") from self._error
+        if self._closed:
+            raise RuntimeError("capture writer is closed")
+        if self._t_start is None:
+            self._t_start = time.perf_counter()
+        self._queue.put((frame, timestamp, points, labels))
+
+    def close(self):
+        """Flush all queued frames, write index, labels and metadata"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._t_end = time.perf_counter()
+
+        self._points_file.truncate(self._used)
+        self._points_file.close()
+
+        np.save(self.run_dir / INDEX_FILE, self._index[:self._num_frames])
+        np.save(self.run_dir / LABELS_FILE, self._labels[:self._num_labels])
+        meta = {
+            "version": FORMAT_VERSION,
+            "point_dtype": np.dtype(POINT_DTYPE).str,
+            "point_columns": POINT_COLUMNS,
+            "num_frames": int(self._num_frames),
+            "num_points": int(self._used // self._row_bytes),
+            "num_labels": int(self._num_labels),
+        }
+        (self.run_dir / META_FILE).write_text(json.dumps(meta, indent=2))
+
+        if self._error is not None:
+            raise RuntimeError("capture writer failed") from self._error
+
+    def stats(self):
+        """Sustained frames per second and bytes written since the first write()"""
+        end = self._t_end if self._t_end is not None else time.perf_counter()
+        elapsed = end - self._t_start if self._t_start is not None else 0.0
+        bytes_written = self._used + self._num_labels * LABEL_DTYPE.itemsize
+        return {
+            "frames": self._num_frames,
+            "seconds": elapsed,
+            "fps": self._num_frames / elapsed if elapsed > 0 else 0.0,
+            "bytes_written": bytes_written,
+            "mb_per_s": bytes_written / elapsed / 1e6 if elapsed > 0 else 0.0,
+        }
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                continue  # keep draining so write() never blocks forever
+            try:
+                self._append(*item)
+            except Exception as e:  # surfaced on the next write()/close()
+                self._error = e
+
+    def _reserve(self, nbytes):
+        needed = self._used + nbytes
+        if needed <= self._capacity:
+            return
+        grow = ((needed - self._capacity) // self._chunk_bytes + 1) * self._chunk_bytes
+        new_capacity = self._capacity + grow
+        fd = self._points_file.fileno()
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, self._capacity, grow)
+        else:
+            os.ftruncate(fd, new_capacity)
+        self._capacity = new_capacity
+
+    def _append(self, frame, timestamp, points, labels):
+        points = np.ascontiguousarray(points, dtype=POINT_DTYPE).reshape(-1, POINT_COLUMNS)
+        nbytes = points.nbytes
+        self._reserve(nbytes)
+        self._points_file.seek(self._used)
+        self._points_file.write(memoryview(points).cast("B"))
+
+        n_labels = 0 if labels is None else len(labels)
+        if self._num_labels + n_labels > len(self._labels):
+            self._labels = _grow(self._labels, self._num_labels + n_labels)
+        if n_labels:
+            self._labels[self._num_labels:self._num_labels + n_labels] = labels
+
+        if self._num_frames == len(self._index):
+            self._index = _grow(self._index, self._num_frames + 1)
+        self._index[self._num_frames] = (
+            frame, timestamp,
+            self._used // self._row_bytes, len(points),
+            self._num_labels, n_labels,
+        )
+
+        self._used += nbytes
+        self._num_labels += n_labels
+        self._num_frames += 1
+
+
+def _grow(arr, min_size):
+    new = np.zeros(max(min_size, 2 * len(arr)), dtype=arr.dtype)
+    new[:len(arr)] = arr
+    return new
+
+
+def make_labels(frame, actors):
+    """Build the LABEL_DTYPE rows for `actors` (cones) at `frame`"""
+    labels = np.zeros(len(actors), dtype=LABEL_DTYPE)
+    for k, actor in enumerate(actors):
+        bb = actor.bounding_box
+        tf = actor.get_transform()
+        # bb.location is relative to actor; transform to world
+        center_w = tf.transform(bb.location)
+        labels[k] = (
+            frame, actor.id, actor.type_id.encode(),
+            (center_w.x, center_w.y, center_w.z),
+            (bb.extent.x, bb.extent.y, bb.extent.z),
+            (tf.rotation.pitch, tf.rotation.yaw, tf.rotation.roll),
+        )
+    return labels
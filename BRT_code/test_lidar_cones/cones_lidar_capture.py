@@ -1,9 +1,10 @@
 import carla
 import time
-import json
 import numpy as np
 from pathlib import Path
 
+from capture_writer import CaptureWriter, FrameBuffer, make_labels
+
 HOST, PORT = "127.0.0.1", 2000
 OUT = Path("lidar_out")
 OUT.mkdir(exist_ok=True)
@@ -79,11 +80,11 @@ def main():
         lidar = world.spawn_actor(lidar_bp, lidar_tf, attach_to=vehicle)
         actors.append(lidar)
 
-        frame_buf = {}
+        frame_buf = FrameBuffer()
 
         def on_lidar(meas: carla.LidarMeasurement):
             pts = np.frombuffer(meas.raw_data, dtype=np.float32).reshape(-1, 4)
-            frame_buf[meas.frame] = pts
+            frame_buf.put(meas.frame, (meas.timestamp, pts))
 
         lidar.listen(on_lidar)
 
@@ -91,45 +92,28 @@ def main():
         for _ in range(20):
             world.tick()
 
+        run_dir = OUT / time.strftime("run_%Y%m%d_%H%M%S")
         N = 50
-        for _ in range(N):
-            frame = world.tick()
-
-            # Wait for matching LiDAR frame
-            t0 = time.time()
-            while frame not in frame_buf and time.time() - t0 < 5.0:
-                time.sleep(0.001)
-
-            pts = frame_buf.pop(frame, None)
-            if pts is None:
-                print("Missed LiDAR for frame", frame)
-                continue
-
-            np.save(OUT / f"lidar_{frame:06d}.npy", pts)
-
-            labels = []
-            for c in cones:
-                bb = c.bounding_box
-                # bb.location is relative to actor; transform to world
-                center_w = c.get_transform().transform(bb.location)
-                labels.append({
-                    "actor_id": c.id,
-                    "type_id": c.type_id,
-                    "center_world": [center_w.x, center_w.y, center_w.z],
-                    "extent": [bb.extent.x, bb.extent.y, bb.extent.z],
-                    "rotation_world": [
-                        c.get_transform().rotation.pitch,
-                        c.get_transform().rotation.yaw,
-                        c.get_transform().rotation.roll,
-                    ],
-                })
-
-            (OUT / f"labels_{frame:06d}.json").write_text(json.dumps(labels, indent=2))
-
-            if frame % 10 == 0:
-                print("Saved frame", frame, "points", pts.shape[0])
-
-        print("Done. Wrote to:", OUT.resolve())
+        with CaptureWriter(run_dir) as writer:
+            for _ in range(N):
+                frame = world.tick()
+
+                # Wait for matching LiDAR frame
+                item = frame_buf.pop(frame, timeout=5.0)
+                if item is None:
+                    print("Missed LiDAR for frame", frame)
+                    continue
+                timestamp, pts = item
+
+                writer.write(frame, timestamp, pts, make_labels(frame, cones))
+
+                if frame % 10 == 0:
+                    print("Queued frame", frame, "points", pts.shape[0])
+
+        stats = writer.stats()
+        print("Wrote {frames} frames, {bytes_written} bytes in {seconds:.2f}s "
+              "({fps:.1f} frames/s, {mb_per_s:.1f} MB/s)".format(**stats))
+        print("Done. Wrote to:", run_dir.resolve())
 
     finally:
         # Cleanup
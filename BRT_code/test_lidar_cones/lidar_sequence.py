@@ -0,0 +1,114 @@
+"""
+Random-access reader for runs written by capture_writer.CaptureWriter.
+
+The point file is memory-mapped once; every frame is a zero-copy view
+into it. A LidarSequence can be used directly as a PyTorch-style map
+dataset (len + getitem) without opening one file per frame.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from capture_writer import (
+    FORMAT_VERSION, INDEX_FILE, LABELS_FILE, META_FILE, POINTS_FILE,
+    POINT_COLUMNS, POINT_DTYPE,
+)
+
+
+class LidarSequence(object):
+    """
+    Sequence of (points, labels) frames of one capture run.
+
+    seq[i]                  -> (points view (N, 4) float32, labels LABEL_DTYPE array)
+    seq[i:j]                -> LidarSequence over frames i..j-1
+    seq.time_slice(t0, t1)  -> LidarSequence over frames with t0 <= timestamp < t1
+    seq.by_frame(frame_id)  -> item of the simulator frame `frame_id`
+    """
+
+    def __init__(self, run_dir, _rows=None):
+        self.run_dir = Path(run_dir)
+        meta_path = self.run_dir / META_FILE
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("version") != FORMAT_VERSION:
+                raise ValueError("unsupported capture format version %r in %s"
+                                 % (meta.get("version"), self.run_dir))
+        self._index_all = np.load(self.run_dir / INDEX_FILE)
+        self._labels_all = np.load(self.run_dir / LABELS_FILE, mmap_mode="r")
+        self._rows = np.arange(len(self._index_all)) if _rows is None else _rows
+        self._points = None
+
+    # Memory maps are not shared with DataLoader workers, each process maps lazily
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_points"] = None
+        state["_labels_all"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._labels_all = np.load(self.run_dir / LABELS_FILE, mmap_mode="r")
+
+    @property
+    def points(self):
+        """Memory map over every point of the run, shape (total_points, 4)"""
+        if self._points is None:
+            path = self.run_dir / POINTS_FILE
+            if path.stat().st_size == 0:
+                self._points = np.zeros((0, POINT_COLUMNS), dtype=POINT_DTYPE)
+            else:
+                self._points = np.memmap(path, dtype=POINT_DTYPE, mode="r").reshape(-1, POINT_COLUMNS)
+        return self._points
+
+    @property
+    def index(self):
+        """INDEX_DTYPE rows of the frames in this sequence"""
+        return self._index_all[self._rows]
+
+    @property
+    def frames(self):
+        return self.index["frame"]
+
+    @property
+    def timestamps(self):
+        return self.index["timestamp"]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._subset(self._rows[item])
+        row = self._index_all[self._rows[item]]
+        p0, pn = int(row["point_offset"]), int(row["point_count"])
+        l0, ln = int(row["label_offset"]), int(row["label_count"])
+        return self.points[p0:p0 + pn], self._labels_all[l0:l0 + ln]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def by_frame(self, frame_id):
+        """Item of simulator frame `frame_id`, KeyError if it was not captured"""
+        pos = np.flatnonzero(self.frames == frame_id)
+        if len(pos) == 0:
+            raise KeyError(frame_id)
+        return self[int(pos[0])]
+
+    def time_slice(self, t_start=None, t_end=None):
+        """Frames with t_start <= timestamp < t_end, either bound may be None"""
+        ts = self.timestamps
+        mask = np.ones(len(ts), dtype=bool)
+        if t_start is not None:
+            mask &= ts >= t_start
+        if t_end is not None:
+            mask &= ts < t_end
+        return self._subset(self._rows[mask])
+
+    def _subset(self, rows):
+        sub = object.__new__(LidarSequence)
+        sub.__dict__.update(self.__dict__)
+        sub._rows = rows
+        return sub
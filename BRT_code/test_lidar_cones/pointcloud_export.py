@@ -0,0 +1,128 @@
+"""
+Shared PLY / PCD writers for captured LiDAR clouds.
+
+Binary output is written straight from the float32 array's buffer, no
+per-point Python code. ASCII output is kept for tools that need it.
+
+Command line:
+    python pointcloud_export.py ply lidar_out/npy_out lidar_out/ply_out
+    python pointcloud_export.py pcd lidar_out/npy_out lidar_out/pcd_out --ascii
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+FORMATS = ("ply", "pcd")
+FIELDS = ("x", "y", "z", "intensity")
+
+
+def _as_cloud(pts):
+    """Return a C-contiguous little-endian float32 (N, 4) array; Nx3 gets zero intensity"""
+    pts = np.asarray(pts)
+    if pts.ndim != 2 or pts.shape[1] not in (3, 4):
+        raise ValueError("expected an Nx3 or Nx4 point array, got shape %s" % (pts.shape,))
+    if pts.shape[1] == 3:
+        pts = np.hstack([pts, np.zeros((len(pts), 1), dtype=pts.dtype)])
+    return np.ascontiguousarray(pts, dtype="<f4")
+
+
+def _ply_header(n, binary):
+    fmt = "binary_little_endian" if binary else "ascii"
+    lines = ["ply", "format %s 1.0" % fmt, "element vertex %d" % n]
+    lines += ["property float %s" % f for f in FIELDS]
+    lines.append("end_header")
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def _pcd_header(n, binary):
+    lines = [
+        "# .PCD v0.7 - Point Cloud Data file format",
+        "VERSION 0.7",
+        "FIELDS " + " ".join(FIELDS),
+        "SIZE 4 4 4 4",
+        "TYPE F F F F",
+        "COUNT 1 1 1 1",
+        "WIDTH %d" % n,
+        "HEIGHT 1",
+        "VIEWPOINT 0 0 0 1 0 0 0",
+        "POINTS %d" % n,
+        "DATA %s" % ("binary" if binary else "ascii"),
+    ]
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+_HEADERS = {"ply": _ply_header, "pcd": _pcd_header}
+
+
+def write_cloud(path, pts, fmt="ply", binary=True):
+    """
+    Write an Nx4 (or Nx3) cloud as PLY or PCD.
+
+    :param path: output file
+    :param pts: point array, x/y/z/intensity columns
+    :param fmt: "ply" or "pcd"
+    :param binary: binary (little endian float32) body, ASCII otherwise
+    :return: number of bytes written
+    """
+    if fmt not in FORMATS:
+        raise ValueError("unknown format %r, expected one of %s" % (fmt, FORMATS))
+    cloud = _as_cloud(pts)
+    with open(path, "wb") as f:
+        f.write(_HEADERS[fmt](len(cloud), binary))
+        if binary:
+            f.write(memoryview(cloud).cast("B"))
+        else:
+            np.savetxt(f, cloud, fmt="%.9g")
+        return f.tell()
+
+
+def _convert_one(args):
+    src, dst, fmt, binary = args
+    return write_cloud(dst, np.load(src, mmap_mode="r"), fmt, binary)
+
+
+def convert_directory(in_dir, out_dir, fmt="ply", binary=True, workers=None, pattern="*.npy"):
+    """
+    Convert every `pattern` file of `in_dir` into `out_dir` using a process pool.
+
+    :param workers: pool size, defaults to os.cpu_count(); 1 converts in-process
+    :return: list of written output paths
+    """
+    in_dir, out_dir = Path(in_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(src, out_dir / (src.stem + "." + fmt), fmt, binary)
+            for src in sorted(in_dir.glob(pattern))]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            _convert_one(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # chunksize keeps IPC overhead low for thousands of small frames
+            list(pool.map(_convert_one, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    return [job[1] for job in jobs]
+
+
+def main(argv=None, fmt=None, in_dir=None, out_dir=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    if fmt is None:
+        parser.add_argument("format", choices=FORMATS)
+    parser.add_argument("in_dir", nargs="?" if in_dir else None, default=in_dir)
+    parser.add_argument("out_dir", nargs="?" if out_dir else None, default=out_dir)
+    parser.add_argument("--ascii", action="store_true", help="write ASCII instead of binary")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    written = convert_directory(args.in_dir, args.out_dir, fmt or args.format,
+                                binary=not args.ascii, workers=args.workers)
+    print("Wrote", len(written), "files to", args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,67 @@
 import sys
+from pathlib import Path
+
 import numpy as np
 import open3d as o3d
 
-path = sys.argv[1] if len(sys.argv) > 1 else "lidar_out/lidar_000000.npy"
-pts = np.load(path)  # Nx4
+from lidar_sequence import LidarSequence
+
+
+def intensity_colors(intensity):
+    # color by intensity (normalized grayscale)
+    i = intensity.astype(np.float64)
+    i = (i - i.min()) / (i.max() - i.min() + 1e-9) if len(i) else i
+    return np.stack([i, i, i], axis=1)
+
+
+def show_file(path):
+    pts = np.load(path)  # Nx4
+
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(pts[:, :3].astype(np.float64))
+    pcd.colors = o3d.utility.Vector3dVector(intensity_colors(pts[:, 3]))
+
+    o3d.visualization.draw_geometries([pcd])
+
+
+def show_sequence(run_dir):
+    # N / P (or right / left arrow) step through the frames, the cloud is updated in place
+    seq = LidarSequence(run_dir)
+    if len(seq) == 0:
+        print("No frames in", run_dir)
+        return
+
+    pcd = o3d.geometry.PointCloud()
+    state = {"i": 0}
+
+    def load(i):
+        pts, labels = seq[i]
+        pcd.points = o3d.utility.Vector3dVector(np.ascontiguousarray(pts[:, :3], dtype=np.float64))
+        pcd.colors = o3d.utility.Vector3dVector(intensity_colors(pts[:, 3]))
+        print("frame %d (%d/%d) t=%.3f points=%d cones=%d"
+              % (seq.frames[i], i + 1, len(seq), seq.timestamps[i], len(pts), len(labels)))
 
-xyz = pts[:, :3]
-intensity = pts[:, 3]
+    def step(delta):
+        def cb(vis):
+            state["i"] = (state["i"] + delta) % len(seq)
+            load(state["i"])
+            vis.update_geometry(pcd)
+            return False
+        return cb
 
-pcd = o3d.geometry.PointCloud()
-pcd.points = o3d.utility.Vector3dVector(xyz.astype(np.float64))
+    load(0)
+    vis = o3d.visualization.VisualizerWithKeyCallback()
+    vis.create_window(window_name=str(run_dir))
+    vis.add_geometry(pcd)
+    for key, delta in ((ord("N"), 1), (262, 1), (ord("P"), -1), (263, -1)):
+        vis.register_key_callback(key, step(delta))
+    vis.run()
+    vis.destroy_window()
 
-# color by intensity (normalized grayscale)
-i = intensity.astype(np.float64)
-i = (i - i.min()) / (i.max() - i.min() + 1e-9)
-colors = np.stack([i, i, i], axis=1)
-pcd.colors = o3d.utility.Vector3dVector(colors)
 
-o3d.visualization.draw_geometries([pcd])
+if __name__ == "__main__":
+    path = Path(sys.argv[1] if len(sys.argv) > 1 else "lidar_out/lidar_000000.npy")
+    if path.is_dir():
+        show_sequence(path)
+    else:
+        show_file(path)
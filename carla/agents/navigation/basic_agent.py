@@ -9,13 +9,15 @@ waypoints and avoiding other vehicles. The agent also responds to traffic lights
 It can also make use of the global route planner to follow a specified route
 """
 
+import math
+
 import carla
 from shapely.geometry import Polygon
 
 from agents.navigation.local_planner import LocalPlanner, RoadOption
 from agents.navigation.global_route_planner import GlobalRoutePlanner
-from agents.tools.misc import (get_speed, is_within_distance,
-                               get_trafficlight_trigger_location)
+from agents.navigation.world_state import TrafficLightIndex, WorldState
+from agents.tools.misc import is_within_distance
 
 from agents.tools.hints import ObstacleDetectionResult, TrafficLightDetectionResult
 
@@ -28,7 +30,7 @@ class BasicAgent:
     as well as to change its parameters in case a different driving mode is desired.
     """
 
-    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None):
+    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None, world_state=None):
         """
         Initialization the agent parameters, the local and the global planner.
 
@@ -38,6 +40,7 @@ class BasicAgent:
                 This also applies to parameters related to the LocalPlanner.
             :param map_inst: carla.Map instance to avoid the expensive call of getting it.
             :param grp_inst: GlobalRoutePlanner instance to avoid the expensive call of getting it.
+            :param world_state: WorldState instance, share one between agents of the same world.
 
         """
         self._vehicle = vehicle
@@ -51,6 +54,14 @@ class BasicAgent:
         else:
             self._map = self._world.get_map()
         self._last_traffic_light = None
+        if world_state:
+            if isinstance(world_state, WorldState):
+                self._world_state = world_state
+            else:
+                print("Warning: Ignoring the given world state as it is not a 'WorldState'")
+                self._world_state = WorldState(self._world)
+        else:
+            self._world_state = WorldState(self._world)
 
         # Base parameters
         self._ignore_traffic_lights = False
@@ -64,6 +75,7 @@ class BasicAgent:
         self._speed_ratio = 1
         self._max_brake = 0.5
         self._offset = 0
+        self._grp_cache_dir = None
 
         # Change parameters according to the dictionary
         opt_dict['target_speed'] = target_speed
@@ -87,6 +99,8 @@ class BasicAgent:
             self._max_brake = opt_dict['max_brake']
         if 'offset' in opt_dict:
             self._offset = opt_dict['offset']
+        if 'grp_cache_dir' in opt_dict:
+            self._grp_cache_dir = opt_dict['grp_cache_dir']
 
         # Initialize the planners
         self._local_planner = LocalPlanner(self._vehicle, opt_dict=opt_dict, map_inst=self._map)
@@ -95,13 +109,15 @@ class BasicAgent:
                 self._global_planner = grp_inst
             else:
                 print("Warning: Ignoring the given map as it is not a 'carla.Map'")
-                self._global_planner = GlobalRoutePlanner(self._map, self._sampling_resolution)
+                self._global_planner = GlobalRoutePlanner(
+                    self._map, self._sampling_resolution, cache_dir=self._grp_cache_dir)
         else:
-            self._global_planner = GlobalRoutePlanner(self._map, self._sampling_resolution)
+            self._global_planner = GlobalRoutePlanner(
+                self._map, self._sampling_resolution, cache_dir=self._grp_cache_dir)
 
         # Get the static elements of the scene
-        self._lights_list = self._world.get_actors().filter("*traffic_light*")
-        self._lights_map = {}  # Dictionary mapping a traffic light to a wp corresponding to its trigger volume location
+        self._world_state.update()
+        self._custom_lights_index = None  # type: tuple[frozenset[int], TrafficLightIndex] | None
 
     def add_emergency_stop(self, control):
         """
@@ -199,9 +215,10 @@ class BasicAgent:
         hazard_detected = False
 
         # Retrieve all relevant actors
-        vehicle_list = self._world.get_actors().filter("*vehicle*")
+        self._world_state.update()
+        vehicle_list = self._world_state.vehicles
 
-        vehicle_speed = get_speed(self._vehicle) / 3.6
+        vehicle_speed = self._world_state.get_speed(self._vehicle) / 3.6
 
         # Check for possible vehicle obstacles
         max_vehicle_distance = self._base_vehicle_threshold + self._speed_ratio * vehicle_speed
@@ -211,7 +228,7 @@ class BasicAgent:
 
         # Check if the vehicle is affected by a red traffic light
         max_tlight_distance = self._base_tlight_threshold + self._speed_ratio * vehicle_speed
-        affected_by_tlight, _ = self._affected_by_traffic_light(self._lights_list, max_tlight_distance)
+        affected_by_tlight, _ = self._affected_by_traffic_light(self._world_state.traffic_lights, max_tlight_distance)
         if affected_by_tlight:
             hazard_detected = True
 
@@ -276,7 +293,8 @@ class BasicAgent:
             return TrafficLightDetectionResult(False, None)
 
         if not lights_list:
-            lights_list = self._world.get_actors().filter("*traffic_light*")
+            self._world_state.update()
+            lights_list = self._world_state.traffic_lights
 
         if not max_distance:
             max_distance = self._base_tlight_threshold
@@ -287,26 +305,33 @@ class BasicAgent:
             else:
                 return TrafficLightDetectionResult(True, self._last_traffic_light)
 
-        ego_vehicle_location = self._vehicle.get_location()
-        ego_vehicle_waypoint = self._map.get_waypoint(ego_vehicle_location)
+        # Map level index of the trigger waypoints, shared through the world state
+        lights_index = self._world_state.get_traffic_light_index(self._map)
+        if lights_list is self._world_state.traffic_lights:
+            lights_ids = None
+        else:
+            lights_ids = set(traffic_light.id for traffic_light in lights_list)
+            if not lights_ids.issubset(lights_index.trigger_waypoints):
+                # Lights unknown to the world state, index the given list instead
+                lights_index = self._get_custom_lights_index(lights_list, lights_ids)
 
-        for traffic_light in lights_list:
-            if traffic_light.id in self._lights_map:
-                trigger_wp = self._lights_map[traffic_light.id]
-            else:
-                trigger_location = get_trafficlight_trigger_location(traffic_light)
-                trigger_wp = self._map.get_waypoint(trigger_location)
-                self._lights_map[traffic_light.id] = trigger_wp
+        ego_vehicle_location = self._world_state.get_location(self._vehicle)
+        if not lights_index.any_within(ego_vehicle_location, max_distance):
+            return TrafficLightDetectionResult(False, None)
+        ego_vehicle_waypoint = self._map.get_waypoint(ego_vehicle_location)
+        ve_dir = ego_vehicle_waypoint.transform.get_forward_vector()
 
-            if trigger_wp.transform.location.distance(ego_vehicle_location) > max_distance:
+        # Only the lights of the ego road can affect it
+        for traffic_light, trigger_wp, trigger_xyz, wp_dir in lights_index.on_road(ego_vehicle_waypoint.road_id):
+            if lights_ids is not None and traffic_light.id not in lights_ids:
                 continue
 
-            if trigger_wp.road_id != ego_vehicle_waypoint.road_id:
+            if math.sqrt((trigger_xyz[0] - ego_vehicle_location.x) ** 2
+                         + (trigger_xyz[1] - ego_vehicle_location.y) ** 2
+                         + (trigger_xyz[2] - ego_vehicle_location.z) ** 2) > max_distance:
                 continue
 
-            ve_dir = ego_vehicle_waypoint.transform.get_forward_vector()
-            wp_dir = trigger_wp.transform.get_forward_vector()
-            dot_ve_wp = ve_dir.x * wp_dir.x + ve_dir.y * wp_dir.y + ve_dir.z * wp_dir.z
+            dot_ve_wp = ve_dir.x * wp_dir[0] + ve_dir.y * wp_dir[1] + ve_dir.z * wp_dir[2]
 
             if dot_ve_wp < 0:
                 continue
@@ -314,12 +339,22 @@ class BasicAgent:
             if traffic_light.state != carla.TrafficLightState.Red:
                 continue
 
-            if is_within_distance(trigger_wp.transform, self._vehicle.get_transform(), max_distance, [0, 90]):
+            if is_within_distance(trigger_wp.transform, self._world_state.get_transform(self._vehicle), max_distance, [0, 90]):
                 self._last_traffic_light = traffic_light
                 return TrafficLightDetectionResult(True, traffic_light)
 
         return TrafficLightDetectionResult(False, None)
 
+    def _get_custom_lights_index(self, lights_list, lights_ids):
+        # type: (list[carla.TrafficLight], set[int]) -> TrafficLightIndex
+        """
+        Returns the TrafficLightIndex of the given lights, kept until another list is given
+        """
+        key = frozenset(lights_ids)
+        if self._custom_lights_index is None or self._custom_lights_index[0] != key:
+            self._custom_lights_index = (key, TrafficLightIndex(self._map, lights_list))
+        return self._custom_lights_index[1]
+
     def _vehicle_obstacle_detected(self, vehicle_list=None, max_distance=None, up_angle_th=90, low_angle_th=0, lane_offset=0):
         """
         Method to check if there is a vehicle in front of the agent blocking its path.
@@ -357,15 +392,16 @@ class BasicAgent:
         if self._ignore_vehicles:
             return ObstacleDetectionResult(False, None, -1)
 
+        self._world_state.update()
         if vehicle_list is None:
-            vehicle_list = self._world.get_actors().filter("*vehicle*")
+            vehicle_list = self._world_state.vehicles
         if len(vehicle_list) == 0:
             return ObstacleDetectionResult(False, None, -1)
 
         if not max_distance:
             max_distance = self._base_vehicle_threshold
 
-        ego_transform = self._vehicle.get_transform()
+        ego_transform = self._world_state.get_transform(self._vehicle)
         ego_location = ego_transform.location
         ego_wpt = self._map.get_waypoint(ego_location)
 
@@ -384,13 +420,12 @@ class BasicAgent:
         # Get the route bounding box
         route_polygon = get_route_polygon()
 
-        for target_vehicle in vehicle_list:
+        # Only the vehicles within max_distance, found with one query on the world state
+        for target_vehicle in self._world_state.actors_within(vehicle_list, ego_location, max_distance):
             if target_vehicle.id == self._vehicle.id:
                 continue
 
-            target_transform = target_vehicle.get_transform()
-            if target_transform.location.distance(ego_location) > max_distance:
-                continue
+            target_transform = self._world_state.get_transform(target_vehicle)
 
             target_wpt = self._map.get_waypoint(target_transform.location, lane_type=carla.LaneType.Any)
 
@@ -398,12 +433,12 @@ class BasicAgent:
             if (use_bbs or target_wpt.is_junction) and route_polygon:
 
                 target_bb = target_vehicle.bounding_box
-                target_vertices = target_bb.get_world_vertices(target_vehicle.get_transform())
+                target_vertices = target_bb.get_world_vertices(target_transform)
                 target_list = [[v.x, v.y, v.z] for v in target_vertices]
                 target_polygon = Polygon(target_list)
 
                 if route_polygon.intersects(target_polygon):
-                    return ObstacleDetectionResult(True, target_vehicle, target_vehicle.get_location().distance(ego_location))
+                    return ObstacleDetectionResult(True, target_vehicle, target_transform.location.distance(ego_location))
 
             # Simplified approach, using only the plan waypoints (similar to TM)
             else:
@@ -21,7 +21,7 @@ class ConstantVelocityAgent(BasicAgent):
     wait for a bit, and then start again.
     """
 
-    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None):
+    def __init__(self, vehicle, target_speed=20, opt_dict={}, map_inst=None, grp_inst=None, world_state=None):
         """
         Initialization the agent parameters, the local and the global planner.
 
@@ -31,8 +31,10 @@ class ConstantVelocityAgent(BasicAgent):
                 This also applies to parameters related to the LocalPlanner.
             :param map_inst: carla.Map instance to avoid the expensive call of getting it.
             :param grp_inst: GlobalRoutePlanner instance to avoid the expensive call of getting it.
+            :param world_state: WorldState instance, share one between agents of the same world.
         """
-        super().__init__(vehicle, target_speed, opt_dict=opt_dict, map_inst=map_inst, grp_inst=grp_inst)
+        super().__init__(vehicle, target_speed, opt_dict=opt_dict, map_inst=map_inst, grp_inst=grp_inst,
+                         world_state=world_state)
 
         self._use_basic_behavior = False  # Whether or not to use the BasicAgent behavior when the constant velocity is down
         self._target_speed = target_speed / 3.6  # [m/s]
@@ -85,20 +87,20 @@ class ConstantVelocityAgent(BasicAgent):
         hazard_detected = False
 
         # Retrieve all relevant actors
-        actor_list = self._world.get_actors()
-        vehicle_list = actor_list.filter("*vehicle*")
-        lights_list = actor_list.filter("*traffic_light*")
+        self._world_state.update()
+        vehicle_list = self._world_state.vehicles
+        lights_list = self._world_state.traffic_lights
 
-        vehicle_speed = self._vehicle.get_velocity().length()
+        vehicle_speed = self._world_state.get_velocity(self._vehicle).length()
 
         max_vehicle_distance = self._base_vehicle_threshold + vehicle_speed
         affected_by_vehicle, adversary, _ = self._vehicle_obstacle_detected(vehicle_list, max_vehicle_distance)
         if affected_by_vehicle:
-            vehicle_velocity = self._vehicle.get_velocity()
+            vehicle_velocity = self._world_state.get_velocity(self._vehicle)
             if vehicle_velocity.length() == 0:
                 hazard_speed = 0
             else:
-                hazard_speed = vehicle_velocity.dot(adversary.get_velocity()) / vehicle_velocity.length()
+                hazard_speed = vehicle_velocity.dot(self._world_state.get_velocity(adversary)) / vehicle_velocity.length()
             hazard_detected = True
 
         # Check if the vehicle is affected by a red traffic light
@@ -264,3 +264,181 @@ class PIDLateralController:
         self._k_i = K_I
         self._k_d = K_D
         self._dt = dt
+
+
+class BatchedPIDController:
+    """
+    BatchedPIDController runs the lateral and longitudinal PID controllers of
+    VehiclePIDController for N vehicles at once. Gains, error buffers and the
+    previous steering of all vehicles live in contiguous arrays and one call
+    to run_step computes throttle, brake and steer for the whole fleet.
+    """
+
+    def __init__(self, vehicles, args_lateral, args_longitudinal, offset=0, max_throttle=0.75, max_brake=0.3,
+                 max_steering=0.8, buffer_size=10, world_state=None):
+        """
+        Constructor method.
+
+        :param vehicles: list of the N vehicles to control
+        :param args_lateral: dictionary with K_P, K_I, K_D and dt of the lateral PID,
+            each a scalar or a sequence of N per-vehicle values
+        :param args_longitudinal: same for the longitudinal PID
+        :param offset: lateral offset from the center line, scalar or N values (see VehiclePIDController)
+        :param max_throttle: maximum throttle, scalar or N values
+        :param max_brake: maximum brake, scalar or N values
+        :param max_steering: maximum steering, scalar or N values
+        :param buffer_size: length of the error buffers used by the integral term
+        :param world_state: optional WorldState to read the vehicle states from
+        """
+        self._vehicles = list(vehicles)
+        self._ids = [vehicle.id for vehicle in self._vehicles]
+        self._world_state = world_state
+        n = len(self._vehicles)
+
+        self.max_throt = self._per_vehicle(max_throttle)
+        self.max_brake = self._per_vehicle(max_brake)
+        self.max_steer = self._per_vehicle(max_steering)
+        self.offset = self._per_vehicle(offset)
+        self.past_steering = np.array([vehicle.get_control().steer for vehicle in self._vehicles], dtype=np.float64)
+
+        self._lon_gains = self._gains(args_longitudinal)
+        self._lat_gains = self._gains(args_lateral)
+
+        # Ring buffers shared by all the vehicles, _count tracks the filling of each row
+        self._lon_buffer = np.zeros((n, buffer_size))
+        self._lat_buffer = np.zeros((n, buffer_size))
+        self._count = np.zeros(n, dtype=np.int64)
+        self._head = 0
+
+    def __len__(self):
+        return len(self._vehicles)
+
+    def _per_vehicle(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (len(self._vehicles),)).copy()
+
+    def _gains(self, args):
+        return {key: self._per_vehicle(args.get(key, default))
+                for key, default in (('K_P', 1.0), ('K_I', 0.0), ('K_D', 0.0), ('dt', 0.03))}
+
+    def change_longitudinal_PID(self, args_longitudinal):
+        """Changes the parameters of the longitudinal controllers"""
+        self._lon_gains = self._gains(args_longitudinal)
+
+    def change_lateral_PID(self, args_lateral):
+        """Changes the parameters of the lateral controllers"""
+        self._lat_gains = self._gains(args_lateral)
+
+    def set_offset(self, offset):
+        """Changes the offset, scalar or N values"""
+        self.offset = self._per_vehicle(offset)
+
+    def reset(self, indices=None):
+        """Clears the error buffers of the given vehicles, all of them if None"""
+        if indices is None:
+            indices = slice(None)
+        self._lon_buffer[indices] = 0.0
+        self._lat_buffer[indices] = 0.0
+        self._count[indices] = 0
+
+    def _vehicle_states(self):
+        """Speeds in Km/h, (N, 2) locations and forward vectors of the vehicles"""
+        n = len(self._vehicles)
+        speeds = np.empty(n)
+        locations = np.empty((n, 2))
+        pitch_yaw = np.empty((n, 2))
+        world_state = self._world_state
+        for i, vehicle in enumerate(self._vehicles):
+            row = world_state.row(vehicle) if world_state is not None else None
+            if row is not None:
+                speeds[i] = np.linalg.norm(world_state.velocities[row])
+                locations[i] = world_state.locations[row, :2]
+                pitch_yaw[i] = world_state.rotations[row, :2]
+            else:
+                vel = vehicle.get_velocity()
+                transform = vehicle.get_transform()
+                speeds[i] = math.sqrt(vel.x ** 2 + vel.y ** 2 + vel.z ** 2)
+                locations[i] = (transform.location.x, transform.location.y)
+                pitch_yaw[i] = (transform.rotation.pitch, transform.rotation.yaw)
+        pitch, yaw = np.radians(pitch_yaw[:, 0]), np.radians(pitch_yaw[:, 1])
+        forward = np.stack((np.cos(pitch) * np.cos(yaw), np.cos(pitch) * np.sin(yaw)), axis=1)
+        return 3.6 * speeds, locations, forward
+
+    def _push(self, buffer, errors, gains):
+        """Appends the errors to a ring buffer and returns the PID output, as PID*Controller._pid_control"""
+        buffer[:, self._head] = errors
+        filled = self._count + 1 >= 2
+        previous = buffer[:, self._head - 1]
+        _de = np.where(filled, (errors - previous) / gains['dt'], 0.0)
+        _ie = np.where(filled, buffer.sum(axis=1) * gains['dt'], 0.0)
+        return np.clip(gains['K_P'] * errors + gains['K_D'] * _de + gains['K_I'] * _ie, -1.0, 1.0)
+
+    def run_step(self, target_speeds, target_locations, target_yaws=None):
+        """
+        Execute one step of control for all the vehicles.
+
+            :param target_speeds: desired speeds in Km/h, scalar or N values
+            :param target_locations: (N, 2) or (N, 3) array with the target waypoint locations
+            :param target_yaws: yaw in degrees of the target waypoints, needed when an offset is set
+            :return: throttle, brake and steer arrays of N values
+        """
+        target_speeds = self._per_vehicle(target_speeds)
+        targets = np.asarray(target_locations, dtype=np.float64)[:, :2]
+        if np.any(self.offset != 0):
+            if target_yaws is None:
+                raise ValueError("target_yaws are needed to apply a lateral offset")
+            # Displace the targets along their right vector
+            yaw = np.radians(np.asarray(target_yaws, dtype=np.float64))
+            targets = targets + self.offset[:, None] * np.stack((-np.sin(yaw), np.cos(yaw)), axis=1)
+
+        speeds, locations, v_vec = self._vehicle_states()
+
+        # Longitudinal
+        acceleration = self._push(self._lon_buffer, target_speeds - speeds, self._lon_gains)
+
+        # Lateral
+        w_vec = targets - locations
+        wv_linalg = np.linalg.norm(w_vec, axis=1) * np.linalg.norm(v_vec, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos_angle = np.clip(np.einsum('ij,ij->i', w_vec, v_vec) / wv_linalg, -1.0, 1.0)
+        _dot = np.where(wv_linalg == 0, 1.0, np.arccos(np.where(wv_linalg == 0, 1.0, cos_angle)))
+        _cross = v_vec[:, 0] * w_vec[:, 1] - v_vec[:, 1] * w_vec[:, 0]
+        _dot = np.where(_cross < 0, -_dot, _dot)
+        current_steering = self._push(self._lat_buffer, _dot, self._lat_gains)
+
+        self._head = (self._head + 1) % self._lon_buffer.shape[1]
+        self._count += 1
+
+        throttle = np.where(acceleration >= 0.0, np.minimum(acceleration, self.max_throt), 0.0)
+        brake = np.where(acceleration >= 0.0, 0.0, np.minimum(np.abs(acceleration), self.max_brake))
+
+        # Steering regulation: changes cannot happen abruptly, can't steer too much.
+        current_steering = np.clip(current_steering, self.past_steering - 0.1, self.past_steering + 0.1)
+        steering = np.clip(current_steering, -self.max_steer, self.max_steer)
+        self.past_steering = steering
+
+        return throttle, brake, steering
+
+    def run_step_commands(self, target_speeds, target_locations, target_yaws=None):
+        """
+        Same as run_step, but returns a list of carla.command.ApplyVehicleControl
+        ready for client.apply_batch
+        """
+        throttle, brake, steering = self.run_step(target_speeds, target_locations, target_yaws)
+        return [
+            carla.command.ApplyVehicleControl(actor_id, carla.VehicleControl(
+                throttle=float(t), steer=float(s), brake=float(b), hand_brake=False, manual_gear_shift=False))
+            for actor_id, t, b, s in zip(self._ids, throttle, brake, steering)]
+
+    @staticmethod
+    def waypoint_targets(waypoints):
+        """
+        Converts a list of target waypoints into the target_locations and
+        target_yaws arguments of run_step
+        """
+        locations = np.empty((len(waypoints), 3))
+        yaws = np.empty(len(waypoints))
+        for i, waypoint in enumerate(waypoints):
+            transform = waypoint.transform
+            locations[i] = (transform.location.x, transform.location.y, transform.location.z)
+            yaws[i] = transform.rotation.yaw
+        return locations, yaws
@@ -8,12 +8,19 @@
 This module provides GlobalRoutePlanner implementation.
 """
 
+import hashlib
+import glob
 import math
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import networkx as nx
 
 import carla
 from agents.navigation.local_planner import RoadOption
+from agents.tools.spatial import GridIndex, closest_index, locations_to_array
 
 # Python 2 compatibility
 TYPE_CHECKING = False
@@ -40,6 +47,7 @@ if TYPE_CHECKING:
         {
             'length': int,
             'path': list[carla.Waypoint],
+            'path_xyz': np.ndarray,
             'entry_waypoint': carla.Waypoint,
             'exit_waypoint': carla.Waypoint,
             'entry_vector': np.ndarray,
@@ -50,28 +58,154 @@ if TYPE_CHECKING:
             'change_waypoint': NotRequired[carla.Waypoint]
         })
 
+# Bump when the layout of the cached graph changes
+_CACHE_VERSION = 1
+
+_WAYPOINT_KEYS = ('entry_waypoint', 'exit_waypoint', 'change_waypoint')
+
+
+class _WaypointResolver(object):
+    """
+    Turns cached waypoint references (road_id, section_id, lane_id, s, x, y, z)
+    back into carla.Waypoint objects, asking the server only once per reference.
+    """
+
+    def __init__(self, wmap):
+        self._wmap = wmap
+        self._waypoints = {}
+
+    def resolve(self, ref):
+        waypoint = self._waypoints.get(ref)
+        if waypoint is None:
+            road_id, _, lane_id, s, x, y, z = ref
+            waypoint = self._wmap.get_waypoint_xodr(road_id, lane_id, s)
+            if waypoint is None:
+                waypoint = self._wmap.get_waypoint(carla.Location(x=x, y=y, z=z))
+            self._waypoints[ref] = waypoint
+        return waypoint
+
+
+class _LazyWaypoint(object):
+    __slots__ = ('resolver', 'ref')
+
+    def __init__(self, resolver, ref):
+        self.resolver = resolver
+        self.ref = ref
+
+
+class _LazyPath(object):
+    __slots__ = ('resolver', 'refs')
+
+    def __init__(self, resolver, refs):
+        self.resolver = resolver
+        self.refs = refs
+
+
+class _LazyEdgeDict(dict):
+    """
+    Edge attribute dictionary that rehydrates cached waypoints on first access,
+    so loading a cached graph does not touch the server.
+    """
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, _LazyWaypoint):
+            value = value.resolver.resolve(value.ref)
+            dict.__setitem__(self, key, value)
+        elif isinstance(value, _LazyPath):
+            value = [value.resolver.resolve(ref) for ref in value.refs]
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+
+class _LazyDiGraph(nx.DiGraph):
+    edge_attr_dict_factory = _LazyEdgeDict
+
+
+# Routing graph of a worker process, set once by _init_routing_worker
+_WORKER_GRAPH = None  # type: nx.DiGraph | None
+
+
+def _init_routing_worker(graph):
+    # type: (nx.DiGraph) -> None
+    global _WORKER_GRAPH  # pylint: disable=global-statement
+    _WORKER_GRAPH = graph
+
+
+def _shortest_path_tree(job, graph=None):
+    # type: (tuple[int, list[int]], nx.DiGraph | None) -> dict[int, list[int]]
+    """
+    Returns the shortest node paths from one source to all the given targets,
+    computed with a single Dijkstra search
+    """
+    source, targets = job
+    graph = graph if graph is not None else _WORKER_GRAPH
+    if len(targets) == 1:
+        try:
+            return {targets[0]: nx.dijkstra_path(graph, source, targets[0], weight='length')}
+        except nx.NetworkXNoPath:
+            return {}
+    _, paths = nx.single_source_dijkstra(graph, source, weight='length')
+    return {target: paths[target] for target in targets if target in paths}
+
+
+def _waypoint_ref(waypoint):
+    # type: (carla.Waypoint) -> tuple
+    loc = waypoint.transform.location
+    return (waypoint.road_id, waypoint.section_id, waypoint.lane_id, float(waypoint.s),
+            float(loc.x), float(loc.y), float(loc.z))
+
+
 class GlobalRoutePlanner:
     """
     This class provides a very high level route plan.
     """
 
-    def __init__(self, wmap, sampling_resolution):
-        # type: (carla.Map, float) -> None
+    def __init__(self, wmap, sampling_resolution, cache_dir=None):
+        # type: (carla.Map, float, str | None) -> None
+        """
+        :param wmap: carla.Map to plan on
+        :param sampling_resolution: distance between the waypoints of the graph edges
+        :param cache_dir: if given, the built graph is stored in this folder, keyed by the
+            OpenDRIVE content hash and the sampling resolution, and loaded from it on the next run
+        """
         self._sampling_resolution = sampling_resolution
         self._wmap = wmap
         self._topology = []    # type: list[TopologyDict]
         self._graph = None     # type: nx.DiGraph # type: ignore[assignment]
         self._id_map = None    # type: dict[tuple[float, float, float], int] # type: ignore[assignment]
         self._road_id_to_edge = None  # type: dict[int, dict[int, dict[int, tuple[int, int]]]] # type: ignore[assignment]
+        self._waypoint_index = None  # type: tuple[GridIndex, list[tuple[int, int]], np.ndarray] | None
 
         self._intersection_end_node = -1
         self._previous_decision = RoadOption.VOID
 
-        # Build the graph
-        self._build_topology()
-        self._build_graph()
-        self._find_loose_ends()
-        self._lane_change_link()
+        cache_path = self._cache_path(cache_dir) if cache_dir else None
+        if cache_path is None or not self._load_cache(cache_path):
+            # Build the graph
+            self._build_topology()
+            self._build_graph()
+            self._find_loose_ends()
+            self._lane_change_link()
+
+            if cache_path is not None:
+                self._save_cache(cache_path)
+
+        # Node coordinates as plain floats for the A* heuristic
+        self._vertices = {n: tuple(float(v) for v in vertex)
+                          for n, vertex in self._graph.nodes(data='vertex')
+                          if vertex is not None}  # type: dict[int, tuple[float, float, float]]
 
     def trace_route(self, origin, destination):
         # type: (carla.Location, carla.Location) -> list[tuple[carla.Waypoint, RoadOption]]
@@ -79,8 +213,81 @@ class GlobalRoutePlanner:
         This method returns list of (carla.Waypoint, RoadOption)
         from origin to destination
         """
-        route_trace = []  # type: list[tuple[carla.Waypoint, RoadOption]]
         route = self._path_search(origin, destination)
+        return self._route_trace(route, origin, destination)
+
+    def trace_routes(self, pairs, processes=None):
+        # type: (list[tuple[carla.Location, carla.Location]], int | None) -> list[list[tuple[carla.Waypoint, RoadOption]]]
+        """
+        Batch version of trace_route. Pairs sharing the same start edge are solved
+        with one shortest-path tree, so the search cost is paid once per source
+        instead of once per pair.
+
+            :param pairs: list of (origin, destination) carla.Location tuples
+            :param processes: if > 1, the graph searches run in a pool of that many processes
+            :return: list of route traces, in the order of pairs
+        """
+        pairs = list(pairs)
+        starts = [self._localize(origin) for origin, _ in pairs]
+        ends = [self._localize(destination) for _, destination in pairs]
+
+        targets = {}  # type: dict[int, list[int]]
+        for start, end in zip(starts, ends):
+            node_targets = targets.setdefault(start[0], [])
+            if end[0] not in node_targets:
+                node_targets.append(end[0])
+        node_paths = self._shortest_path_trees(targets, processes)
+
+        route_traces = []
+        for (origin, destination), start, end in zip(pairs, starts, ends):
+            if end[0] not in node_paths[start[0]]:
+                raise nx.NetworkXNoPath(
+                    "Node {} not reachable from {}".format(end[0], start[0]))
+            route = node_paths[start[0]][end[0]] + [end[1]]
+            route_traces.append(self._route_trace(route, origin, destination))
+        return route_traces
+
+    def trace_routes_from(self, origin, destinations, processes=None):
+        # type: (carla.Location, list[carla.Location], int | None) -> list[list[tuple[carla.Waypoint, RoadOption]]]
+        """
+        One-to-many version of trace_route, sharing one shortest-path tree
+        for all destinations.
+
+            :param origin: carla.Location of the start position
+            :param destinations: list of carla.Location end positions
+            :param processes: see trace_routes
+            :return: list of route traces, in the order of destinations
+        """
+        return self.trace_routes([(origin, destination) for destination in destinations], processes)
+
+    def _shortest_path_trees(self, targets, processes=None):
+        # type: (dict[int, list[int]], int | None) -> dict[int, dict[int, list[int]]]
+        """
+        Computes the node paths from each source node to its target nodes.
+        The process pool only receives a copy of the graph reduced to the edge lengths,
+        waypoints never leave this process
+        """
+        jobs = list(targets.items())
+        if processes is None or processes <= 1 or len(jobs) <= 1:
+            trees = [_shortest_path_tree(job, self._graph) for job in jobs]
+        else:
+            graph = nx.DiGraph()
+            graph.add_weighted_edges_from(
+                ((n1, n2, length) for n1, n2, length in self._graph.edges(data='length')),
+                weight='length')
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_routing_worker,
+                                     initargs=(graph,)) as pool:
+                trees = list(pool.map(_shortest_path_tree, jobs,
+                                      chunksize=max(1, len(jobs) // (4 * processes))))
+        return {source: tree for (source, _), tree in zip(jobs, trees)}
+
+    def _route_trace(self, route, origin, destination):
+        # type: (list[int], carla.Location, carla.Location) -> list[tuple[carla.Waypoint, RoadOption]]
+        """
+        Turns a path of graph nodes into a list of (carla.Waypoint, RoadOption)
+        from origin to destination
+        """
+        route_trace = []  # type: list[tuple[carla.Waypoint, RoadOption]]
         current_waypoint = self._wmap.get_waypoint(origin)
         destination_waypoint = self._wmap.get_waypoint(destination)
 
@@ -94,9 +301,10 @@ class GlobalRoutePlanner:
                 exit_wp = edge['exit_waypoint']
                 n1, n2 = self._road_id_to_edge[exit_wp.road_id][exit_wp.section_id][exit_wp.lane_id]
                 next_edge = self._graph.edges[n1, n2]  # type: EdgeDict
-                if next_edge['path']:
-                    closest_index = self._find_closest_in_list(current_waypoint, next_edge['path'])
-                    closest_index = min(len(next_edge['path']) - 1, closest_index + 5)
+                if len(next_edge['path_xyz']):
+                    closest_index = self._find_closest_in_list(
+                        current_waypoint, next_edge['path'], next_edge['path_xyz'])
+                    closest_index = min(len(next_edge['path_xyz']) - 1, closest_index + 5)
                     current_waypoint = next_edge['path'][closest_index]
                 else:
                     current_waypoint = next_edge['exit_waypoint']
@@ -104,21 +312,151 @@ class GlobalRoutePlanner:
 
             else:
                 path = path + [edge['entry_waypoint']] + edge['path'] + [edge['exit_waypoint']]
-                closest_index = self._find_closest_in_list(current_waypoint, path)
-                for waypoint in path[closest_index:]:
+                points = np.vstack((locations_to_array([edge['entry_waypoint']]),
+                                    edge['path_xyz'],
+                                    locations_to_array([edge['exit_waypoint']])))
+                closest_index = self._find_closest_in_list(current_waypoint, path, points)
+                last_edge = len(route) - i <= 2
+                if last_edge:
+                    destination_xyz = np.array([destination.x, destination.y, destination.z])
+                    destination_distances = np.linalg.norm(points - destination_xyz, axis=1)
+                    destination_index = None
+                for j in range(closest_index, len(path)):
+                    waypoint = path[j]
                     current_waypoint = waypoint
                     route_trace.append((current_waypoint, road_option))
-                    if len(route) - i <= 2 and waypoint.transform.location.distance(
-                            destination) < 2 * self._sampling_resolution:
+                    if last_edge and destination_distances[j] < 2 * self._sampling_resolution:
                         break
-                    elif len(
-                            route) - i <= 2 and current_waypoint.road_id == destination_waypoint.road_id and current_waypoint.section_id == destination_waypoint.section_id and current_waypoint.lane_id == destination_waypoint.lane_id:
-                        destination_index = self._find_closest_in_list(destination_waypoint, path)
+                    elif last_edge and current_waypoint.road_id == destination_waypoint.road_id and current_waypoint.section_id == destination_waypoint.section_id and current_waypoint.lane_id == destination_waypoint.lane_id:
+                        if destination_index is None:
+                            destination_index = self._find_closest_in_list(destination_waypoint, path, points)
                         if closest_index > destination_index:
                             break
 
         return route_trace
 
+    def _cache_path(self, cache_dir):
+        # type: (str) -> str
+        """
+        Returns the cache file of this map and sampling resolution. Same scheme as the
+        MapImage cache of no_rendering_mode.py: the file name holds the map name and
+        the hash of the OpenDRIVE content
+        """
+        hash_func = hashlib.sha1()
+        hash_func.update(self._wmap.to_opendrive().encode("UTF-8"))
+        opendrive_hash = str(hash_func.hexdigest())
+        filename = "{}_{}_{}.pkl".format(
+            self._wmap.name.split('/')[-1], opendrive_hash, float(self._sampling_resolution))
+        return os.path.join(cache_dir, filename)
+
+    def _load_cache(self, cache_path):
+        # type: (str) -> bool
+        """
+        Restores graph, id map and road id index from the cache file.
+        Waypoints are only rehydrated when an edge is first used.
+        Returns False if there is no usable cache
+        """
+        if not os.path.isfile(cache_path):
+            return False
+        try:
+            with open(cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        if data.get('version') != _CACHE_VERSION:
+            return False
+
+        resolver = _WaypointResolver(self._wmap)
+        self._graph = _LazyDiGraph()
+        for node, vertex in data['nodes']:
+            self._graph.add_node(node, vertex=vertex)
+        for n1, n2, attrs in data['edges']:
+            attrs['type'] = RoadOption(attrs['type'])
+            for key in _WAYPOINT_KEYS:
+                if key in attrs:
+                    attrs[key] = _LazyWaypoint(resolver, attrs[key])
+            attrs['path_xyz'] = np.array([ref[4:] for ref in attrs['path']], dtype=np.float64).reshape(-1, 3)
+            attrs['path'] = _LazyPath(resolver, attrs['path'])
+            for key in ('entry_vector', 'exit_vector'):
+                if attrs.get(key) is not None:
+                    attrs[key] = np.array(attrs[key])
+            self._graph.add_edge(n1, n2, **attrs)
+        self._id_map = data['id_map']
+        self._road_id_to_edge = data['road_id_to_edge']
+        return True
+
+    def _save_cache(self, cache_path):
+        # type: (str) -> None
+        """
+        Stores the graph with waypoints replaced by their OpenDRIVE references.
+        Older caches of the same town and resolution are removed.
+        Failing to write the cache only prints a warning, the planner works without it
+        """
+        edges = []
+        for n1, n2, attrs in self._graph.edges(data=True):
+            data = dict(attrs)
+            data['type'] = data['type'].value
+            for key in _WAYPOINT_KEYS:
+                if key in data:
+                    data[key] = _waypoint_ref(data[key])
+            data['path'] = [_waypoint_ref(wp) for wp in data['path']]
+            data.pop('path_xyz', None)  # rebuilt from the references
+            for key in ('entry_vector', 'exit_vector'):
+                if data.get(key) is not None:
+                    data[key] = [float(v) for v in data[key]]
+            edges.append((n1, n2, data))
+
+        data = {
+            'version': _CACHE_VERSION,
+            'nodes': [(n, tuple(float(v) for v in attrs['vertex']))
+                      for n, attrs in self._graph.nodes(data=True)],
+            'edges': edges,
+            'id_map': self._id_map,
+            'road_id_to_edge': self._road_id_to_edge,
+        }
+
+        try:
+            self._write_cache(cache_path, data)
+        except Exception as e:  # pylint: disable=broad-except
+            print("Warning: Could not save the route planner cache to '{}': {}".format(cache_path, e))
+
+    @staticmethod
+    def _write_cache(cache_path, data):
+        # type: (str, dict) -> None
+        """
+        Writes the cache data through a temporary file unique to this process, so agents
+        starting at the same time can save the same cache concurrently
+        """
+        dirname = os.path.dirname(cache_path) or '.'
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            if not os.path.isdir(dirname):
+                raise
+        town, _, resolution = os.path.basename(cache_path).rsplit('_', 2)
+        for old_filename in glob.glob(os.path.join(dirname, town + "_*.pkl")):
+            parts = os.path.basename(old_filename).rsplit('_', 2)
+            if len(parts) != 3:
+                continue  # not a route planner cache, e.g. 'Town01_backup.pkl'
+            old_town, _, old_resolution = parts
+            if old_town == town and old_resolution == resolution and os.path.normpath(old_filename) != os.path.normpath(cache_path):
+                try:
+                    os.remove(old_filename)
+                except FileNotFoundError:
+                    pass  # removed by another process
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + town + '_', suffix='.pkl.tmp', dir=dirname)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
     def _build_topology(self):
         """
         This function retrieves topology from the server as a list of
@@ -206,7 +544,7 @@ class GlobalRoutePlanner:
             # Adding edge with attributes
             self._graph.add_edge(
                 n1, n2,
-                length=len(path) + 1, path=path,
+                length=len(path) + 1, path=path, path_xyz=locations_to_array(path),
                 entry_waypoint=entry_wp, exit_waypoint=exit_wp,
                 entry_vector=np.array(
                     [entry_carla_vector.x, entry_carla_vector.y, entry_carla_vector.z]),
@@ -254,7 +592,7 @@ class GlobalRoutePlanner:
                     self._graph.add_node(n2, vertex=n2_xyz)
                     self._graph.add_edge(
                         n1, n2,
-                        length=len(path) + 1, path=path,
+                        length=len(path) + 1, path=path, path_xyz=locations_to_array(path),
                         entry_waypoint=end_wp, exit_waypoint=path[-1],
                         entry_vector=None, exit_vector=None, net_vector=None,
                         intersection=end_wp.is_junction, type=RoadOption.LANEFOLLOW)
@@ -283,7 +621,8 @@ class GlobalRoutePlanner:
                                 self._graph.add_edge(
                                     self._id_map[segment['entryxyz']], next_segment[0], entry_waypoint=waypoint,
                                     exit_waypoint=next_waypoint, intersection=False, exit_vector=None,
-                                    path=[], length=0, type=next_road_option, change_waypoint=next_waypoint)
+                                    path=[], path_xyz=np.empty((0, 3)), length=0, type=next_road_option,
+                                    change_waypoint=next_waypoint)
                                 right_found = True
                     if waypoint.left_lane_marking and waypoint.left_lane_marking.lane_change & carla.LaneChange.Left and not left_found:
                         next_waypoint = waypoint.get_left_lane()
@@ -296,7 +635,8 @@ class GlobalRoutePlanner:
                                 self._graph.add_edge(
                                     self._id_map[segment['entryxyz']], next_segment[0], entry_waypoint=waypoint,
                                     exit_waypoint=next_waypoint, intersection=False, exit_vector=None,
-                                    path=[], length=0, type=next_road_option, change_waypoint=next_waypoint)
+                                    path=[], path_xyz=np.empty((0, 3)), length=0, type=next_road_option,
+                                    change_waypoint=next_waypoint)
                                 left_found = True
                 if left_found and right_found:
                     break
@@ -320,9 +660,9 @@ class GlobalRoutePlanner:
         Distance heuristic calculator for path searching
         in self._graph
         """
-        l1 = np.array(self._graph.nodes[n1]['vertex'])
-        l2 = np.array(self._graph.nodes[n2]['vertex'])
-        return np.linalg.norm(l1 - l2)
+        x1, y1, z1 = self._vertices[n1]
+        x2, y2, z2 = self._vertices[n2]
+        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2)
 
     def _path_search(self, origin, destination):
         # type: (carla.Location, carla.Location) -> list[int]
@@ -428,14 +768,36 @@ class GlobalRoutePlanner:
         self._previous_decision = decision
         return decision
 
-    def _find_closest_in_list(self, current_waypoint, waypoint_list):
-        min_distance = float('inf')
-        closest_index = -1
-        for i, waypoint in enumerate(waypoint_list):
-            distance = waypoint.transform.location.distance(
-                current_waypoint.transform.location)
-            if distance < min_distance:
-                min_distance = distance
-                closest_index = i
-
-        return closest_index
+    def _find_closest_in_list(self, current_waypoint, waypoint_list, points=None):
+        # type: (carla.Waypoint, list[carla.Waypoint], np.ndarray | None) -> int
+        """
+        Returns the index of the waypoint of the list closest to current_waypoint.
+        points are the (N, 3) coordinates of waypoint_list, computed if not given
+        """
+        if points is None:
+            points = locations_to_array(waypoint_list)
+        return closest_index(points, current_waypoint.transform.location)
+
+    def get_closest_waypoint(self, location):
+        # type: (carla.Location) -> carla.Waypoint | None
+        """
+        Returns the waypoint of the route graph closest to a location,
+        using a grid index over the waypoints of all the edges
+        """
+        if self._waypoint_index is None:
+            owners, positions, points = [], [], []
+            for n1, n2, path_xyz in self._graph.edges(data='path_xyz'):
+                if path_xyz is None or not len(path_xyz):
+                    continue
+                owners.extend([(n1, n2)] * len(path_xyz))
+                positions.append(np.arange(len(path_xyz)))
+                points.append(path_xyz)
+            if not points:
+                return None
+            self._waypoint_index = (GridIndex(np.vstack(points), 4 * self._sampling_resolution),
+                                    owners, np.concatenate(positions))
+        grid, owners, positions = self._waypoint_index
+        index = grid.nearest(location)
+        if index < 0:
+            return None
+        return self._graph.edges[owners[index]]['path'][positions[index]]
@@ -0,0 +1,291 @@
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+"""
+This module provides WorldState, a per-tick cache of the actors of the world
+shared by the agents, so that actor lists, transforms and velocities are
+retrieved once per tick instead of once per agent and actor.
+
+Typical use with many agents driven from one client:
+
+    world_state = WorldState(world)
+    agents = [BehaviorAgent(vehicle, world_state=world_state) for vehicle in vehicles]
+    while True:
+        world.tick()
+        world_state.update()
+        controls = [agent.run_step() for agent in agents]
+"""
+
+import math
+
+import numpy as np
+
+import carla
+from agents.tools.misc import get_trafficlight_trigger_location
+from agents.tools.spatial import GridIndex
+
+# Values of WorldState.types
+OTHER = 0
+VEHICLE = 1
+WALKER = 2
+TRAFFIC_LIGHT = 3
+
+
+def _actor_type(type_id):
+    # type: (str) -> int
+    if type_id.startswith('vehicle.'):
+        return VEHICLE
+    if type_id.startswith('walker.pedestrian'):
+        return WALKER
+    if type_id.startswith('traffic.traffic_light'):
+        return TRAFFIC_LIGHT
+    return OTHER
+
+
+class TrafficLightIndex(object):
+    """
+    Trigger waypoints of the traffic lights of a map, grouped by road id.
+    Traffic lights are static, so the index is built once and shared by all the agents.
+    """
+
+    def __init__(self, wmap, traffic_lights):
+        """
+        :param wmap: carla.Map of the world
+        :param traffic_lights: list of carla.TrafficLight
+        """
+        self.trigger_waypoints = {}  # type: dict[int, carla.Waypoint]
+        self._by_road = {}  # type: dict[int, list[tuple[carla.TrafficLight, carla.Waypoint, tuple, tuple]]]
+        points = []
+        for traffic_light in traffic_lights:
+            trigger_wp = wmap.get_waypoint(get_trafficlight_trigger_location(traffic_light))
+            location = trigger_wp.transform.location
+            forward = trigger_wp.transform.get_forward_vector()
+            self.trigger_waypoints[traffic_light.id] = trigger_wp
+            self._by_road.setdefault(trigger_wp.road_id, []).append((
+                traffic_light, trigger_wp,
+                (location.x, location.y, location.z), (forward.x, forward.y, forward.z)))
+            points.append((location.x, location.y, location.z))
+        self._points = np.array(points, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.trigger_waypoints)
+
+    def any_within(self, location, max_distance):
+        # type: (carla.Location, float) -> bool
+        """Whether any trigger waypoint is closer than max_distance to the location"""
+        if not len(self._points):
+            return False
+        diff = self._points - np.array([location.x, location.y, location.z])
+        return bool(np.any(np.einsum('ij,ij->i', diff, diff) <= max_distance * max_distance))
+
+    def on_road(self, road_id):
+        """
+        Returns the (traffic light, trigger waypoint, trigger location, trigger forward vector)
+        tuples of the lights whose trigger waypoint lies on the road, location and vector as (x, y, z)
+        """
+        return self._by_road.get(road_id, ())
+
+
+class WorldState(object):
+    """
+    Snapshot of the actors of the world, refreshed at most once per simulation frame.
+
+    Row i of the arrays describes actors[i]:
+        ids (N,), types (N,), locations (N, 3), rotations (N, 3) as pitch, yaw, roll,
+        velocities (N, 3), extents (N, 3) and bb_locations (N, 3) of the bounding boxes.
+
+    Transforms and velocities come from the carla.WorldSnapshot. The actor list is only
+    requested from the server when actors appear, so a tick without spawns costs no RPC.
+    Vehicle positions are kept in a grid index for radius queries.
+    """
+
+    def __init__(self, world, cell_size=20.0):
+        """
+        :param world: carla.World to follow
+        :param cell_size: side in meters of the cells of the vehicle grid index
+        """
+        self._world = world
+        self._cell_size = cell_size
+        self._snapshot = None  # type: carla.WorldSnapshot | None
+        self.frame = None  # type: int | None
+
+        self._known = {}  # type: dict[int, tuple[carla.Actor, int, tuple, tuple]]
+        self._rows = {}  # type: dict[int, int]
+
+        self.actors = []  # type: list[carla.Actor]
+        self.ids = np.empty(0, dtype=np.int64)
+        self.types = np.empty(0, dtype=np.int8)
+        self.locations = np.empty((0, 3))
+        self.rotations = np.empty((0, 3))
+        self.velocities = np.empty((0, 3))
+        self.extents = np.empty((0, 3))
+        self.bb_locations = np.empty((0, 3))
+
+        self.vehicles = []  # type: list[carla.Actor]
+        self.walkers = []  # type: list[carla.Actor]
+        self.traffic_lights = []  # type: list[carla.TrafficLight]
+        self.vehicle_locations = np.empty((0, 3))
+        self._vehicle_index = GridIndex(self.vehicle_locations, cell_size)
+        self._traffic_light_index = None  # type: TrafficLightIndex | None
+
+    def update(self, snapshot=None):
+        # type: (carla.WorldSnapshot | None) -> bool
+        """
+        Refreshes the cache if the world advanced to a new frame.
+        Can also be registered with world.on_tick(world_state.update).
+
+            :param snapshot: carla.WorldSnapshot of the current frame, retrieved if None
+            :return: True if the cache was rebuilt
+        """
+        if snapshot is None:
+            snapshot = self._world.get_snapshot()
+        if snapshot.frame == self.frame:
+            return False
+
+        actor_snapshots = list(snapshot)
+        self._sync_actors(actor_snapshots)
+        actor_snapshots = [s for s in actor_snapshots if s.id in self._known]
+
+        n = len(actor_snapshots)
+        actors = []
+        ids = np.empty(n, dtype=np.int64)
+        types = np.empty(n, dtype=np.int8)
+        locations = np.empty((n, 3))
+        rotations = np.empty((n, 3))
+        velocities = np.empty((n, 3))
+        extents = np.empty((n, 3))
+        bb_locations = np.empty((n, 3))
+        for i, actor_snapshot in enumerate(actor_snapshots):
+            actor, actor_type, extent, bb_location = self._known[actor_snapshot.id]
+            transform = actor_snapshot.get_transform()
+            velocity = actor_snapshot.get_velocity()
+            actors.append(actor)
+            ids[i] = actor_snapshot.id
+            types[i] = actor_type
+            locations[i] = (transform.location.x, transform.location.y, transform.location.z)
+            rotations[i] = (transform.rotation.pitch, transform.rotation.yaw, transform.rotation.roll)
+            velocities[i] = (velocity.x, velocity.y, velocity.z)
+            extents[i] = extent
+            bb_locations[i] = bb_location
+
+        self._snapshot = snapshot
+        self.frame = snapshot.frame
+        self.actors, self.ids, self.types = actors, ids, types
+        self.locations, self.rotations, self.velocities = locations, rotations, velocities
+        self.extents, self.bb_locations = extents, bb_locations
+        self._rows = {actor_id: i for i, actor_id in enumerate(ids.tolist())}
+
+        self.vehicles = [actors[i] for i in np.flatnonzero(types == VEHICLE)]
+        self.walkers = [actors[i] for i in np.flatnonzero(types == WALKER)]
+        self.traffic_lights = [actors[i] for i in np.flatnonzero(types == TRAFFIC_LIGHT)]
+        self.vehicle_locations = locations[types == VEHICLE]
+        self._vehicle_index = GridIndex(self.vehicle_locations, self._cell_size)
+        return True
+
+    def _sync_actors(self, actor_snapshots):
+        """Fetches the actor objects and their static data only for actors not seen before"""
+        current = set(s.id for s in actor_snapshots)
+        for actor_id in [i for i in self._known if i not in current]:
+            del self._known[actor_id]
+        missing = [actor_id for actor_id in current if actor_id not in self._known]
+        if not missing:
+            return
+        for actor in self._world.get_actors(missing):
+            bb = actor.bounding_box
+            self._known[actor.id] = (
+                actor, _actor_type(actor.type_id),
+                (bb.extent.x, bb.extent.y, bb.extent.z),
+                (bb.location.x, bb.location.y, bb.location.z))
+
+    def get_traffic_light_index(self, wmap):
+        # type: (carla.Map) -> TrafficLightIndex
+        """
+        Returns the TrafficLightIndex of the world, built on first use
+
+            :param wmap: carla.Map of the world
+        """
+        if self._traffic_light_index is None:
+            if self.frame is None:
+                self.update()
+            self._traffic_light_index = TrafficLightIndex(wmap, self.traffic_lights)
+        return self._traffic_light_index
+
+    def row(self, actor):
+        # type: (carla.Actor) -> int | None
+        """Row of the actor in the arrays, None if it is not part of the cached frame"""
+        return self._rows.get(actor.id)
+
+    def get_transform(self, actor):
+        # type: (carla.Actor) -> carla.Transform
+        """
+        Returns a copy of the transform of the actor at the cached frame,
+        falling back to the actor itself if it is not part of the snapshot
+        """
+        actor_snapshot = self._snapshot.find(actor.id) if self._snapshot is not None else None
+        if actor_snapshot is None:
+            return actor.get_transform()
+        transform = actor_snapshot.get_transform()
+        # Callers move the returned transform in place, never hand out the cached one
+        return carla.Transform(transform.location, transform.rotation)
+
+    def get_location(self, actor):
+        # type: (carla.Actor) -> carla.Location
+        """Returns the location of the actor at the cached frame"""
+        i = self._rows.get(actor.id)
+        if i is None:
+            return actor.get_location()
+        x, y, z = self.locations[i]
+        return carla.Location(x=float(x), y=float(y), z=float(z))
+
+    def get_velocity(self, actor):
+        # type: (carla.Actor) -> carla.Vector3D
+        """Returns the velocity of the actor at the cached frame"""
+        i = self._rows.get(actor.id)
+        if i is None:
+            return actor.get_velocity()
+        x, y, z = self.velocities[i]
+        return carla.Vector3D(x=float(x), y=float(y), z=float(z))
+
+    def get_speed(self, actor):
+        # type: (carla.Actor) -> float
+        """Returns the speed of the actor at the cached frame in Km/h, like misc.get_speed"""
+        i = self._rows.get(actor.id)
+        if i is None:
+            vel = actor.get_velocity()
+            return 3.6 * math.sqrt(vel.x ** 2 + vel.y ** 2 + vel.z ** 2)
+        return 3.6 * float(np.linalg.norm(self.velocities[i]))
+
+    def _locations(self, actors):
+        rows = [self._rows.get(actor.id) for actor in actors]
+        if None not in rows:
+            return self.locations[rows]
+        points = np.empty((len(actors), 3))
+        for i, (actor, row) in enumerate(zip(actors, rows)):
+            if row is None:
+                location = actor.get_location()
+                points[i] = (location.x, location.y, location.z)
+            else:
+                points[i] = self.locations[row]
+        return points
+
+    def actors_within(self, actors, location, max_distance):
+        # type: (list[carla.Actor], carla.Location, float) -> list[carla.Actor]
+        """
+        Returns the actors closer than max_distance to the location, in their original order.
+        The cached vehicle list is answered through the grid index, other lists with
+        one vectorized distance computation.
+
+            :param actors: list of carla.Actor, e.g. WorldState.vehicles or WorldState.walkers
+            :param location: carla.Location of the query
+            :param max_distance: radius of the query in meters
+        """
+        if actors is self.vehicles:
+            indices = np.sort(self._vehicle_index.within(location, max_distance))
+            return [self.vehicles[i] for i in indices]
+
+        actors = list(actors)
+        if not actors:
+            return actors
+        diff = self._locations(actors) - np.array([location.x, location.y, location.z])
+        inside = np.einsum('ij,ij->i', diff, diff) <= max_distance * max_distance
+        return [actor for actor, keep in zip(actors, inside) if keep]
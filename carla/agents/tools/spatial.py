@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+# This work is licensed under the terms of the MIT license.
+# For a copy, see <https://opensource.org/licenses/MIT>.
+
+""" Module with vectorized nearest-point helpers for waypoints and actors. """
+
+import numpy as np
+
+
+def locations_to_array(items):
+    """
+    Stack the locations of waypoints, transforms or locations into an (N, 3) array.
+
+        :param items: iterable of carla.Waypoint, carla.Transform or carla.Location
+        :return: float64 array of shape (N, 3)
+    """
+    points = []
+    for item in items:
+        if hasattr(item, 'transform'):
+            item = item.transform
+        if hasattr(item, 'location'):
+            item = item.location
+        points.append((item.x, item.y, item.z))
+    return np.array(points, dtype=np.float64).reshape(-1, 3)
+
+
+def closest_index(points, location):
+    """
+    Index of the point closest to a location, -1 if there are no points.
+
+        :param points: (N, 3) array, see locations_to_array
+        :param location: carla.Location or (x, y, z) sequence
+        :return: int
+    """
+    if len(points) == 0:
+        return -1
+    if hasattr(location, 'x'):
+        location = (location.x, location.y, location.z)
+    diff = points - np.asarray(location, dtype=np.float64)
+    return int(np.argmin(np.einsum('ij,ij->i', diff, diff)))
+
+
+class GridIndex(object):
+    """
+    Uniform 2D grid over a fixed set of points, answering radius and nearest
+    neighbour queries by only looking at the cells around the query.
+    """
+
+    def __init__(self, points, cell_size=10.0):
+        """
+            :param points: (N, 2) or (N, 3) array; z is kept for distances but not gridded
+            :param cell_size: side of a grid cell in meters
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        self._cells = {}
+
+        if len(self.points) == 0:
+            return
+        keys = np.floor(self.points[:, :2] / self.cell_size).astype(np.int64)
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.any(np.diff(sorted_keys, axis=0) != 0, axis=1)) + 1
+        starts = np.concatenate(([0], starts, [len(order)]))
+        for begin, end in zip(starts[:-1], starts[1:]):
+            self._cells[(int(sorted_keys[begin, 0]), int(sorted_keys[begin, 1]))] = order[begin:end]
+
+    def __len__(self):
+        return len(self.points)
+
+    def _candidates(self, x, y, radius):
+        i0, j0 = int(np.floor((x - radius) / self.cell_size)), int(np.floor((y - radius) / self.cell_size))
+        i1, j1 = int(np.floor((x + radius) / self.cell_size)), int(np.floor((y + radius) / self.cell_size))
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._cells):
+            # Large radius, cheaper to walk the occupied cells
+            found = [cell for (i, j), cell in self._cells.items() if i0 <= i <= i1 and j0 <= j <= j1]
+        else:
+            found = [self._cells[(i, j)]
+                     for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) if (i, j) in self._cells]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)
+
+    def _sq_distances(self, indices, location):
+        diff = self.points[indices] - np.asarray(location[:self.points.shape[1]], dtype=np.float64)
+        return np.einsum('ij,ij->i', diff, diff)
+
+    def within(self, location, radius):
+        """
+        Indices of all points within a radius of a location, sorted by distance.
+
+            :param location: carla.Location or (x, y[, z]) sequence
+            :param radius: search radius in meters
+        """
+        location = _as_tuple(location)
+        candidates = self._candidates(location[0], location[1], radius)
+        if len(candidates) == 0:
+            return candidates
+        sq_dist = self._sq_distances(candidates, location)
+        mask = sq_dist <= radius * radius
+        candidates, sq_dist = candidates[mask], sq_dist[mask]
+        return candidates[np.argsort(sq_dist, kind='stable')]
+
+    def nearest(self, location):
+        """
+        Index of the point closest to a location, -1 if the index is empty.
+
+            :param location: carla.Location or (x, y[, z]) sequence
+        """
+        if len(self.points) == 0:
+            return -1
+        location = _as_tuple(location)
+        radius = self.cell_size
+        while True:
+            candidates = self._candidates(location[0], location[1], radius)
+            if len(candidates) > 0:
+                sq_dist = self._sq_distances(candidates, location)
+                best = int(np.argmin(sq_dist))
+                # A closer point can only hide outside the searched square if the
+                # best distance is larger than the searched radius
+                if sq_dist[best] <= radius * radius or len(candidates) == len(self.points):
+                    return int(candidates[best])
+            radius *= 2.0
+
+
+def _as_tuple(location):
+    if hasattr(location, 'x'):
+        return (location.x, location.y, location.z)
+    return tuple(location)
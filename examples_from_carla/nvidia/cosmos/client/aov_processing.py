@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Post-processing kernels turning the raw CARLA AOVs into the Cosmos control videos.
+
+Every kernel writes into an output array given by the caller (e.g. a FrameRing slot)
+and keeps its intermediates in buffers allocated once per frame size, so processing a
+frame allocates no full-frame temporaries. Arithmetic is done in float32 or integers.
+
+Kernels:
+- decode_depth: CARLA depth BGRA -> depth in meters (float32)
+- log_grayscale: depth in meters -> inverted log-depth gray image (uint8, 1 or 3 channels)
+- instance_colors: CARLA instance segmentation -> 16 bit instance IDs -> colormap
+- masked_edges: Canny edges of the blurred RGB restricted to semantic classes
+"""
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import cv2
+
+# CARLA encodes depth as a 24 bit integer over a 1000 m range
+DEPTH_FAR_M = 1000.0
+DEPTH_SCALE = np.float32(DEPTH_FAR_M / (256**3 - 1))
+
+
+class AovKernels:
+    """
+    Kernels for frames of one size, owning the intermediate buffers.
+
+    An instance is not thread safe, use one per worker (see get_kernels).
+    """
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        shape = (height, width)
+        self._code = np.empty(shape, dtype=np.uint32)
+        self._depth = np.empty(shape, dtype=np.float32)
+        self._ids = np.empty(shape, dtype=np.uint16)
+        self._mask = np.empty(shape, dtype=np.uint8)
+        self._class_mask = np.empty(shape, dtype=np.uint8)
+        self._gray = np.empty(shape, dtype=np.uint8)
+        self._edges = np.empty(shape, dtype=np.uint8)
+
+    def decode_depth(self, depth_bgra: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Decode the CARLA depth image, (B * 65536 + G * 256 + R) / (256**3 - 1) * 1000.
+
+        Args:
+            depth_bgra: (H, W, 4) uint8 raw depth camera image
+            out: (H, W) float32 depth in meters, an internal buffer if None
+
+        Returns:
+            np.ndarray: out
+        """
+        if out is None:
+            out = self._depth
+        # Read every pixel as a big endian 32 bit word B G R A, shifting out A leaves the 24 bit depth
+        words = np.ascontiguousarray(depth_bgra).view('>u4')[..., 0]
+        np.right_shift(words, 8, out=self._code)
+        np.multiply(self._code, DEPTH_SCALE, out=out, dtype=np.float32)
+        return out
+
+    def log_grayscale(
+        self,
+        depth_map: np.ndarray,
+        out: np.ndarray,
+        near_clip: float = 0.01,
+        far_clip: float = 1000.0,
+        inverted_depth: bool = True,
+    ) -> np.ndarray:
+        """
+        Map depth logarithmically from [near_clip, far_clip] to [0, 255], near is white if inverted.
+
+        Args:
+            depth_map: (H, W) float32 depth in meters, overwritten with the intermediate values
+            out: (H, W) uint8 gray image, or (H, W, 3) uint8 for the gray value in every channel
+
+        Returns:
+            np.ndarray: out
+        """
+        log_near = np.float32(np.log(near_clip))
+        log_far = np.float32(np.log(far_clip))
+        scale = np.float32(255.0) / (log_far - log_near)
+        values = depth_map
+        np.clip(depth_map, np.float32(near_clip), np.float32(far_clip), out=values)
+        np.log(values, out=values)
+        if inverted_depth:
+            np.subtract(log_far, values, out=values)
+        else:
+            np.subtract(values, log_near, out=values)
+        np.multiply(values, scale, out=values)
+        # Truncating cast like astype(np.uint8), broadcast into the channels of out
+        np.copyto(out, values[..., None] if out.ndim == 3 else values, casting='unsafe')
+        return out
+
+    def depth_to_log_grayscale(self, depth_bgra: np.ndarray, out: np.ndarray, **kwargs) -> np.ndarray:
+        """Decode the raw depth image and write its log-depth gray image to out, see log_grayscale."""
+        return self.log_grayscale(self.decode_depth(depth_bgra), out, **kwargs)
+
+    def instance_ids(self, instance_bgr: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Reconstruct the 16 bit instance IDs, G is the low and R the high byte.
+
+        Args:
+            instance_bgr: (H, W, 3) uint8 instance segmentation image
+            out: (H, W) uint16 IDs, an internal buffer if None
+        """
+        if out is None:
+            out = self._ids
+        np.left_shift(instance_bgr[..., 2], 8, out=out, dtype=np.uint16)
+        np.bitwise_or(out, instance_bgr[..., 1], out=out)
+        return out
+
+    def instance_colors(self, instance_bgr: np.ndarray, colormap: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Color the instances with colormap[id].
+
+        Args:
+            instance_bgr: (H, W, 3) uint8 instance segmentation image
+            colormap: (65536, 3) uint8 colormap
+            out: (H, W, 3) uint8 colored image
+        """
+        np.take(colormap, self.instance_ids(instance_bgr), axis=0, out=out)
+        return out
+
+    def class_mask(self, semseg_img: np.ndarray, classes: Sequence[Sequence[int]]) -> np.ndarray:
+        """(H, W) uint8 mask, 255 where semseg_img has one of the class colors."""
+        mask = self._mask
+        mask.fill(0)
+        for color in classes:
+            bound = np.array(color, dtype=np.uint8)
+            cv2.inRange(semseg_img, bound, bound, dst=self._class_mask)
+            cv2.bitwise_or(mask, self._class_mask, dst=mask)
+        return mask
+
+    def masked_edges(
+        self,
+        rgb_img: np.ndarray,
+        semseg_img: np.ndarray,
+        classes: Sequence[Sequence[int]],
+        masked_out: np.ndarray,
+        edges_out: Optional[np.ndarray] = None,
+        *,
+        gaussian_kernel: Tuple[int, int] = (5, 5),
+        gaussian_sigma: float = 1.0,
+        canny_thresh1: int = 100,
+        canny_thresh2: int = 200,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Blur the RGB image, keep it only on the given semantic classes and detect its edges.
+
+        Args:
+            rgb_img: (H, W, 3) uint8 RGB image
+            semseg_img: (H, W, 3) uint8 semantic segmentation in the palette of classes
+            classes: Colors of the semantic classes to keep
+            masked_out: (H, W, 3) uint8 blurred RGB, black outside the classes
+            edges_out: (H, W, 3) uint8 RGB edge image, or (H, W) uint8. An internal
+                (H, W) buffer if None
+
+        Returns:
+            Tuple: (masked_out, edges_out)
+        """
+        cv2.GaussianBlur(rgb_img, gaussian_kernel, gaussian_sigma, dst=masked_out)
+        mask = self.class_mask(semseg_img, classes)
+        # The mask is 0 or 255, so and-ing keeps the pixel or zeroes it
+        np.bitwise_and(masked_out, mask[..., None], out=masked_out)
+        cv2.cvtColor(masked_out, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        if edges_out is not None and edges_out.ndim == 2:
+            cv2.Canny(self._gray, canny_thresh1, canny_thresh2, edges=edges_out)
+            return masked_out, edges_out
+        cv2.Canny(self._gray, canny_thresh1, canny_thresh2, edges=self._edges)
+        if edges_out is None:
+            return masked_out, self._edges
+        cv2.cvtColor(self._edges, cv2.COLOR_GRAY2RGB, dst=edges_out)
+        return masked_out, edges_out
+
+
+@lru_cache(maxsize=8)
+def get_kernels(height: int, width: int) -> AovKernels:
+    """Kernels of a frame size, shared by the callers of one process."""
+    return AovKernels(height, width)
@@ -3,19 +3,22 @@
 import argparse
 import multiprocessing as mp
 import logging
+import queue
+from multiprocessing import shared_memory
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, List, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
 import yaml
 import subprocess
 import numpy as np
-import cv2
 import carla
 
+import io
 import json
 import tarfile
 import tempfile
+import time
 import math
 import os
 import sys
@@ -23,7 +26,7 @@ import shutil
 import traceback
 import glob
 
-from PIL import Image
+from aov_processing import get_kernels
 
 # === ENUMS AND DATA STRUCTURES ===
 class AOV(Enum):
@@ -36,9 +39,11 @@ class AOV(Enum):
 
 @dataclass
 class FrameBundle:
-    index: int
-    frames: Dict[AOV, np.ndarray]
+    index: int  # Capture order, consecutive from 0
+    frames: Dict[AOV, str]  # AOV -> FrameRing region holding the sensor image
     timestamp: float
+    slot: int  # FrameRing slot of the frame
+    carla_frame: int = 0  # Frame number returned by world.tick()
 
 def extract_between(input_string, left_delim, right_delim):
     try:
@@ -105,30 +110,6 @@ def load_class_filter_config(path: str):
     CLASSES_TO_KEEP_CANNY = config.get('canny_classes', [])
 
 # === ORIGINAL POST-PROCESSING FUNCTIONS ===
-def masked_edges_from_semseg(
-    rgb_img: np.ndarray,
-    semseg_img: np.ndarray,
-    classes: List[Sequence[int]],
-    *,
-    gaussian_kernel: Tuple[int, int] = (5, 5),
-    gaussian_sigma: float = 1.0,
-    canny_thresh1: int = 100,
-    canny_thresh2: int = 200,
-) -> Tuple[np.ndarray, np.ndarray]:
-    blurred_rgb = cv2.GaussianBlur(rgb_img, gaussian_kernel, gaussian_sigma)
-    mask = np.zeros(semseg_img.shape[:2], dtype=np.uint8)
-    for color in classes:
-        lower = np.array(color, dtype=np.uint8)
-        upper = np.array(color, dtype=np.uint8)
-        mask |= cv2.inRange(semseg_img, lower, upper)
-    mask_bool = mask.astype(bool)
-    masked_rgb = np.zeros_like(rgb_img)
-    masked_rgb[mask_bool] = blurred_rgb[mask_bool]
-    gray = cv2.cvtColor(masked_rgb, cv2.COLOR_RGB2GRAY)
-    edges = cv2.Canny(gray, canny_thresh1, canny_thresh2)
-    return masked_rgb, edges
-
-
 def created_shaded_composition(
     sem: np.ndarray, inst: np.ndarray, nor: np.ndarray, classes_to_keep: List[Sequence[int]]
 ) -> np.ndarray:
@@ -170,42 +151,111 @@ def create_shuffled_colormap(
     return colormap_uint8
 
 
-def reconstruct_ids_vectorized(image_data_uint8: np.ndarray) -> np.ndarray:
-    low = image_data_uint8[:, :, 1].astype(np.uint16)
-    high = image_data_uint8[:, :, 2].astype(np.uint16)
-    return (high << 8) | low
-
-
-def apply_colormap_vectorized(ids_uint16: np.ndarray, colormap: np.ndarray) -> np.ndarray:
-    return colormap[ids_uint16]
+# Pre-generate colormap for instance segmentation
+colormap_uint8 = create_shuffled_colormap(seed=140)
 
+# === SHARED MEMORY FRAME RING ===
+class FrameRing:
+    """
+    Fixed number of frame slots in one shared memory block.
 
-def depth_to_log_grayscale(
-    depth_map: np.ndarray,
-    near_clip=0.01,
-    far_clip=1000.0,
-    inverted_depth=True
-) -> Image.Image:
-    clipped = np.clip(depth_map, near_clip, far_clip)
-    log_depth = np.log(clipped)
-    norm_log = (log_depth - np.log(near_clip)) / (np.log(far_clip) - np.log(near_clip))
-    if inverted_depth:
-        norm_log = 1.0 - norm_log
-    gray_img = (norm_log * 255).astype(np.uint8)
-    return Image.fromarray(gray_img)
+    Every slot holds the same named regions (the sensor images of a frame and the
+    post-processed images derived from them), so processes only exchange
+    (slot, region) names and read or write the images in place. A slot is handed
+    from the replay loop to a post-processing worker and then to the writer, which
+    returns it to the free list once the frame is encoded.
+    """
+    ALIGNMENT = 64
+
+    def __init__(self, regions: Dict[str, Tuple[int, ...]], slots: int, name: Optional[str] = None):
+        self.regions = dict(regions)
+        self.slots = slots
+        offsets = {}
+        slot_bytes = 0
+        for region, shape in self.regions.items():
+            offsets[region] = slot_bytes
+            size = int(np.prod(shape))
+            slot_bytes += -(-size // self.ALIGNMENT) * self.ALIGNMENT
+        self.slot_bytes = slot_bytes
+
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, slots * slot_bytes))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        buffer = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf)
+        self._views = [
+            {
+                region: buffer[slot, offsets[region]:offsets[region] + int(np.prod(shape))].reshape(shape)
+                for region, shape in self.regions.items()
+            }
+            for slot in range(slots)
+        ]
 
-# Pre-generate colormap for instance segmentation
-colormap_uint8 = create_shuffled_colormap(seed=140)
+    @classmethod
+    def attach(cls, spec):
+        """Open the ring created by another process from its spec()."""
+        regions, slots, name = spec
+        return cls(regions, slots, name)
+
+    def spec(self):
+        return self.regions, self.slots, self.shm.name
+
+    def view(self, slot: int, region: str) -> np.ndarray:
+        return self._views[slot][region]
+
+    def close(self):
+        """Unmap the ring, and free it in the creating process. All views must be released first."""
+        self._views = []
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def processed_frame_regions(sensor_shapes: Dict[AOV, Tuple[int, ...]]) -> Dict[str, Tuple[int, ...]]:
+    """Ring regions of the images computed by post_processing_worker from the given sensors."""
+    regions = {}
+    if AOV.RGB in sensor_shapes and AOV.SEMANTIC_SEGMENTATION in sensor_shapes:
+        regions['RGB_MASKED'] = sensor_shapes[AOV.RGB]
+        regions['RGB_EDGES'] = sensor_shapes[AOV.RGB]
+    if AOV.DEPTH in sensor_shapes:
+        regions['DEPTH'] = sensor_shapes[AOV.DEPTH][:2] + (3,)
+    if AOV.INSTANCE_SEGMENTATION in sensor_shapes:
+        regions['INSTANCE_SEGMENTATION'] = sensor_shapes[AOV.INSTANCE_SEGMENTATION][:2] + (3,)
+    return regions
 
 # === SENSOR INFO WRAPPER ===
 class SensorInfo:
     def __init__(self, sensor, stype: AOV):
         self.sensor = sensor
         self.sensor_type = stype
-        self.queue = mp.Queue()
+        self.queue = queue.Queue()
+        attributes = sensor.attributes
+        width = int(attributes.get('image_size_x', 800))
+        height = int(attributes.get('image_size_y', 600))
+        self.shape = (height, width, 4 if stype == AOV.DEPTH else 3)
+        # Where the callback writes the image, set by attach() and by expect() before each tick
+        self.ring = None
+        self.region = None
+        self.target = None
         sensor.listen(self._callback)
 
+    def attach(self, ring: FrameRing, region: str):
+        self.ring = ring
+        self.region = region
+
+    def expect(self, slot: int, frame: int):
+        """Accept only the image of the given simulation frame, written to slot."""
+        self.target = (slot, frame)
+
     def _callback(self, data):
+        target = self.target
+        if self.ring is None or target is None:
+            return
+        slot, frame = target
+        # A late image of an earlier tick must not overwrite the slot of the current one
+        if data.frame != frame:
+            return
         conv_map = {
             AOV.RGB: carla.ColorConverter.Raw,
             AOV.NORMALS: carla.ColorConverter.Raw,
@@ -217,85 +267,315 @@ class SensorInfo:
         h, w = data.height, data.width
         raw = arr.reshape((h, w, 4))
         img = raw if self.sensor_type == AOV.DEPTH else raw[:, :, :3]
-        self.queue.put((img.copy(), data.frame, data.timestamp))
+        # The only copy of the image: straight from the CARLA buffer into the shared slot
+        np.copyto(self.ring.view(slot, self.region), img)
+        self.queue.put((slot, data.frame, data.timestamp))
 
-    def capture_current_frame(self):
-        try:
-            return self.queue.get(timeout=1.0)
-        except Exception:
-            return None
+    def capture_current_frame(self, frame: int):
+        """Wait for the image of the given simulation frame, returns (slot, timestamp) or None on timeout."""
+        while True:
+            try:
+                slot, written_frame, timestamp = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                return None
+            # Skip images of earlier ticks that arrived after their capture timed out
+            if written_frame == frame:
+                return slot, timestamp
 
 # === WORKERS ===
 
-def post_processing_worker(raw_q: mp.Queue, proc_q: mp.Queue):
+def process_bundle(ring: FrameRing, bundle: FrameBundle) -> Dict[str, str]:
+    """
+    Compute the post-processed images of a frame into its ring slot.
+
+    Returns:
+        Dict: output stream name -> ring region of the slot holding its image
+    """
+    slot = bundle.slot
+    frames = {aov: ring.view(slot, region) for aov, region in bundle.frames.items()}
+    processed = {}
+    if AOV.RGB in frames:
+        processed['RGB'] = bundle.frames[AOV.RGB]
+    if AOV.RGB in frames and AOV.SEMANTIC_SEGMENTATION in frames:
+        rgb = frames[AOV.RGB]
+        get_kernels(*rgb.shape[:2]).masked_edges(
+            rgb, frames[AOV.SEMANTIC_SEGMENTATION], CLASSES_TO_KEEP_CANNY,
+            ring.view(slot, 'RGB_MASKED'), ring.view(slot, 'RGB_EDGES')
+        )
+        processed['RGB_MASKED'] = 'RGB_MASKED'
+        processed['RGB_EDGES'] = 'RGB_EDGES'
+    if AOV.DEPTH in frames:
+        depth_bgra = frames[AOV.DEPTH]
+        get_kernels(*depth_bgra.shape[:2]).depth_to_log_grayscale(depth_bgra, ring.view(slot, 'DEPTH'))
+        processed['DEPTH'] = 'DEPTH'
+    if AOV.SEMANTIC_SEGMENTATION in frames:
+        processed['SEMANTIC_SEGMENTATION'] = bundle.frames[AOV.SEMANTIC_SEGMENTATION]
+    if AOV.INSTANCE_SEGMENTATION in frames:
+        instances = frames[AOV.INSTANCE_SEGMENTATION]
+        get_kernels(*instances.shape[:2]).instance_colors(
+            instances, colormap_uint8, ring.view(slot, 'INSTANCE_SEGMENTATION')
+        )
+        processed['INSTANCE_SEGMENTATION'] = 'INSTANCE_SEGMENTATION'
+    return processed
+
+
+# === PIPELINE METRICS ===
+class PipelineMetrics:
+    """
+    Frame counts and busy time of the pipeline stages, shared between the processes.
+
+    Every stage records the frames it handled and the time it spent on them, so the
+    report gives the throughput of each stage and its cost per frame: a stage needs
+    about target_fps * ms_per_frame / 1000 processes to keep up with target_fps.
+    """
+    STAGES = ('capture', 'post_processing', 'writer')
+
+    def __init__(self):
+        self._frames = {stage: mp.Value('q', 0) for stage in self.STAGES}
+        self._busy = {stage: mp.Value('d', 0.0) for stage in self.STAGES}
+        self._stalled = mp.Value('d', 0.0)  # Capture time spent waiting for a free slot
+        self._reorder_depth = mp.Value('q', 0)
+        self._last = self.snapshot()
+
+    def record(self, stage: str, busy_s: float, frames: int = 1):
+        with self._frames[stage].get_lock():
+            self._frames[stage].value += frames
+        with self._busy[stage].get_lock():
+            self._busy[stage].value += busy_s
+
+    def record_stall(self, seconds: float):
+        with self._stalled.get_lock():
+            self._stalled.value += seconds
+
+    def set_reorder_depth(self, depth: int):
+        self._reorder_depth.value = depth
+
+    def snapshot(self) -> Dict[str, float]:
+        values = {'time': time.perf_counter(), 'stalled': self._stalled.value}
+        for stage in self.STAGES:
+            values[f"{stage}_frames"] = self._frames[stage].value
+            values[f"{stage}_busy"] = self._busy[stage].value
+        return values
+
+    def report(self, queue_depths: Dict[str, int]) -> str:
+        """Throughput of every stage since the previous report, and the current queue depths."""
+        now = self.snapshot()
+        last, self._last = self._last, now
+        elapsed = max(now['time'] - last['time'], 1e-9)
+        parts = []
+        for stage in self.STAGES:
+            frames = now[f"{stage}_frames"] - last[f"{stage}_frames"]
+            busy = now[f"{stage}_busy"] - last[f"{stage}_busy"]
+            ms_per_frame = busy / frames * 1000 if frames else 0.0
+            # busy is the number of processes the stage kept occupied on average
+            parts.append(f"{stage} {frames / elapsed:.1f} fps, {ms_per_frame:.1f} ms/frame, {busy / elapsed:.2f} busy")
+        stalled = (now['stalled'] - last['stalled']) / elapsed
+        depths = ' '.join(f"{name}={depth}" for name, depth in queue_depths.items())
+        return (
+            f"{' | '.join(parts)} | capture stalled {stalled:.0%} | "
+            f"queues {depths} reorder={self._reorder_depth.value}"
+        )
+
+
+def queue_depth(q) -> int:
+    """Approximate number of items in a multiprocessing queue, -1 where not supported (macOS)."""
+    try:
+        return q.qsize()
+    except NotImplementedError:
+        return -1
+
+
+def post_processing_worker(raw_q: mp.Queue, proc_q: mp.Queue, ring_spec, metrics: Optional[PipelineMetrics] = None):
     logging.info(f"[{mp.current_process().name}] starting")
+    ring = FrameRing.attach(ring_spec)
     while True:
         bundle = raw_q.get()
         if bundle is None:
             break
-        processed = {}
-        frames = bundle.frames
-        if AOV.RGB in frames:
-            processed['RGB'] = frames[AOV.RGB]
-        if AOV.RGB in frames and AOV.SEMANTIC_SEGMENTATION in frames:
-            masked, edges = masked_edges_from_semseg(
-                frames[AOV.RGB], frames[AOV.SEMANTIC_SEGMENTATION], CLASSES_TO_KEEP_CANNY
-            )
-            processed['RGB_MASKED'] = masked
-            processed['RGB_EDGES'] = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
-        if AOV.DEPTH in frames:
-            depth_bgra = frames[AOV.DEPTH]
-            scales = np.array([65536.0, 256.0, 1.0, 0.0]) / (256**3 - 1) * 1000
-            depth_map = np.dot(depth_bgra, scales).astype(np.float32)
-            gray_img = depth_to_log_grayscale(depth_map)
-            processed['DEPTH'] = np.array(gray_img.convert('RGB'))
-        if AOV.SEMANTIC_SEGMENTATION in frames:
-            processed['SEMANTIC_SEGMENTATION'] = frames[AOV.SEMANTIC_SEGMENTATION]
-        if AOV.INSTANCE_SEGMENTATION in frames:
-            ids = reconstruct_ids_vectorized(frames[AOV.INSTANCE_SEGMENTATION])
-            colored = apply_colormap_vectorized(ids, colormap_uint8)
-            processed['INSTANCE_SEGMENTATION'] = colored
-        proc_q.put((bundle.index, processed))
+        start = time.perf_counter()
+        processed = process_bundle(ring, bundle)
+        if metrics is not None:
+            metrics.record('post_processing', time.perf_counter() - start)
+        proc_q.put((bundle.index, bundle.slot, processed))
+    ring.close()
     logging.info(f"[{mp.current_process().name}] exiting")
 
 
-def video_writer_worker(proc_q: mp.Queue, out_dir: Path, fps: float):
+# === VIDEO ENCODING ===
+# Streams whose pixel values are labels rather than colors, see --label-video-codec
+LABEL_STREAMS = ('SEMANTIC_SEGMENTATION', 'INSTANCE_SEGMENTATION')
+
+
+@dataclass
+class EncoderSettings:
+    codec: str = 'libx264'  # 'libx264' or 'ffv1' (lossless)
+    preset: str = 'medium'  # libx264 preset
+    crf: int = 23  # libx264 quality
+    output_fps: float = 24.0  # frame rate of the video, <= 0 keeps the capture frame rate
+
+    @property
+    def extension(self) -> str:
+        # FFV1 cannot be stored in MP4
+        return '.mkv' if self.codec == 'ffv1' else '.mp4'
+
+    def ffmpeg_output_args(self) -> List[str]:
+        if self.codec == 'libx264':
+            args = ['-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf), '-pix_fmt', 'yuv420p']
+        elif self.codec == 'ffv1':
+            args = ['-c:v', 'ffv1', '-level', '3', '-pix_fmt', 'bgr0']
+        else:
+            raise ValueError(f"Unsupported video codec: {self.codec}")
+        if self.output_fps > 0:
+            # Frame rate conversion in the same pass, dropping or repeating frames
+            args += ['-r', f"{self.output_fps:g}"]
+        return args
+
+
+class FfmpegPipeWriter:
+    """
+    Encodes BGR frames by streaming them as raw video into a long-lived ffmpeg process.
+
+    The video is complete as soon as close() returns, there is no intermediate file
+    and no second encoding pass.
+    """
+    def __init__(self, path: Path, width: int, height: int, input_fps: float, settings: EncoderSettings):
+        self.path = Path(path)
+        self.shape = (height, width, 3)
+        self.failed = False
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{width}x{height}", '-r', f"{input_fps:g}",
+            '-i', '-',
+            *settings.ffmpeg_output_args(),
+            str(self.path)
+        ]
+        # ffmpeg errors are kept in a file, a pipe nobody reads could fill up and block the encoder
+        self._stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr
+        )
+
+    def write(self, img: np.ndarray):
+        if self.failed:
+            return
+        if img.shape != self.shape:
+            raise ValueError(f"Frame of shape {img.shape} written to a {self.shape} video {self.path.name}")
+        try:
+            self.process.stdin.write(np.ascontiguousarray(img).data)
+        except (BrokenPipeError, OSError) as e:
+            self.failed = True
+            logging.error(f"FFmpeg stopped accepting frames for {self.path.name}: {e}")
+
+    def close(self) -> bool:
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            self.failed = True
+        returncode = self.process.wait()
+        self._stderr.seek(0)
+        errors = self._stderr.read().decode(errors='replace').strip()
+        self._stderr.close()
+        if returncode != 0:
+            self.failed = True
+            logging.error(f"FFmpeg failed for {self.path.name} with exit code {returncode}: {errors}")
+        return not self.failed
+
+
+class ReorderBuffer:
+    """
+    Puts items arriving in any order back into index order.
+
+    push() returns the items that are now in order, the others are held until all
+    items before them arrived.
+    """
+    def __init__(self, first_index: int = 0):
+        self.next_index = first_index
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, index: int, item) -> List:
+        if index < self.next_index or index in self._pending:
+            raise ValueError(f"Frame {index} received twice")
+        self._pending[index] = item
+        ready = []
+        while self.next_index in self._pending:
+            ready.append(self._pending.pop(self.next_index))
+            self.next_index += 1
+        return ready
+
+    def flush(self) -> List:
+        """The held items in index order, skipping the missing ones."""
+        if self._pending:
+            logging.warning(f"Frame {self.next_index} never arrived, writing {len(self._pending)} later frames after the gap")
+        ready = [self._pending[index] for index in sorted(self._pending)]
+        self._pending.clear()
+        return ready
+
+
+def write_slot(ring: FrameRing, slot: int, frames: Dict[str, str], get_writer) -> int:
+    for key, region in frames.items():
+        img = ring.view(slot, region)
+        get_writer(key, img.shape[:2]).write(img)
+    return len(frames)
+
+
+def video_writer_worker(
+    proc_q: mp.Queue,
+    out_dir: Path,
+    fps: float,
+    ring_spec,
+    free_q: mp.Queue,
+    encoder: Optional[EncoderSettings] = None,
+    label_encoder: Optional[EncoderSettings] = None,
+    metrics: Optional[PipelineMetrics] = None,
+):
     logging.info("[Writer] starting")
+    encoder = encoder or EncoderSettings()
+    label_encoder = label_encoder or encoder
+    ring = FrameRing.attach(ring_spec)
     writers = {}
-    paths = {}
     write_count = 0
 
     def get_writer(key: str, shape: Tuple[int, int]):
         if key not in writers:
-            tmp = out_dir / f"{key.lower()}_tmp.mp4"
-            final = out_dir / f"{key.lower()}.mp4"
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            w = cv2.VideoWriter(str(tmp), fourcc, fps, (shape[1], shape[0]))
-            writers[key] = w
-            paths[key] = (tmp, final)
+            settings = label_encoder if key in LABEL_STREAMS else encoder
+            path = out_dir / f"{key.lower()}{settings.extension}"
+            writers[key] = FfmpegPipeWriter(path, shape[1], shape[0], fps, settings)
+            logging.info(f"[Writer] encoding {path.name} with {settings.codec}")
         return writers[key]
 
+    def write(slot: int, frames: Dict[str, str]):
+        nonlocal write_count
+        start = time.perf_counter()
+        written = write_slot(ring, slot, frames, get_writer)
+        # The encoder has copied the images, the slot can be reused
+        free_q.put(slot)
+        if metrics is not None:
+            metrics.record('writer', time.perf_counter() - start)
+        if (write_count + written) // 100 > write_count // 100:
+            logging.info(f"[Writer] wrote {write_count + written} frames total")
+        write_count += written
+
+    # Workers finish frames in any order, the videos need them in capture order
+    reorder = ReorderBuffer()
     while True:
         item = proc_q.get()
         if item is None:
             break
-        idx, frames = item
-        for key, img in frames.items():
-            get_writer(key, img.shape[:2]).write(img)
-            write_count += 1
-            if write_count % 100 == 0:
-                logging.info(f"[Writer] wrote {write_count} frames total")
+        idx, slot, frames = item
+        for ready_slot, ready_frames in reorder.push(idx, (slot, frames)):
+            write(ready_slot, ready_frames)
+        if metrics is not None:
+            metrics.set_reorder_depth(len(reorder))
+    for ready_slot, ready_frames in reorder.flush():
+        write(ready_slot, ready_frames)
+    ring.close()
 
     for key, w in writers.items():
-        w.release()
-        tmp, final = paths[key]
-        try:
-            subprocess.run(['ffmpeg', '-i', str(tmp), '-r', '24', '-c:v', 'libx264', 
-            '-y',  '-loglevel', 'error', str(final)], check=True, 
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError as e:
-            logging.error(f"FFmpeg failed for {key}: {e}")
-        tmp.unlink(missing_ok=True)
+        if w.close():
+            logging.info(f"[Writer] finished {w.path.name}")
     logging.info("[Writer] exiting")
 
 # === DYNAMIC OBJECT EXTRACTION (RDS-HQ FORMAT) ===
@@ -345,31 +625,75 @@ def extract_dynamic_objects_data(world, ego_vehicle_id=None):
 
     return objects_data
 
-def export_dynamic_objects_data(dynamic_frames, session_id, output_dir):
-    objects_dir = output_dir / "all_object_info"
-    objects_dir.mkdir(parents=True, exist_ok=True)
+# === RDS-HQ TAR SERIALIZATION ===
+def add_bytes_to_tar(tar: tarfile.TarFile, arcname: str, data: bytes):
+    """Add an in-memory file to an open tar archive, as tar.add would for a regular file."""
+    info = tarfile.TarInfo(arcname)
+    info.size = len(data)
+    info.mode = 0o644
+    info.mtime = time.time()
+    tar.addfile(info, io.BytesIO(data))
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
 
-        json_files = []
-        for frame_idx, frame_data in enumerate(dynamic_frames):
-            filename = f"{session_id}.{frame_idx:06d}.all_object_info.json"
-            json_file = temp_path / filename
+def npy_bytes(array) -> bytes:
+    """Serialize an array exactly as np.save writes it to a .npy file."""
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
 
-            with open(json_file, 'w') as f:
-                json.dump(frame_data, f, separators=(',', ':'))  # Compact format
 
-            json_files.append((filename, str(json_file)))
+def dynamic_objects_member(session_id, frame_idx, frame_data) -> Tuple[str, bytes]:
+    filename = f"{session_id}.{frame_idx:06d}.all_object_info.json"
+    return filename, json.dumps(frame_data, separators=(',', ':')).encode('utf-8')  # Compact format
 
-        tar_filename = f"{session_id}.tar"
-        tar_path = objects_dir / tar_filename
 
-        with tarfile.open(tar_path, 'w') as tar:
-            for filename, filepath in json_files:
-                tar.add(filepath, arcname=filename)
+def camera_pose_member(session_id, frame_idx, pose_matrix) -> Tuple[str, bytes]:
+    filename = f"{session_id}.{frame_idx:06d}.pose.rds_hq.npy"
+    return filename, npy_bytes(pose_matrix)
 
-        return True
+
+class TarStream:
+    """
+    Tar archive filled one member at a time.
+
+    The archive is written to a temporary name next to its final path and only renamed
+    into place by close(), so an interrupted export never leaves a truncated tar behind.
+    Nothing is created on disk until the first member is added.
+    """
+    def __init__(self, tar_path: Path):
+        self.tar_path = Path(tar_path)
+        self.tmp_path = self.tar_path.with_name(self.tar_path.name + '.partial')
+        self.count = 0
+        self._tar = None
+
+    def add(self, arcname: str, data: bytes):
+        if self._tar is None:
+            self.tar_path.parent.mkdir(parents=True, exist_ok=True)
+            self._tar = tarfile.open(self.tmp_path, 'w')
+        add_bytes_to_tar(self._tar, arcname, data)
+        self.count += 1
+
+    def close(self, keep: bool = True):
+        if self._tar is None:
+            return
+        self._tar.close()
+        self._tar = None
+        if keep:
+            os.replace(self.tmp_path, self.tar_path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def export_dynamic_objects_data(dynamic_frames, session_id, output_dir):
+    objects_dir = output_dir / "all_object_info"
+    objects_dir.mkdir(parents=True, exist_ok=True)
+
+    tar_path = objects_dir / f"{session_id}.tar"
+    with tarfile.open(tar_path, 'w') as tar:
+        for frame_idx, frame_data in enumerate(dynamic_frames):
+            add_bytes_to_tar(tar, *dynamic_objects_member(session_id, frame_idx, frame_data))
+
+    return True
 
 def extract_camera_poses(world, frame_number, camera_sensor=None):
     if camera_sensor is None:
@@ -407,27 +731,107 @@ def export_camera_pose_data(pose_frames, session_id, output_dir):
     pose_dir = output_dir / "pose"
     pose_dir.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-
-        npy_files = []
+    tar_path = pose_dir / f"{session_id}.tar"
+    exported = 0
+    with tarfile.open(tar_path, 'w') as tar:
         for frame_idx, pose_matrix in enumerate(pose_frames):
             if pose_matrix is not None:
-                filename = f"{session_id}.{frame_idx:06d}.pose.rds_hq.npy"
-                npy_file = temp_path / filename
+                add_bytes_to_tar(tar, *camera_pose_member(session_id, frame_idx, pose_matrix))
+                exported += 1
+
+    logging.info(f"Exported {exported} frames of camera pose data to {tar_path}")
+    return True
+
+
+def rds_hq_writer_worker(frame_q: mp.Queue, result_q: mp.Queue, session_id: str, rds_hq_dir: Path):
+    """
+    Stream the per-frame RDS-HQ data into the all_object_info and pose tar archives.
+
+    Receives (frame_idx, objects_data, pose_matrix) tuples until None and answers on
+    result_q with (dynamic_frames, pose_frames, error).
+    """
+    logging.info("[RDS-HQ Writer] starting")
+    objects_tar = TarStream(rds_hq_dir / "all_object_info" / f"{session_id}.tar")
+    pose_tar = TarStream(rds_hq_dir / "pose" / f"{session_id}.tar")
+    error = None
+    try:
+        while True:
+            item = frame_q.get()
+            if item is None:
+                break
+            frame_idx, objects_data, pose_matrix = item
+            objects_tar.add(*dynamic_objects_member(session_id, frame_idx, objects_data))
+            if pose_matrix is not None:
+                pose_tar.add(*camera_pose_member(session_id, frame_idx, pose_matrix))
+    except Exception as e:
+        logging.error(f"[RDS-HQ Writer] failed: {e}")
+        logging.error(f"Full traceback: {traceback.format_exc()}")
+        error = str(e)
+    finally:
+        objects_tar.close(keep=error is None)
+        pose_tar.close(keep=error is None)
+    result_q.put((objects_tar.count, pose_tar.count, error))
+    logging.info(f"[RDS-HQ Writer] exiting after {objects_tar.count} frames")
 
-                np.save(npy_file, pose_matrix)
-                npy_files.append((filename, str(npy_file)))
 
-        tar_filename = f"{session_id}.tar"
-        tar_path = pose_dir / tar_filename
+class RdsHqFrameWriter:
+    """
+    Background process writing the dynamic objects and camera pose of every frame into
+    the RDS-HQ tar archives while the replay is running.
 
-        with tarfile.open(tar_path, 'w') as tar:
-            for filename, filepath in npy_files:
-                tar.add(filepath, arcname=filename)
+    Frames are serialized straight into the archives, so neither the whole clip is held
+    in memory nor a temporary file is written per frame. The bounded queue applies
+    back-pressure to the replay loop if the disk falls behind.
+    """
+    def __init__(self, session_id: str, rds_hq_dir: Path, max_queued_frames: int = 256):
+        self.frame_count = 0
+        self.result = None
+        self._frame_q = mp.Queue(maxsize=max_queued_frames)
+        self._result_q = mp.Queue()
+        self._process = mp.Process(
+            target=rds_hq_writer_worker,
+            args=(self._frame_q, self._result_q, session_id, Path(rds_hq_dir)),
+            name="RdsHqWriter",
+            daemon=True
+        )
+        self._process.start()
 
-        logging.info(f"Exported {len(npy_files)} frames of camera pose data to {tar_path}")
-        return True
+    def _put(self, item):
+        while True:
+            try:
+                self._frame_q.put(item, timeout=1.0)
+                return
+            except Exception:
+                if not self._process.is_alive():
+                    raise RuntimeError("RDS-HQ writer process exited unexpectedly")
+
+    def add_frame(self, objects_data, pose_matrix):
+        """Queue the data of the next frame. Frames are numbered in the order they are added."""
+        if self.result is not None:
+            raise RuntimeError("RDS-HQ writer is closed")
+        self._put((self.frame_count, objects_data, pose_matrix))
+        self.frame_count += 1
+
+    def close(self) -> Tuple[int, int]:
+        """
+        Flush the queued frames and finalize the archives.
+
+        Returns:
+            Tuple: (dynamic_frames, pose_frames) number of frames written to each archive
+        """
+        if self.result is None:
+            self._put(None)
+            while self.result is None:
+                try:
+                    self.result = self._result_q.get(timeout=1.0)
+                except Exception:
+                    if not self._process.is_alive():
+                        self.result = (0, 0, "RDS-HQ writer process exited unexpectedly")
+            self._process.join()
+        dynamic_count, pose_count, error = self.result
+        if error is not None:
+            raise RuntimeError(error)
+        return dynamic_count, pose_count
 
 # === CAMERA INTRINSICS EXPORT ===
 def extract_camera_instrinsics_pinhole(sensor, sensor_config=None):
@@ -489,26 +893,20 @@ def export_camera_intrinsincs_pinhole(K, width, height, session_id, output_dir):
     pinhole_dir = output_dir / "pinhole_intrinsic"
     pinhole_dir.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-
-        # PinholeCamera expects [fx, fy, cx, cy, w, h]
-        intrinsic_data = np.array([
-            K[0,0],    # fx
-            K[1,1],    # fy
-            K[0,2],    # cx
-            K[1,2],    # cy
-            width,     # w
-            height     # h
-        ], dtype=np.float32)
-
-        filename = f"{session_id}.pinhole_intrinsic.rds_hq.npy"
-        npy_file = temp_path / filename
-        np.save(npy_file, intrinsic_data)
+    # PinholeCamera expects [fx, fy, cx, cy, w, h]
+    intrinsic_data = np.array([
+        K[0,0],    # fx
+        K[1,1],    # fy
+        K[0,2],    # cx
+        K[1,2],    # cy
+        width,     # w
+        height     # h
+    ], dtype=np.float32)
 
-        tar_path = pinhole_dir / f"{session_id}.tar"
-        with tarfile.open(tar_path, 'w') as tar:
-            tar.add(npy_file, arcname=filename)
+    filename = f"{session_id}.pinhole_intrinsic.rds_hq.npy"
+    tar_path = pinhole_dir / f"{session_id}.tar"
+    with tarfile.open(tar_path, 'w') as tar:
+        add_bytes_to_tar(tar, filename, npy_bytes(intrinsic_data))
 
     logging.info(f"Exported pinhole camera intrinsics to {tar_path}")
 
@@ -600,15 +998,10 @@ def export_camera_intrinsics_ftheta(cx, cy, width, height, poly, is_bw_poly, lin
         *linear_cde
     ], dtype=np.float32)
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        filename = f"{session_id}.ftheta_intrinsic.rds_hq.npy"
-        npy_file = temp_path / filename
-        np.save(npy_file, intrinsic_data)
-
-        tar_path = ftheta_dir / f"{session_id}.tar"
-        with tarfile.open(tar_path, 'w') as tar:
-            tar.add(npy_file, arcname=filename)
+    filename = f"{session_id}.ftheta_intrinsic.rds_hq.npy"
+    tar_path = ftheta_dir / f"{session_id}.tar"
+    with tarfile.open(tar_path, 'w') as tar:
+        add_bytes_to_tar(tar, filename, npy_bytes(intrinsic_data))
 
     logging.info(f"Exported f-theta intrinsics: {int(width)}x{int(height)}")
     return True
@@ -764,16 +1157,27 @@ def render_hdmap_video(session_id, rds_hq_dir, output_dir, camera_type='pinhole'
 
 
 # === RDS-HQ EXPORT ===
-def export_rds_hq_clip(world, args, log_frames, log_duration, dynamic_frames=None, pose_frames=None, camera_intrinsics=None):
-    rds_hq_dir = Path(args.output_dir) / "rds-hq"
-    rds_hq_dir.mkdir(parents=True, exist_ok=True)
-
+def get_rds_hq_session_id(args, log_duration):
     log_file_base = Path(args.recorder_filename).stem
     log_file_base_sanitized = log_file_base.replace('.', '_')
 
     start_time_us = int(args.start * 1000000)
     end_time_us = int((args.start + (args.duration if args.duration > 0 else log_duration)) * 1000000)
-    session_id = f"{log_file_base_sanitized}_{start_time_us}_{end_time_us}"
+    return f"{log_file_base_sanitized}_{start_time_us}_{end_time_us}"
+
+
+def export_rds_hq_clip(world, args, log_frames, log_duration, frame_writer=None, camera_intrinsics=None):
+    """
+    Export the static map elements, camera intrinsics, metadata and dataset config of the clip.
+
+    The per-frame dynamic objects and camera poses are streamed by frame_writer (an
+    RdsHqFrameWriter) during the replay, this closes it once the static elements are
+    exported so both are written in parallel.
+    """
+    rds_hq_dir = Path(args.output_dir) / "rds-hq"
+    rds_hq_dir.mkdir(parents=True, exist_ok=True)
+
+    session_id = get_rds_hq_session_id(args, log_duration)
 
     logging.info(f"Exporting RDS-HQ clip with session ID: {session_id}")
     logging.info(f"Output directory: {rds_hq_dir}")
@@ -830,27 +1234,21 @@ def export_rds_hq_clip(world, args, log_frames, log_duration, dynamic_frames=Non
                 except Exception as e:
                     logging.error(f"Failed to create tar archive for {dir_path.name}: {e}")
 
-        if dynamic_frames:
+        dynamic_frame_count = 0
+        if frame_writer is not None:
             try:
-                actual_frame_count = len(dynamic_frames)
-                calculated_fps = actual_frame_count / (args.duration if args.duration > 0 else log_duration)
-                logging.info(f"Exporting {actual_frame_count} frames of dynamic objects (calculated fps: {calculated_fps:.2f})...")
-                if export_dynamic_objects_data(dynamic_frames, session_id, rds_hq_dir):
+                logging.info(f"Finalizing {frame_writer.frame_count} streamed frames of dynamic objects and camera poses...")
+                dynamic_frame_count, pose_frame_count = frame_writer.close()
+                clip_duration = args.duration if args.duration > 0 else log_duration
+                if dynamic_frame_count:
+                    logging.info(f"Exported {dynamic_frame_count} frames of dynamic objects (calculated fps: {dynamic_frame_count / clip_duration:.2f})")
                     successful_exports.append("dynamic_objects")
-            except Exception as e:
-                logging.error(f"Failed to export dynamic objects: {e}")
-                failed_exports.append(("dynamic_objects", str(e)))
-
-        if pose_frames:
-            try:
-                actual_frame_count = len(pose_frames)
-                calculated_fps = actual_frame_count / (args.duration if args.duration > 0 else log_duration)
-                logging.info(f"Exporting {actual_frame_count} frames of camera pose data (calculated fps: {calculated_fps:.2f})...")
-                if export_camera_pose_data(pose_frames, session_id, rds_hq_dir):
+                if pose_frame_count:
+                    logging.info(f"Exported {pose_frame_count} frames of camera pose data (calculated fps: {pose_frame_count / clip_duration:.2f})")
                     successful_exports.append("camera_poses")
             except Exception as e:
-                logging.error(f"Failed to export camera poses: {e}")
-                failed_exports.append(("camera_poses", str(e)))
+                logging.error(f"Failed to export dynamic objects and camera poses: {e}")
+                failed_exports.append(("dynamic_objects", str(e)))
 
         if camera_intrinsics:
             try:
@@ -871,7 +1269,7 @@ def export_rds_hq_clip(world, args, log_frames, log_duration, dynamic_frames=Non
                 failed_exports.append(("camera_intrinsics", str(e)))
 
         # Create metadata file with actual exported frame counts
-        actual_exported_frames = len(dynamic_frames) if dynamic_frames else 0
+        actual_exported_frames = dynamic_frame_count
         actual_duration = args.duration if args.duration > 0 else log_duration
         actual_fps = actual_exported_frames / actual_duration if actual_duration > 0 else 0
 
@@ -950,7 +1348,19 @@ def main():
     parser.add_argument('--move-spectator', action='store_true')
     parser.add_argument('--spawn-sensors', action='store_true')
     parser.add_argument('--num-post-workers', type=int, default=max(1, mp.cpu_count()-1))
+    parser.add_argument('--frame-slots', type=int, default=0,
+                        help='Frames in flight between capture and video writing (default: 2 * post workers + 4)')
+    parser.add_argument('--metrics-interval', type=int, default=100,
+                        help='Log queue depths and per-stage throughput every N frames, 0 disables (default: 100)')
     parser.add_argument('--skip-render-hdmap', action='store_true', help='Skip automatic HD map video rendering')
+    parser.add_argument('--video-codec', choices=['libx264', 'ffv1'], default='libx264',
+                        help='Encoder of the AOV videos, ffv1 is lossless and written as .mkv (default: libx264)')
+    parser.add_argument('--label-video-codec', choices=['libx264', 'ffv1'], default=None,
+                        help='Encoder of the segmentation videos (default: --video-codec)')
+    parser.add_argument('--x264-preset', type=str, default='medium', help='libx264 preset (default: medium)')
+    parser.add_argument('--x264-crf', type=int, default=23, help='libx264 constant rate factor (default: 23)')
+    parser.add_argument('--video-fps', type=float, default=24.0,
+                        help='Frame rate of the AOV videos, 0 keeps the recording frame rate (default: 24)')
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -959,6 +1369,13 @@ def main():
     )
     logging.info("Starting CarlaCosmos-DataAcquisition with RDS-HQ export")
 
+    if shutil.which('ffmpeg') is None:
+        parser.error("ffmpeg not found on PATH, it is required to encode the AOV videos")
+    encoder = EncoderSettings(args.video_codec, args.x264_preset, args.x264_crf, args.video_fps)
+    label_encoder = EncoderSettings(
+        args.label_video_codec or args.video_codec, args.x264_preset, args.x264_crf, args.video_fps
+    )
+
     if args.class_filter_config:
         load_class_filter_config(args.class_filter_config)
 
@@ -1027,13 +1444,28 @@ def main():
         sensor_info.config_entry = entry  # Store config for ftheta parameter extraction
         sensor_infos.append(sensor_info)
 
-    raw_q = mp.Queue()
-    proc_q = mp.Queue()
+    # Sensor images and post-processed images live in shared memory slots, the queues
+    # only carry slot numbers and region names
+    regions = {f"sensor_{i}": si.shape for i, si in enumerate(sensor_infos)}
+    regions.update(processed_frame_regions({si.sensor_type: si.shape for si in sensor_infos}))
+    num_slots = args.frame_slots if args.frame_slots > 0 else 2 * args.num_post_workers + 4
+    ring = FrameRing(regions, num_slots)
+    for i, si in enumerate(sensor_infos):
+        si.attach(ring, f"sensor_{i}")
+    free_q = mp.Queue()
+    for slot in range(num_slots):
+        free_q.put(slot)
+    logging.info(f"Frame ring: {num_slots} slots of {ring.slot_bytes / 2**20:.1f} MiB")
+
+    # Bounded like the ring: a slow stage blocks the replay loop instead of growing the queues
+    raw_q = mp.Queue(maxsize=num_slots)
+    proc_q = mp.Queue(maxsize=num_slots)
+    metrics = PipelineMetrics()
     workers = []
     for i in range(args.num_post_workers):
         p = mp.Process(
             target=post_processing_worker,
-            args=(raw_q, proc_q),
+            args=(raw_q, proc_q, ring.spec(), metrics),
             name=f"PostProc-{i}"
         )
         p.start(); workers.append(p)
@@ -1042,7 +1474,7 @@ def main():
     out_dir.mkdir(parents=True, exist_ok=True)
     writer = mp.Process(
         target=video_writer_worker,
-        args=(proc_q, out_dir, fps),
+        args=(proc_q, out_dir, fps, ring.spec(), free_q, encoder, label_encoder, metrics),
         name="Writer"
     )
     writer.start()
@@ -1050,8 +1482,6 @@ def main():
     timestamp = args.start
     total = log_duration if args.duration == 0.0 else args.duration
     frame_count = 0
-    dynamic_frames = []
-    pose_frames = []
 
     # Find RDS-HQ sensor and extract camera intrinsics
     camera_intrinsics = None
@@ -1070,48 +1500,65 @@ def main():
     else:
         logging.info("No RDS-HQ sensor found - skipping RDS-HQ export")
 
+    rds_hq_writer = None
+    if rds_hq_sensor:
+        session_id = get_rds_hq_session_id(args, log_duration)
+        rds_hq_writer = RdsHqFrameWriter(session_id, Path(args.output_dir) / "rds-hq")
+
     try:
         while timestamp < args.start + total:
+            wait_start = time.perf_counter()
+            try:
+                slot = free_q.get(timeout=60.0)
+            except queue.Empty:
+                raise RuntimeError("No free frame slot for 60 s, the post-processing or writer process is stuck")
+            capture_start = time.perf_counter()
+            metrics.record_stall(capture_start - wait_start)
+            # In synchronous mode the tick advances the simulation by exactly one frame
+            expected_frame = world.get_snapshot().frame + 1
+            for si in sensor_infos:
+                si.expect(slot, expected_frame)
             idx = world.tick()
+            if idx != expected_frame:
+                logging.warning(f"Tick returned frame {idx}, expected {expected_frame}")
+                for si in sensor_infos:
+                    si.expect(slot, idx)
 
             # Collect RDS-HQ data (dynamic objects and camera poses)
             if rds_hq_sensor:
                 dynamic_objects = extract_dynamic_objects_data(world, args.camera)
-                dynamic_frames.append(dynamic_objects)
-
                 camera_pose = extract_camera_poses(world, frame_count, rds_hq_sensor.sensor)
-                pose_frames.append(camera_pose)
+                rds_hq_writer.add_frame(dynamic_objects, camera_pose)
 
             frame_dict = {}
             for si in sensor_infos:
-                res = si.capture_current_frame()
+                res = si.capture_current_frame(idx)
                 if res:
-                    img,_,_ = res
-                    frame_dict[si.sensor_type] = img
-            raw_q.put(FrameBundle(idx, frame_dict, timestamp))
+                    frame_dict[si.sensor_type] = si.region
+            metrics.record('capture', time.perf_counter() - capture_start)
+            raw_q.put(FrameBundle(frame_count, frame_dict, timestamp, slot, idx))
 
             frame_count += 1
             if frame_count % 100 == 0:
-                rds_frames_collected = len(dynamic_frames)
+                rds_frames_collected = rds_hq_writer.frame_count if rds_hq_writer else 0
                 logging.info(f"Queued frame {frame_count}, timestamp={timestamp:.3f}, idx={idx}, RDS-HQ frames={rds_frames_collected}")
+            if args.metrics_interval > 0 and frame_count % args.metrics_interval == 0:
+                logging.info("Pipeline: " + metrics.report({
+                    'raw': queue_depth(raw_q), 'processed': queue_depth(proc_q), 'free_slots': queue_depth(free_q)
+                }))
             timestamp += log_delta
     finally:
         for _ in workers: raw_q.put(None)
         for p in workers: p.join()
         proc_q.put(None); writer.join()
+        logging.info("Pipeline (final frames): " + metrics.report({'raw': 0, 'processed': 0, 'free_slots': queue_depth(free_q)}))
 
         # Export RDS-HQ data and optionally render HD map video
         if rds_hq_sensor:
-            export_rds_hq_clip(world, args, log_frames, log_duration, dynamic_frames, pose_frames, camera_intrinsics)
+            export_rds_hq_clip(world, args, log_frames, log_duration, rds_hq_writer, camera_intrinsics)
 
             if not args.skip_render_hdmap:
                 rds_hq_dir = Path(args.output_dir) / "rds-hq"
-                log_file_base = Path(args.recorder_filename).stem
-                log_file_base_sanitized = log_file_base.replace('.', '_')
-                start_time_us = int(args.start * 1000000)
-                end_time_us = int((args.start + (args.duration if args.duration > 0 else log_duration)) * 1000000)
-                session_id = f"{log_file_base_sanitized}_{start_time_us}_{end_time_us}"
-
                 camera_type = camera_intrinsics[0] if camera_intrinsics else 'pinhole'
                 render_hdmap_video(session_id, rds_hq_dir, Path(args.output_dir), camera_type)
             else:
@@ -1122,6 +1569,8 @@ def main():
         client.stop_replayer(keep_actors=False)
         for si in sensor_infos: si.sensor.stop(); si.sensor.destroy()
         settings.synchronous_mode = False; settings.fixed_delta_seconds = None; world.apply_settings(settings)
+        for si in sensor_infos: si.attach(None, None)
+        ring.close()
 
 if __name__ == '__main__':
     main()
@@ -13,6 +13,12 @@ import gradio_client.utils as gradio_utils
 from loguru import logger
 import shutil
 import random
+import copy
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 
 
 def validate_specs(config_data):
@@ -113,6 +119,92 @@ def extract_options(config_data):
     }
     return options
 
+
+# Config keys of the videos uploaded with a request: (control name, key), control None for top level keys
+VIDEO_FIELDS: typing.Tuple[typing.Tuple[typing.Optional[str], str], ...] = (
+    (None, 'input_video_path'),
+    ('edge', 'input_control'),
+    ('depth', 'input_control'),
+    ('seg', 'input_control'),
+    ('vis', 'input_control'),
+)
+
+
+def _get_specs(config_data: dict) -> dict:
+    # Support nested or flat schema
+    if 'controlnet_specs' in config_data and isinstance(config_data['controlnet_specs'], dict):
+        return config_data['controlnet_specs']
+    return config_data
+
+
+def _get_video_paths(specs: dict) -> typing.Dict[typing.Tuple[typing.Optional[str], str], str]:
+    """Local video paths referenced by the specs, keyed by their VIDEO_FIELDS entry."""
+    videos = {}
+    for control, key in VIDEO_FIELDS:
+        container = specs if control is None else specs.get(control)
+        if isinstance(container, dict) and container.get(key):
+            videos[(control, key)] = container[key]
+    return videos
+
+
+def _parse_upload_result(upload_result: typing.Any) -> str:
+    try:
+        obj: typing.Any = upload_result
+        if isinstance(obj, str):
+            obj = json.loads(obj)
+        if isinstance(obj, dict) and "path" in obj:
+            return typing.cast(str, obj["path"])
+        if isinstance(obj, (list, tuple)):
+            for item in obj:
+                if isinstance(item, dict) and "path" in item:
+                    return typing.cast(str, item["path"])
+        raise ValueError(f"Unexpected upload result format: {repr(upload_result)[:200]}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to parse upload result: {e}")
+
+
+def _extract_video_path_from_generate_result(generate_result: typing.Any) -> str:
+    # Common cases: list → first item dict with key 'video'; or path string
+    if isinstance(generate_result, (list, tuple)):
+        for item in generate_result:
+            if isinstance(item, dict) and "video" in item:
+                return typing.cast(str, item["video"])
+            if isinstance(item, str) and item.lower().endswith(".mp4"):
+                return item
+    if isinstance(generate_result, dict) and "video" in generate_result:
+        return typing.cast(str, generate_result["video"])
+    if isinstance(generate_result, str) and generate_result.lower().endswith(".mp4"):
+        return generate_result
+    raise RuntimeError(f"Unexpected generate result format: {repr(generate_result)[:200]}")
+
+
+# Wording of the generate_video errors about files that are not on the server
+MISSING_FILE_MARKERS = ("does not exist", "no such file", "not found")
+
+
+def _find_missing_uploads(generate_result: typing.Any, uploads: typing.Dict[str, str]) -> typing.List[str]:
+    """
+    Local paths of the uploads a generate_video result reports missing on the server.
+
+    The server answers errors as status text next to an empty video. If the text names
+    remote paths, their files are missing, otherwise all uploads are suspect.
+    """
+    items = generate_result if isinstance(generate_result, (list, tuple)) else [generate_result]
+    messages = [item for item in items if isinstance(item, str) and not item.lower().endswith(".mp4")]
+    text = "\n".join(messages)
+    if not any(marker in text.lower() for marker in MISSING_FILE_MARKERS):
+        return []
+    named = [local_path for local_path, remote_path in uploads.items() if remote_path in text]
+    return named or list(uploads)
+
+
+def _upload_file(client: gradio_client.Client, local_path: str, **retry_kwargs) -> str:
+    """Upload a local file (with retries) and return its path on the server."""
+    file_descriptor = gradio_utils.handle_file(local_path)
+    upload_file_result = _submit_with_retry(client, file_descriptor, api_name="/upload_file", **retry_kwargs)
+    return _parse_upload_result(upload_file_result)
+
+
 def _async_with_upload_example(
     url: str,
     config_data: dict,
@@ -123,6 +215,11 @@ def _async_with_upload_example(
     jitter_seconds: float = 0.5,
     poll_interval_seconds: int = 5,
     result_timeout_seconds: int = 120,
+    client: typing.Optional[gradio_client.Client] = None,
+    upload_file: typing.Optional[typing.Callable[[str], str]] = None,
+    invalidate_upload: typing.Optional[typing.Callable[[str], None]] = None,
+    is_cached_upload: typing.Optional[typing.Callable[[str], bool]] = None,
+    job_name: typing.Optional[str] = None,
 ):
     """
     Asynchronous inference using config data. Uploads input/edge/depth/seg/vis videos from
@@ -133,175 +230,80 @@ def _async_with_upload_example(
     - wait_for_job(upload_job) -> remote_path
     - client.submit(request_json, api_name="/generate_video") -> async job
     - wait_for_job() -> local_video_path
+
+    A shared client and an upload_file function (local path -> remote path), e.g. one
+    deduplicating uploads, can be passed in when several requests are run. If the server
+    reports uploaded files as missing, they and all uploads is_cached_upload reports as
+    reused from an earlier run are passed to invalidate_upload, uploaded again and the
+    request is submitted once more, until no file is missing or every upload was retried.
+    A request using cached uploads that fails in any other way is retried without them.
     """
 
     logger.info("--------------------------------")
     logger.info("Asynchronous inference with config data + local file uploads")
 
-    client = gradio_client.Client(url)
-
-    # Extract paths from config (support nested or flat schema)
-    if 'controlnet_specs' in config_data and isinstance(config_data['controlnet_specs'], dict):
-        specs = config_data['controlnet_specs']
-    else:
-        specs = config_data
-
-    input_video_path = specs.get('input_video_path')
-    edge_video = specs.get('edge', {}).get('input_control') if isinstance(specs.get('edge'), dict) else None
-    depth_video = specs.get('depth', {}).get('input_control') if isinstance(specs.get('depth'), dict) else None
-    seg_video = specs.get('seg', {}).get('input_control') if isinstance(specs.get('seg'), dict) else None
-    vis_video = specs.get('vis', {}).get('input_control') if isinstance(specs.get('vis'), dict) else None
-
-    # Helpers for parsing results
-    def _parse_upload_result(upload_result: typing.Any) -> str:
-        try:
-            obj: typing.Any = upload_result
-            if isinstance(obj, str):
-                obj = json.loads(obj)
-            if isinstance(obj, dict) and "path" in obj:
-                return typing.cast(str, obj["path"])
-            if isinstance(obj, (list, tuple)):
-                for item in obj:
-                    if isinstance(item, dict) and "path" in item:
-                        return typing.cast(str, item["path"])
-            raise ValueError(f"Unexpected upload result format: {repr(upload_result)[:200]}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to parse upload result: {e}")
-
-    def _extract_video_path_from_generate_result(generate_result: typing.Any) -> str:
-        # Common cases: list → first item dict with key 'video'; or path string
-        if isinstance(generate_result, (list, tuple)):
-            for item in generate_result:
-                if isinstance(item, dict) and "video" in item:
-                    return typing.cast(str, item["video"])
-                if isinstance(item, str) and item.lower().endswith(".mp4"):
-                    return item
-        if isinstance(generate_result, dict) and "video" in generate_result:
-            return typing.cast(str, generate_result["video"])
-        if isinstance(generate_result, str) and generate_result.lower().endswith(".mp4"):
-            return generate_result
-        raise RuntimeError(f"Unexpected generate result format: {repr(generate_result)[:200]}")
-
-    # Upload input video (with retries)
-    file_descriptor = gradio_utils.handle_file(input_video_path)
-    upload_file_result = _submit_with_retry(
-        client,
-        file_descriptor,
-        api_name="/upload_file",
-        max_retries=retry_max_retries,
-        backoff_initial_seconds=backoff_initial_seconds,
-        backoff_multiplier=backoff_multiplier,
-        jitter_seconds=jitter_seconds,
-        poll_interval_seconds=poll_interval_seconds,
-        result_timeout_seconds=result_timeout_seconds,
-    )
-    remote_input_path = _parse_upload_result(upload_file_result)
-    logger.info(f"remote_input_path={remote_input_path}")
-
-    # Optionally upload edge and depth control videos
-    remote_edge_path = None
-    remote_depth_path = None
-    remote_vis_path = None
-    remote_seg_path = None
-
-    if edge_video:
-        edge_fd = gradio_utils.handle_file(edge_video)
-        edge_result = _submit_with_retry(
-            client,
-            edge_fd,
-            api_name="/upload_file",
-            max_retries=retry_max_retries,
-            backoff_initial_seconds=backoff_initial_seconds,
-            backoff_multiplier=backoff_multiplier,
-            jitter_seconds=jitter_seconds,
-            poll_interval_seconds=poll_interval_seconds,
-            result_timeout_seconds=result_timeout_seconds,
-        )
-        remote_edge_path = _parse_upload_result(edge_result)
-        logger.info(f"remote_edge_path={remote_edge_path}")
-
-    if depth_video:
-        depth_fd = gradio_utils.handle_file(depth_video)
-        depth_result = _submit_with_retry(
-            client,
-            depth_fd,
-            api_name="/upload_file",
-            max_retries=retry_max_retries,
-            backoff_initial_seconds=backoff_initial_seconds,
-            backoff_multiplier=backoff_multiplier,
-            jitter_seconds=jitter_seconds,
-            poll_interval_seconds=poll_interval_seconds,
-            result_timeout_seconds=result_timeout_seconds,
-        )
-        remote_depth_path = _parse_upload_result(depth_result)
-        logger.info(f"remote_depth_path={remote_depth_path}")
-
-    if seg_video:
-        seg_fd = gradio_utils.handle_file(seg_video)
-        seg_result = _submit_with_retry(
-            client,
-            seg_fd,
-            api_name="/upload_file",
-            max_retries=retry_max_retries,
-            backoff_initial_seconds=backoff_initial_seconds,
-            backoff_multiplier=backoff_multiplier,
-            jitter_seconds=jitter_seconds,
-            poll_interval_seconds=poll_interval_seconds,
-            result_timeout_seconds=result_timeout_seconds,
-        )
-        remote_seg_path = _parse_upload_result(seg_result)
-        logger.info(f"remote_seg_path={remote_seg_path}")
-
-    if vis_video:
-        vis_fd = gradio_utils.handle_file(vis_video)
-        vis_result = _submit_with_retry(
-            client,
-            vis_fd,
-            api_name="/upload_file",
-            max_retries=retry_max_retries,
-            backoff_initial_seconds=backoff_initial_seconds,
-            backoff_multiplier=backoff_multiplier,
-            jitter_seconds=jitter_seconds,
-            poll_interval_seconds=poll_interval_seconds,
-            result_timeout_seconds=result_timeout_seconds,
-        )
-        remote_vis_path = _parse_upload_result(vis_result)
-        logger.info(f"remote_vis_path={remote_vis_path}")
-
-    # Inject remote paths back into specs (nested or flat)
-    specs['input_video_path'] = remote_input_path
-
-    if remote_edge_path is not None:
-        specs.setdefault('edge', {})
-        specs['edge']['input_control'] = remote_edge_path
-
-    if remote_depth_path is not None:
-        specs.setdefault('depth', {})
-        specs['depth']['input_control'] = remote_depth_path
+    if client is None:
+        client = gradio_client.Client(url)
 
-    if remote_seg_path is not None:
-        specs.setdefault('seg', {})
-        specs['seg']['input_control'] = remote_seg_path
-
-    if remote_vis_path is not None:
-        specs.setdefault('vis', {})
-        specs['vis']['input_control'] = remote_vis_path
-
-    request_text = json.dumps(config_data)
-
-    logger.info(f"generate_video_request: {request_text=}")
-    generate_result = _submit_with_retry(
-        client,
-        request_text,
-        api_name="/generate_video",
+    retry_kwargs = dict(
         max_retries=retry_max_retries,
         backoff_initial_seconds=backoff_initial_seconds,
         backoff_multiplier=backoff_multiplier,
         jitter_seconds=jitter_seconds,
         poll_interval_seconds=poll_interval_seconds,
         result_timeout_seconds=result_timeout_seconds,
+        job_name=job_name,
     )
-    local_video_path = _extract_video_path_from_generate_result(generate_result)
+    if upload_file is None:
+        def upload_file(local_path: str) -> str:
+            return _upload_file(client, local_path, **retry_kwargs)
+
+    specs = _get_specs(config_data)
+    local_videos = _get_video_paths(specs)
+
+    max_attempts = len(set(local_videos.values())) + 1
+    for attempt in range(1, max_attempts + 1):
+        # Upload the input video and the optional control videos, then inject the remote
+        # paths back into specs (nested or flat)
+        uploads = {}
+        for (control, key), local_path in local_videos.items():
+            remote_path = uploads[local_path] = upload_file(local_path)
+            logger.info(f"remote_{control or 'input'}_path={remote_path}")
+            if control is None:
+                specs[key] = remote_path
+            else:
+                specs.setdefault(control, {})
+                specs[control][key] = remote_path
+        # Uploads of an earlier run are lost when the server restarts or cleans up
+        cached = [local_path for local_path in uploads if is_cached_upload is not None and is_cached_upload(local_path)]
+
+        request_text = json.dumps(config_data)
+
+        logger.info(f"generate_video_request: {request_text=}")
+        try:
+            generate_result = _submit_with_retry(
+                client,
+                request_text,
+                api_name="/generate_video",
+                **retry_kwargs,
+            )
+            missing = _find_missing_uploads(generate_result, uploads)
+            if not missing or attempt == max_attempts:
+                local_video_path = _extract_video_path_from_generate_result(generate_result)
+                break
+            error = f"server reports uploads missing: {missing}"
+        except Exception as e:
+            # The server may word a missing file differently than MISSING_FILE_MARKERS
+            if not cached or attempt == max_attempts:
+                raise
+            missing, error = [], str(e)
+
+        # The error names only the first missing file, the other cached uploads are as old
+        stale = list(dict.fromkeys(missing + cached))
+        logger.warning(f"Request failed ({error}), uploading again: {stale}")
+        if invalidate_upload is not None:
+            for local_path in stale:
+                invalidate_upload(local_path)
 
     logger.info(f"Local video path (downloaded to local machine): {local_video_path=}")
     return local_video_path
@@ -311,6 +313,7 @@ def _async_wait_for_job(
     job: gradio_client.Job,
     poll_interval_seconds: int = 5,
     result_timeout_seconds: int = 20,
+    job_name: typing.Optional[str] = None,
 ) -> typing.Tuple[gradio_client.StatusUpdate, typing.Any, typing.Optional[Exception]]:
     """
     Waits for a job to complete.
@@ -380,7 +383,7 @@ def _async_wait_for_job(
             parts.append(f"eta={eta_str}")
         parts.append(f"elapsed={elapsed}s")
 
-        logger.info("Waiting for job... " + ", ".join(parts))
+        logger.info(f"Waiting for job{f' {job_name}' if job_name else ''}... " + ", ".join(parts))
         time.sleep(max(1, int(poll_interval_seconds)))
 
     job_status: gradio_client.StatusUpdate = job.status()
@@ -422,6 +425,7 @@ def _submit_with_retry(
     jitter_seconds: float = 0.5,
     poll_interval_seconds: int = 5,
     result_timeout_seconds: int = 120,
+    job_name: typing.Optional[str] = None,
 ) -> typing.Any:
     last_error: typing.Optional[BaseException] = None
     attempts = max(0, int(max_retries)) + 1
@@ -440,6 +444,7 @@ def _submit_with_retry(
             job,
             poll_interval_seconds=poll_interval_seconds,
             result_timeout_seconds=result_timeout_seconds,
+            job_name=job_name,
         )
 
         if error:
@@ -460,11 +465,459 @@ def _submit_with_retry(
     raise RuntimeError(f"Failed to complete request after {attempts} attempts: {details}")
 
 
+# === UPLOAD CACHE ===
+_digest_cache: typing.Dict[typing.Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def _file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, cached as long as its size and modification time do not change."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digest_cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _digest_lock:
+            _digest_cache[key] = digest
+    return digest
+
+
+DEFAULT_UPLOAD_CACHE = Path.home() / ".cache" / "carla_cosmos" / "uploads.json"
+
+
+class UploadCache:
+    """
+    Persistent map of file contents (sha256) to the paths of their uploads on a server.
+
+    Entries are kept per server endpoint and expire ttl_seconds after the upload, so
+    files the server may have cleaned up are uploaded again. The JSON file is re-read
+    before every change and rewritten atomically, so several clients can share it;
+    entries are removed from it once expired for the client that uploaded them.
+    """
+
+    def __init__(self, path: Path, endpoint: str, ttl_seconds: float = 24 * 3600):
+        self.path = Path(path)
+        self.endpoint = endpoint.rstrip('/')
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = self._load().get(self.endpoint, {})
+
+    def _load(self) -> typing.Dict[str, typing.Dict[str, dict]]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('endpoints', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable upload cache {self.path}: {e}")
+            return {}
+
+    def _update(self, digest: str, entry: typing.Optional[dict]) -> None:
+        with self._lock:
+            endpoints = self._load()
+            entries = endpoints.setdefault(self.endpoint, {})
+            if entry is None:
+                entries.pop(digest, None)
+            else:
+                entries[digest] = entry
+            # Drop expired entries of every endpoint while rewriting the file
+            now = time.time()
+            for endpoint in list(endpoints):
+                endpoints[endpoint] = {
+                    key: value for key, value in endpoints[endpoint].items() if value.get('expires_at', 0) > now
+                }
+                if not endpoints[endpoint]:
+                    del endpoints[endpoint]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({'endpoints': endpoints}, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._entries = endpoints.get(self.endpoint, {})
+
+    def get(self, digest: str) -> typing.Optional[str]:
+        """Remote path of an upload of the content, None if unknown or expired."""
+        with self._lock:
+            entry = self._entries.get(digest)
+        if entry is None or time.time() - entry.get('uploaded_at', 0) >= self.ttl_seconds:
+            return None
+        return entry['remote_path']
+
+    def put(self, digest: str, remote_path: str, local_path: str) -> None:
+        uploaded_at = time.time()
+        self._update(digest, {
+            'remote_path': remote_path,
+            'local_path': str(local_path),
+            'uploaded_at': uploaded_at,
+            'expires_at': uploaded_at + self.ttl_seconds,
+        })
+
+    def invalidate(self, digest: str) -> None:
+        self._update(digest, None)
+
+
+class UploadDeduplicator:
+    """
+    Uploads every distinct file content once, however many requests reference it.
+
+    Thread safe: a request needing a file that is being uploaded by another request
+    waits for that upload instead of starting its own. A failed upload is forgotten,
+    and one of the requests waiting for it, or the next request needing the file,
+    uploads it again. With an UploadCache, contents uploaded by earlier runs are not
+    uploaded at all.
+    """
+
+    def __init__(self, client: gradio_client.Client, cache: typing.Optional[UploadCache] = None, **retry_kwargs):
+        self.client = client
+        self.cache = cache
+        self.retry_kwargs = retry_kwargs
+        self.requested = 0
+        self.uploaded = 0
+        self.cached = 0
+        self._uploads: typing.Dict[str, Future] = {}
+        self._cached_digests: typing.Set[str] = set()
+        self._lock = threading.Lock()
+
+    def upload_file(self, local_path: str) -> str:
+        digest = _file_sha256(local_path)
+        with self._lock:
+            self.requested += 1
+        while True:
+            with self._lock:
+                future = self._uploads.get(digest)
+                is_owner = future is None
+                if is_owner:
+                    future = self._uploads[digest] = Future()
+            if is_owner:
+                return self._upload(digest, local_path, future)
+            logger.info(f"Reusing upload of {local_path} (sha256 {digest[:12]})")
+            try:
+                return future.result()
+            except Exception as e:
+                # The failure belongs to the request that uploaded, take the upload over
+                logger.warning(f"Upload of {local_path} by another request failed ({e}), uploading it again")
+
+    def _upload(self, digest: str, local_path: str, future: Future) -> str:
+        remote_path = self.cache.get(digest) if self.cache is not None else None
+        if remote_path is not None:
+            logger.info(f"Skipping upload of {local_path}, cached as {remote_path} (sha256 {digest[:12]})")
+            with self._lock:
+                self.cached += 1
+                self._cached_digests.add(digest)
+            future.set_result(remote_path)
+            return remote_path
+
+        try:
+            remote_path = _upload_file(self.client, local_path, **self.retry_kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._uploads[digest]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self.uploaded += 1
+        if self.cache is not None:
+            self.cache.put(digest, remote_path, local_path)
+        future.set_result(remote_path)
+        return remote_path
+
+    def is_cached(self, local_path: str) -> bool:
+        """Whether the upload of the content of local_path was taken from the UploadCache."""
+        digest = _file_sha256(local_path)
+        with self._lock:
+            return digest in self._cached_digests
+
+    def invalidate(self, local_path: str) -> None:
+        """Forget the upload of the content of local_path, e.g. after the server lost the file."""
+        digest = _file_sha256(local_path)
+        with self._lock:
+            future = self._uploads.get(digest)
+            # An upload in progress is newer than the reported one
+            if future is not None and future.done():
+                del self._uploads[digest]
+                self._cached_digests.discard(digest)
+        if self.cache is not None:
+            self.cache.invalidate(digest)
+
+
+def _submit_retry_kwargs(retry_kwargs: dict) -> dict:
+    """The _submit_with_retry arguments of the _async_with_upload_example retry arguments."""
+    return dict(
+        max_retries=retry_kwargs.get('retry_max_retries', 3),
+        backoff_initial_seconds=retry_kwargs.get('backoff_initial_seconds', 1.5),
+        backoff_multiplier=retry_kwargs.get('backoff_multiplier', 2.0),
+        jitter_seconds=retry_kwargs.get('jitter_seconds', 0.5),
+        poll_interval_seconds=retry_kwargs.get('poll_interval_seconds', 5),
+        result_timeout_seconds=retry_kwargs.get('result_timeout_seconds', 120),
+    )
+
+
+# === BATCH MODE ===
+
+
+class JobLedger:
+    """
+    Resumable record of the jobs of a batch, stored as a JSON file.
+
+    Every job is saved with its status ("running", "done" or "failed"), output,
+    latency and the hash of its request, and the file is rewritten atomically on every
+    change. A rerun skips the jobs that are done with an identical request and whose
+    output still exists.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.jobs: typing.Dict[str, dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.jobs = json.load(f).get('jobs', {})
+
+    def is_done(self, job_id: str, request_hash: str) -> bool:
+        entry = self.jobs.get(job_id, {})
+        return (
+            entry.get('status') == 'done'
+            and entry.get('request_hash') == request_hash
+            and Path(entry.get('output', '')).is_file()
+        )
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self.jobs.setdefault(job_id, {}).update(fields)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'jobs': self.jobs}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    config_path: Path
+    config_data: dict
+    request_hash: str
+    output_path: Path
+
+
+def _collect_config_paths(paths: typing.Sequence[str]) -> typing.List[Path]:
+    """TOML configs of the given files and directories (*.toml, sorted)."""
+    config_paths = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            config_paths.extend(sorted(path.glob('*.toml')))
+        else:
+            config_paths.append(path)
+    return config_paths
+
+
+def _request_hash(config_data: dict) -> str:
+    """Hash of a request, including the content of the videos it uploads."""
+    videos = {
+        f"{control}.{key}": _file_sha256(local_path)
+        for (control, key), local_path in _get_video_paths(_get_specs(config_data)).items()
+    }
+    payload = json.dumps({'config': config_data, 'videos': videos}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _percentile(sorted_values: typing.Sequence[float], percent: float) -> float:
+    # Nearest rank
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-percent * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_batch(
+    endpoint: str,
+    jobs: typing.Sequence[BatchJob],
+    ledger: JobLedger,
+    *,
+    max_in_flight: int = 4,
+    upload_cache: typing.Optional[UploadCache] = None,
+    **retry_kwargs,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Run the generation jobs with up to max_in_flight of them in flight on the server.
+
+    Distinct input and control videos are uploaded once for the whole batch, and not
+    at all if upload_cache knows them from an earlier run.
+
+    Returns:
+        dict: Summary with the counts of done, skipped and failed jobs, the throughput
+        and the latency percentiles of the jobs run
+    """
+    pending = [job for job in jobs if not ledger.is_done(job.job_id, job.request_hash)]
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        logger.info(f"Skipping {skipped} jobs already done according to {ledger.path}")
+
+    client = gradio_client.Client(endpoint)
+    uploads = UploadDeduplicator(client, upload_cache, **_submit_retry_kwargs(retry_kwargs))
+
+    def run_job(job: BatchJob) -> float:
+        attempts = ledger.jobs.get(job.job_id, {}).get('attempts', 0) + 1
+        ledger.update(
+            job.job_id, status='running', config=str(job.config_path), request_hash=job.request_hash,
+            attempts=attempts, started=time.time(), error=None,
+        )
+        start = time.perf_counter()
+        try:
+            local_video_path = _async_with_upload_example(
+                endpoint, job.config_data, client=client, upload_file=uploads.upload_file,
+                invalidate_upload=uploads.invalidate, is_cached_upload=uploads.is_cached, job_name=job.job_id,
+                **retry_kwargs,
+            )
+            job.output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(local_video_path), str(job.output_path))
+        except Exception as e:
+            ledger.update(job.job_id, status='failed', error=str(e), finished=time.time())
+            raise
+        latency = time.perf_counter() - start
+        ledger.update(
+            job.job_id, status='done', output=str(job.output_path), latency_s=round(latency, 3), finished=time.time()
+        )
+        return latency
+
+    latencies: typing.List[float] = []
+    failed: typing.List[str] = []
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="cosmos-job") as executor:
+        futures = {executor.submit(run_job, job): job for job in pending}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            job = futures[future]
+            elapsed = time.perf_counter() - batch_start
+            try:
+                latency = future.result()
+                latencies.append(latency)
+                logger.info(
+                    f"[{finished}/{len(pending)}] {job.job_id} done in {latency:.1f}s -> {job.output_path} "
+                    f"({len(latencies) / elapsed * 60:.2f} jobs/min)"
+                )
+            except Exception as e:
+                failed.append(job.job_id)
+                logger.error(f"[{finished}/{len(pending)}] {job.job_id} failed: {e}")
+
+    wall_seconds = time.perf_counter() - batch_start
+    latencies.sort()
+    summary = {
+        'jobs': len(jobs),
+        'done': len(latencies),
+        'skipped': skipped,
+        'failed': len(failed),
+        'failed_jobs': failed,
+        'wall_seconds': round(wall_seconds, 1),
+        'jobs_per_minute': round(len(latencies) / wall_seconds * 60, 2) if wall_seconds > 0 else 0.0,
+        'latency_p50_s': round(_percentile(latencies, 50), 1),
+        'latency_p95_s': round(_percentile(latencies, 95), 1),
+        'latency_p99_s': round(_percentile(latencies, 99), 1),
+        'latency_max_s': round(latencies[-1], 1) if latencies else 0.0,
+        'uploads': uploads.uploaded,
+        'cached_uploads': uploads.cached,
+        'upload_requests': uploads.requested,
+    }
+    logger.info(
+        f"Batch finished: {summary['done']} done, {summary['skipped']} skipped, {summary['failed']} failed "
+        f"in {summary['wall_seconds']}s ({summary['jobs_per_minute']} jobs/min), latency "
+        f"p50={summary['latency_p50_s']}s p95={summary['latency_p95_s']}s p99={summary['latency_p99_s']}s "
+        f"max={summary['latency_max_s']}s, {summary['uploads']} uploads ({summary['cached_uploads']} cached) "
+        f"for {summary['upload_requests']} videos"
+    )
+    return summary
+
+
+def _apply_overrides(config_data: dict, args: argparse.Namespace, seed: typing.Optional[int] = None) -> None:
+    specs = _get_specs(config_data)
+
+    if args.input_video:
+        specs['input_video_path'] = args.input_video
+        print(f"Overriding input video with: {args.input_video}")
+
+    for control, override in (
+        ('edge', args.edge_video),
+        ('depth', args.depth_video),
+        ('seg', args.seg_video),
+        ('vis', args.vis_video),
+    ):
+        if override:
+            specs.setdefault(control, {})
+            specs[control]['input_control'] = override
+            print(f"Overriding {control} video with: {override}")
+
+    if seed is not None:
+        specs['seed'] = int(seed)
+        print(f"Overriding seed with: {seed}")
+
+
+def _open_upload_cache(args: argparse.Namespace) -> typing.Optional[UploadCache]:
+    if args.no_upload_cache:
+        return None
+    return UploadCache(Path(args.upload_cache), args.endpoint, ttl_seconds=args.upload_cache_ttl * 3600)
+
+
+def main_batch(args: argparse.Namespace, retry_kwargs: dict) -> None:
+    if not args.output:
+        raise SystemExit("--output is required in batch mode, it is the directory the videos are saved to")
+    output_dir = Path(args.output)
+    seeds = args.seeds or ([args.seed] if args.seed else [None])
+    ledger = JobLedger(Path(args.ledger) if args.ledger else output_dir / "cosmos_jobs.json")
+
+    jobs = []
+    invalid = []
+    for config_path in _collect_config_paths(args.config_toml):
+        job_ids = [config_path.stem if seed is None else f"{config_path.stem}_seed_{seed}" for seed in seeds]
+        # An invalid config fails its own jobs, the rest of the batch still runs
+        try:
+            base_config = open_and_validate_config_toml(config_path)
+            config_jobs = []
+            for seed, job_id in zip(seeds, job_ids):
+                config_data = copy.deepcopy(base_config)
+                _apply_overrides(config_data, args, seed)
+                config_jobs.append(BatchJob(
+                    job_id=job_id,
+                    config_path=config_path,
+                    config_data=config_data,
+                    request_hash=_request_hash(config_data),
+                    output_path=output_dir / f"{job_id}.mp4",
+                ))
+        except (ValueError, OSError) as e:
+            logger.error(f"Invalid config {config_path}: {e}")
+            for job_id in job_ids:
+                ledger.update(
+                    job_id, status='failed', config=str(config_path), error=f"Invalid config: {e}", finished=time.time()
+                )
+            invalid.extend(job_ids)
+            continue
+        jobs.extend(config_jobs)
+    if not jobs and not invalid:
+        logger.warning(f"No TOML configs found in {args.config_toml}")
+        return
+
+    failed = len(invalid)
+    if jobs:
+        summary = run_batch(
+            args.endpoint, jobs, ledger, max_in_flight=args.jobs, upload_cache=_open_upload_cache(args), **retry_kwargs
+        )
+        failed += summary['failed']
+    if invalid:
+        logger.error(f"{len(invalid)} jobs failed with an invalid config: {', '.join(invalid)}")
+    if failed:
+        raise SystemExit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Submit and retrieve video processing job")
     parser.add_argument("endpoint", help="Base URL of the FastAPI server (e.g., http://localhost:8080)")
-    parser.add_argument("config_toml", help="Path to the TOML file with processing configuration")
-    parser.add_argument("--output", help="Path to save the result video", default=None)
+    parser.add_argument("config_toml", nargs='+',
+                        help="Path to the TOML file with processing configuration. Several files or directories of "
+                             "TOML files run in batch mode")
+    parser.add_argument("--output", help="Path to save the result video (directory of the videos in batch mode)", default=None)
     # optional overrides
     parser.add_argument("--input-video", help="Override input video path from config", default=None)
     parser.add_argument("--edge-video", help="Override edge control video path from config", default=None)
@@ -479,56 +932,50 @@ def main():
     parser.add_argument("--jitter", type=float, default=0.5, help="Random jitter added to backoff")
     parser.add_argument("--poll-interval", type=int, default=5, help="Polling interval seconds for job status")
     parser.add_argument("--result-timeout", type=int, default=120, help="Timeout seconds when fetching job result")
+    # batch mode
+    parser.add_argument("--batch", action="store_true", help="Run in batch mode even for a single TOML file")
+    parser.add_argument("--seeds", type=int, nargs='+', default=None,
+                        help="Batch mode: run every config once per seed")
+    parser.add_argument("--jobs", type=int, default=4, help="Batch mode: generation jobs kept in flight (default: 4)")
+    parser.add_argument("--ledger", default=None,
+                        help="Batch mode: resumable job ledger (default: <output>/cosmos_jobs.json)")
+    # upload cache
+    parser.add_argument("--upload-cache", default=str(DEFAULT_UPLOAD_CACHE),
+                        help=f"Cache of the remote paths of uploaded videos by content hash (default: {DEFAULT_UPLOAD_CACHE})")
+    parser.add_argument("--upload-cache-ttl", type=float, default=24.0,
+                        help="Hours after which cached uploads are uploaded again (default: 24)")
+    parser.add_argument("--no-upload-cache", action="store_true", help="Upload every video, ignoring the upload cache")
 
     args = parser.parse_args()
 
+    retry_kwargs = dict(
+        retry_max_retries=args.retries,
+        backoff_initial_seconds=args.backoff_initial,
+        backoff_multiplier=args.backoff_multiplier,
+        jitter_seconds=args.jitter,
+        poll_interval_seconds=args.poll_interval,
+        result_timeout_seconds=args.result_timeout,
+    )
+    if args.batch or args.seeds or len(args.config_toml) > 1 or Path(args.config_toml[0]).is_dir():
+        main_batch(args, retry_kwargs)
+        return
+
     # Load and validate the TOML configuration
-    config_data = open_and_validate_config_toml(args.config_toml)
+    config_data = open_and_validate_config_toml(args.config_toml[0])
 
     # Apply video overrides if provided (support nested or flat schema)
-    if 'controlnet_specs' in config_data and isinstance(config_data['controlnet_specs'], dict):
-        specs = config_data['controlnet_specs']
-    else:
-        specs = config_data
-
-    if args.input_video:
-        specs['input_video_path'] = args.input_video
-        print(f"Overriding input video with: {args.input_video}")
-
-    if args.edge_video:
-        specs.setdefault('edge', {})
-        specs['edge']['input_control'] = args.edge_video
-        print(f"Overriding edge video with: {args.edge_video}")
-
-    if args.depth_video:
-        specs.setdefault('depth', {})
-        specs['depth']['input_control'] = args.depth_video
-        print(f"Overriding depth video with: {args.depth_video}")
-
-    if args.seg_video:
-        specs.setdefault('seg', {})
-        specs['seg']['input_control'] = args.seg_video
-        print(f"Overriding seg video with: {args.seg_video}")
-
-    if args.vis_video:
-        specs.setdefault('vis', {})
-        specs['vis']['input_control'] = args.vis_video
-        print(f"Overriding vis video with: {args.vis_video}")
-
-    if args.seed:
-        specs.setdefault('seed', {})
-        specs['seed'] = int(args.seed)
-        print(f"Overriding seed with: {args.seed}")
+    _apply_overrides(config_data, args, args.seed)
 
+    client = gradio_client.Client(args.endpoint)
+    uploads = UploadDeduplicator(client, _open_upload_cache(args), **_submit_retry_kwargs(retry_kwargs))
     local_video_path = _async_with_upload_example(
         args.endpoint,
         config_data,
-        retry_max_retries=args.retries,
-        backoff_initial_seconds=args.backoff_initial,
-        backoff_multiplier=args.backoff_multiplier,
-        jitter_seconds=args.jitter,
-        poll_interval_seconds=args.poll_interval,
-        result_timeout_seconds=args.result_timeout,
+        client=client,
+        upload_file=uploads.upload_file,
+        invalidate_upload=uploads.invalidate,
+        is_cached_upload=uploads.is_cached,
+        **retry_kwargs,
     )
 
     if not local_video_path:
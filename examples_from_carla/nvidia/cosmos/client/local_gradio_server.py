@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Local CARLA-Cosmos-Transfer1 Server Stand-in
+
+A small HTTP server speaking the parts of the Gradio API (protocol sse_v3) used by
+cosmos_client.py, so the client can be run and tested without a GPU or the server
+container:
+
+- upload_file: Stores an uploaded file in the uploads directory and answers its path
+- generate_video: Checks that the input and control videos of the request exist on the
+  server and answers a placeholder video after a configurable latency, or an error
+  naming the missing file like the real server
+
+Uploads can be given a lifetime after which they are deleted, to test how the client
+handles files that disappeared from the server. The placeholder videos contain the
+request JSON, they are not playable.
+
+Example usage:
+    python local_gradio_server.py --port 8080 --latency 2 --upload-lifetime 600
+    python cosmos_client.py http://localhost:8080 example_data/prompts/rain.toml
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from loguru import logger
+
+API_PREFIX = "/gradio_api"
+HEARTBEAT_SECONDS = 5.0
+# Time without events before the event stream of a session is closed
+STREAM_IDLE_SECONDS = 1.0
+# Delay before an event starts, like the processing loop of the Gradio queue. gradio_client
+# registers an event only after reading the join response, earlier messages get lost
+QUEUE_TICK_SECONDS = 0.05
+
+# Components and dependencies of the app, as found in the config of the real server
+COMPONENTS = [
+    {"id": 1, "type": "file", "props": {"label": "Upload"}},
+    {"id": 2, "type": "textbox", "props": {"label": "Upload status"}},
+    {"id": 3, "type": "textbox", "props": {"label": "Request (JSON)"}},
+    {"id": 4, "type": "video", "props": {"label": "Generated Video"}},
+    {"id": 5, "type": "textbox", "props": {"label": "Status"}},
+]
+DEPENDENCIES = [
+    {"id": 0, "api_name": "upload_file", "inputs": [1], "outputs": [2]},
+    {"id": 1, "api_name": "generate_video", "inputs": [3], "outputs": [4, 5]},
+]
+
+
+def _parameter(label: str, component: str, python_type: str) -> dict:
+    return {
+        "label": label,
+        "parameter_name": label,
+        "parameter_has_default": False,
+        "component": component,
+        "type": {},
+        "python_type": {"type": python_type, "description": ""},
+    }
+
+
+API_INFO = {
+    "named_endpoints": {
+        "/upload_file": {
+            "parameters": [_parameter("file", "File", "filepath")],
+            "returns": [_parameter("upload_status", "Textbox", "str")],
+        },
+        "/generate_video": {
+            "parameters": [_parameter("request_text", "Textbox", "str")],
+            "returns": [_parameter("video", "Video", "dict"), _parameter("status", "Textbox", "str")],
+        },
+    },
+    "unnamed_endpoints": {},
+}
+
+
+def file_data(path: str) -> dict:
+    """FileData of a file on the server, as sent in the outputs of Gradio."""
+    return {
+        "path": path,
+        "orig_name": os.path.basename(path),
+        "size": os.path.getsize(path),
+        "meta": {"_type": "gradio.FileData"},
+    }
+
+
+class LocalCosmosApp:
+    """
+    The upload_file and generate_video functions of the Cosmos-Transfer1 Gradio app.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        upload_lifetime_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the app.
+
+        Args:
+            root_dir: Directory holding the temporary, uploaded and generated files
+            latency_seconds: Time each generate_video call takes before answering
+            jitter_seconds: Uniformly distributed extra latency in [0, jitter_seconds]
+            upload_lifetime_seconds: Uploads older than this are deleted, None keeps them
+        """
+        self.root_dir = Path(root_dir)
+        self.temp_dir = self.root_dir / "tmp"
+        self.uploads_dir = self.root_dir / "uploads"
+        self.output_dir = self.root_dir / "outputs"
+        for directory in (self.temp_dir, self.uploads_dir, self.output_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.upload_lifetime_seconds = upload_lifetime_seconds
+        self.uploads = 0
+        self.generations = 0
+        self._lock = threading.Lock()
+
+    def is_served(self, path: str) -> bool:
+        """Whether a file may be downloaded, i.e. lies in the uploads or output directory."""
+        resolved = Path(path).resolve()
+        return any(
+            resolved.is_relative_to(directory.resolve()) for directory in (self.uploads_dir, self.output_dir)
+        ) and resolved.is_file()
+
+    def save_temp_file(self, filename: str, content: bytes) -> str:
+        """Store a file posted to the upload route, like the Gradio cache."""
+        path = self.temp_dir / uuid.uuid4().hex / os.path.basename(filename or "upload")
+        path.parent.mkdir()
+        path.write_bytes(content)
+        return str(path)
+
+    def expire_uploads(self) -> None:
+        if self.upload_lifetime_seconds is None:
+            return
+        deadline = time.time() - self.upload_lifetime_seconds
+        for upload_dir in self.uploads_dir.iterdir():
+            if upload_dir.stat().st_mtime < deadline:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def clear_uploads(self) -> None:
+        """Delete all uploaded files, as a server restart or cleanup would."""
+        for upload_dir in self.uploads_dir.iterdir():
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def upload_file(self, file: dict) -> str:
+        with self._lock:
+            self.uploads += 1
+        upload_dir = self.uploads_dir / uuid.uuid4().hex
+        upload_dir.mkdir()
+        path = upload_dir / (file.get("orig_name") or os.path.basename(file["path"]))
+        shutil.move(file["path"], path)
+        return json.dumps({"path": str(path), "message": f"Uploaded {path.name}"})
+
+    def generate_video(self, request_text: str) -> Tuple[Optional[dict], str]:
+        start = time.perf_counter()
+        with self._lock:
+            self.generations += 1
+        self.expire_uploads()
+        try:
+            request_data = json.loads(request_text)
+        except json.JSONDecodeError as e:
+            return None, f"Error parsing request JSON: {e}\nPlease ensure your request is valid JSON."
+
+        paths = [request_data.get("input_video_path")]
+        for control in ("edge", "depth", "seg", "vis"):
+            if isinstance(request_data.get(control), dict):
+                paths.append(request_data[control].get("input_control"))
+        for path in filter(None, paths):
+            if not os.path.isfile(path):
+                return None, f"Error: Input file {path} does not exist"
+
+        delay = self.latency_seconds + random.uniform(0.0, self.jitter_seconds)
+        remaining = delay - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+        output_folder = self.output_dir / f"generation_{uuid.uuid4().hex}"
+        output_folder.mkdir()
+        output_path = output_folder / "output.mp4"
+        output_path.write_text(request_text)
+        return (
+            {"video": file_data(str(output_path)), "subtitles": None},
+            f"Video generated successfully!\nOutput saved to: {output_folder}\nFinal prompt: {request_data.get('prompt')}",
+        )
+
+    def functions(self) -> List[Callable[..., Any]]:
+        """Functions of the dependencies, by dependency id."""
+        return [self.upload_file, self.generate_video]
+
+
+class _Session:
+    def __init__(self):
+        self.messages: "queue.Queue[dict]" = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+
+
+class LocalGradioServer(ThreadingHTTPServer):
+    """
+    HTTP server answering the Gradio API requests of gradio_client with a LocalCosmosApp.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], app: LocalCosmosApp, max_workers: int = 4):
+        super().__init__(address, _GradioRequestHandler)
+        self.app = app
+        self.sessions: Dict[str, _Session] = {}
+        self.sessions_lock = threading.Lock()
+        # Like the Gradio queue, runs at most max_workers events concurrently
+        self.workers = threading.BoundedSemaphore(max(1, max_workers))
+        self.stopping = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def session(self, session_hash: str) -> _Session:
+        with self.sessions_lock:
+            return self.sessions.setdefault(session_hash, _Session())
+
+    def run_event(self, session: _Session, event_id: str, fn_index: int, data: list) -> None:
+        time.sleep(QUEUE_TICK_SECONDS)
+        session.messages.put({"msg": "estimation", "event_id": event_id, "rank": 0, "queue_size": 1})
+        with self.workers:
+            session.messages.put({"msg": "process_starts", "event_id": event_id})
+            try:
+                outputs = self.app.functions()[fn_index](*data)
+                if not isinstance(outputs, tuple):
+                    outputs = (outputs,)
+                message = {"success": True, "output": {"data": list(outputs)}}
+            except Exception as e:
+                logger.exception(f"Event {event_id} failed")
+                message = {"success": False, "output": {"error": str(e)}}
+        with session.lock:
+            session.pending -= 1
+        session.messages.put({"msg": "process_completed", "event_id": event_id, **message})
+
+    def shutdown(self) -> None:
+        self.stopping.set()
+        super().shutdown()
+
+
+class _GradioRequestHandler(BaseHTTPRequestHandler):
+    server: LocalGradioServer
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, value: Any, status: int = 200) -> None:
+        body = json.dumps(value).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_event_stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _send_event(self, message: dict) -> None:
+        self.wfile.write(f"data: {json.dumps(message)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = unquote(url.path)
+        if path.rstrip("/") == "/config":
+            self._send_json({
+                "version": "5.9.1",
+                "protocol": "sse_v3",
+                "api_prefix": API_PREFIX,
+                "max_file_size": None,
+                "components": COMPONENTS,
+                "dependencies": DEPENDENCIES,
+            })
+        elif path == f"{API_PREFIX}/info":
+            self._send_json(json.loads(json.dumps(API_INFO)))
+        elif path.startswith(f"{API_PREFIX}/heartbeat/"):
+            self._stream_heartbeat()
+        elif path == f"{API_PREFIX}/queue/data":
+            self._stream_events(parse_qs(url.query).get("session_hash", [""])[0])
+        elif path.startswith(f"{API_PREFIX}/file="):
+            self._send_file(path[len(f"{API_PREFIX}/file="):])
+        else:
+            self._send_json({"detail": "Not Found"}, 404)
+
+    def do_POST(self) -> None:
+        path = unquote(urlparse(self.path).path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if path == f"{API_PREFIX}/upload":
+            self._receive_upload(body)
+        elif path == f"{API_PREFIX}/queue/join":
+            self._join_queue(json.loads(body))
+        elif path in (f"{API_PREFIX}/reset", f"{API_PREFIX}/cancel"):
+            self._send_json(True)
+        else:
+            self._send_json({"detail": "Not Found"}, 404)
+
+    def _receive_upload(self, body: bytes) -> None:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        paths = [
+            self.server.app.save_temp_file(part.get_filename(), part.get_payload(decode=True))
+            for part in message.iter_parts()
+            if part.get_param("name", header="content-disposition") == "files"
+        ]
+        self._send_json(paths)
+
+    def _join_queue(self, request: dict) -> None:
+        fn_index = int(request["fn_index"])
+        if not 0 <= fn_index < len(DEPENDENCIES):
+            self._send_json({"detail": f"Unknown fn_index {fn_index}"}, 404)
+            return
+        session = self.server.session(request["session_hash"])
+        event_id = uuid.uuid4().hex
+        with session.lock:
+            session.pending += 1
+        self._send_json({"event_id": event_id})
+        threading.Thread(
+            target=self.server.run_event,
+            args=(session, event_id, fn_index, request.get("data", [])),
+            daemon=True,
+        ).start()
+
+    def _stream_events(self, session_hash: str) -> None:
+        session = self.server.session(session_hash)
+        self._start_event_stream()
+        idle_since = None
+        try:
+            while not self.server.stopping.is_set():
+                try:
+                    message = session.messages.get(timeout=min(HEARTBEAT_SECONDS, STREAM_IDLE_SECONDS))
+                except queue.Empty:
+                    with session.lock:
+                        idle = session.pending == 0 and session.messages.empty()
+                    if not idle:
+                        idle_since = None
+                        self._send_event({"msg": "heartbeat"})
+                        continue
+                    if idle_since is None:
+                        idle_since = time.monotonic()
+                    elif time.monotonic() - idle_since >= STREAM_IDLE_SECONDS:
+                        self._send_event({"msg": "close_stream", "event_id": None})
+                        return
+                    continue
+                idle_since = None
+                self._send_event(message)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream_heartbeat(self) -> None:
+        self._start_event_stream()
+        try:
+            while not self.server.stopping.wait(HEARTBEAT_SECONDS):
+                self._send_event({"msg": "heartbeat"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_file(self, path: str) -> None:
+        if not self.server.app.is_served(path):
+            self._send_json({"detail": f"File not allowed: {path}"}, 403)
+            return
+        size = os.path.getsize(path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+
+def serve(
+    app: LocalCosmosApp,
+    port: int = 0,
+    host: str = "127.0.0.1",
+    max_workers: int = 4,
+) -> Tuple[LocalGradioServer, str]:
+    """
+    Start the server in a background thread.
+
+    Args:
+        app: The app to serve
+        port: Port to listen on, 0 picks a free port
+        host: Interface to listen on
+        max_workers: Number of events run concurrently, i.e. how many generations run at once
+
+    Returns:
+        tuple: (server, url) - the started server and its URL, stop it with server.shutdown()
+    """
+    server = LocalGradioServer((host, port), app, max_workers)
+    threading.Thread(target=server.serve_forever, name="local-gradio-server", daemon=True).start()
+    logger.info(f"Local Cosmos-Transfer1 stand-in listening on {server.url}")
+    return server, server.url
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    argparser.add_argument("--port", default=8080, type=int, help="port to listen on (default: 8080)")
+    argparser.add_argument("--root-dir", default=None,
+                           help="directory of the uploaded and generated files (default: a temporary directory)")
+    argparser.add_argument("--latency", default=0.0, type=float, help="generation latency in seconds (default: 0)")
+    argparser.add_argument("--jitter", default=0.0, type=float, help="extra random generation latency in seconds (default: 0)")
+    argparser.add_argument("--upload-lifetime", default=None, type=float,
+                           help="seconds after which uploads are deleted (default: kept)")
+    argparser.add_argument("--workers", default=4, type=int, help="concurrent generations (default: 4)")
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="cosmos_stand_in_") as temp_dir:
+        app = LocalCosmosApp(args.root_dir or temp_dir, args.latency, args.jitter, args.upload_lifetime)
+        server, _ = serve(app, args.port, args.host, args.workers)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,28 +15,11 @@ EDGE_VIDEO="example_data/artifacts/edges.mp4"
 DEPTH_VIDEO="example_data/artifacts/depth.mp4"
 SEG_VIDEO="example_data/artifacts/semantic_segmentation.mp4"
 
-# Gather and sort TOML files into an array
-TOML_FILES=( $(find "$TOML_DIR" -maxdepth 1 -type f -name '*.toml' | sort) )
+# Number of generation jobs kept in flight on the server
+JOBS="${JOBS:-4}"
 
-# Handle no-file case
-if [[ ${#TOML_FILES[@]} -eq 0 ]]; then
-  echo "No TOML files found in $TOML_DIR"
-  exit 0
+# Run every TOML file once per seed as one batch, saved as outputs/<toml name>_seed_<seed>.mp4.
+# The input videos are uploaded once, and rerunning the script skips the videos already generated.
+if ! python cosmos_client.py "$ENDPOINT" "$TOML_DIR" --input-video "$INPUT_VIDEO" --edge-video "$EDGE_VIDEO" --seg-video "$SEG_VIDEO" --seeds "${SEEDS[@]}" --jobs "$JOBS" --output outputs; then
+  echo "Error processing the TOML files of $TOML_DIR, see outputs/cosmos_jobs.json for the failed jobs"
 fi
-
-# Iterate over sorted TOML files
-for toml_file in "${TOML_FILES[@]}"; do
-  # Get the base name of the TOML file without the directory and extension
-  base_name=$(basename "$toml_file" .toml)
-  
-  # Iterate over the list of seeds
-  for seed in "${SEEDS[@]}"; do
-    # Define the output directory
-    output_name="outputs/${base_name}_seed_${seed}.mp4"
-         
-    # Run the python script and capture any errors
-    if ! python cosmos_client.py "$ENDPOINT" "$toml_file" --input-video "$INPUT_VIDEO" --edge-video "$EDGE_VIDEO" --seg-video "$SEG_VIDEO" --seed "$seed" --output "$output_name"; then
-      echo "Error processing $toml_file with seed $seed"
-    fi
-  done
-done
@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+AOV post-processing benchmark suite
+
+Times the kernels of aov_processing against the previous post-processing code of
+carla_cosmos_gen on synthetic 1920x1080 frames and checks that both produce the
+same images:
+
+- depth: depth decode + log-grayscale to RGB
+- instance: instance ID reconstruction + colormap
+- masked edges: blurred RGB masked to semantic classes + Canny edges to RGB
+
+Every AOV is a benchmark group, so pytest-benchmark reports the milliseconds per
+frame of the kernel next to the previous code and can compare them across changes.
+
+Example usage:
+    pytest test_aov_processing.py
+    pytest test_aov_processing.py --benchmark-autosave --benchmark-compare
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import cv2
+import pytest
+from PIL import Image
+
+from aov_processing import AovKernels
+
+HEIGHT, WIDTH = 1080, 1920
+
+
+# === PREVIOUS IMPLEMENTATION (reference) ===
+def reference_depth(depth_bgra: np.ndarray) -> np.ndarray:
+    scales = np.array([65536.0, 256.0, 1.0, 0.0]) / (256**3 - 1) * 1000
+    depth_map = np.dot(depth_bgra, scales).astype(np.float32)
+    near_clip, far_clip = 0.01, 1000.0
+    clipped = np.clip(depth_map, near_clip, far_clip)
+    log_depth = np.log(clipped)
+    norm_log = (log_depth - np.log(near_clip)) / (np.log(far_clip) - np.log(near_clip))
+    norm_log = 1.0 - norm_log
+    gray_img = Image.fromarray((norm_log * 255).astype(np.uint8))
+    return np.array(gray_img.convert('RGB'))
+
+
+def reference_instance(instance_bgr: np.ndarray, colormap: np.ndarray) -> np.ndarray:
+    low = instance_bgr[:, :, 1].astype(np.uint16)
+    high = instance_bgr[:, :, 2].astype(np.uint16)
+    return colormap[(high << 8) | low]
+
+
+def reference_masked_edges(rgb_img: np.ndarray, semseg_img: np.ndarray, classes) -> List[np.ndarray]:
+    blurred_rgb = cv2.GaussianBlur(rgb_img, (5, 5), 1.0)
+    mask = np.zeros(semseg_img.shape[:2], dtype=np.uint8)
+    for color in classes:
+        lower = np.array(color, dtype=np.uint8)
+        upper = np.array(color, dtype=np.uint8)
+        mask |= cv2.inRange(semseg_img, lower, upper)
+    mask_bool = mask.astype(bool)
+    masked_rgb = np.zeros_like(rgb_img)
+    masked_rgb[mask_bool] = blurred_rgb[mask_bool]
+    gray = cv2.cvtColor(masked_rgb, cv2.COLOR_RGB2GRAY)
+    edges = cv2.Canny(gray, 100, 200)
+    return [masked_rgb, cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)]
+
+
+# === SYNTHETIC FRAMES ===
+SEMANTIC_PALETTE = np.array([
+    [128, 64, 128],   # road
+    [244, 35, 232],   # sidewalk
+    [70, 70, 70],     # building
+    [107, 142, 35],   # vegetation
+    [70, 130, 180],   # sky
+    [0, 0, 142],      # car
+    [220, 20, 60],    # pedestrian
+], dtype=np.uint8)
+
+
+def synthetic_frames(height: int, width: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+
+    # Ground plane getting further away towards the horizon, sky at the far clip
+    depth_m = np.where(y > 0.45, 2.0 / np.maximum(y - 0.45, 1e-3), 1000.0) * (1.0 + 0.2 * x)
+    depth_m += rng.normal(0.0, 0.05, size=depth_m.shape)
+    code = np.clip(depth_m / 1000.0 * (256**3 - 1), 0, 256**3 - 1).astype(np.uint32)
+    depth_bgra = np.stack([
+        (code >> 16) & 255, (code >> 8) & 255, code & 255, np.full_like(code, 255)
+    ], axis=-1).astype(np.uint8)
+
+    rgb = np.empty((height, width, 3), dtype=np.float32)
+    rgb[..., 0] = 255.0 * x
+    rgb[..., 1] = 255.0 * y
+    rgb[..., 2] = 127.5 * (1.0 + np.sin(8.0 * np.pi * x * y))
+    rgb += rng.normal(0.0, 8.0, size=rgb.shape).astype(np.float32)
+    rgb = np.clip(rgb, 0, 255).astype(np.uint8)
+
+    # Blocks of classes and instances, roughly the size of objects in a street scene
+    block = 40
+    grid = (-(-height // block), -(-width // block))
+    labels = rng.integers(0, len(SEMANTIC_PALETTE), size=grid)
+    labels = np.kron(labels, np.ones((block, block), dtype=labels.dtype))[:height, :width]
+    semseg = SEMANTIC_PALETTE[labels]
+    ids = rng.integers(0, 65536, size=grid).astype(np.uint16)
+    ids = np.kron(ids, np.ones((block, block), dtype=ids.dtype))[:height, :width]
+    instance = np.stack([np.zeros_like(ids), ids & 255, ids >> 8], axis=-1).astype(np.uint8)
+
+    return {'depth': depth_bgra, 'rgb': rgb, 'semseg': semseg, 'instance': instance}
+
+
+# === FIXTURES ===
+@pytest.fixture(scope='module')
+def frames() -> Dict[str, np.ndarray]:
+    return synthetic_frames(HEIGHT, WIDTH)
+
+
+@pytest.fixture(scope='module')
+def colormap() -> np.ndarray:
+    return np.random.default_rng(140).integers(0, 256, size=(65536, 3), dtype=np.uint8)
+
+
+@pytest.fixture(scope='module')
+def classes() -> List[List[int]]:
+    return SEMANTIC_PALETTE[[0, 5, 6]].tolist()
+
+
+@pytest.fixture
+def kernels() -> AovKernels:
+    return AovKernels(HEIGHT, WIDTH)
+
+
+@pytest.fixture
+def out() -> np.ndarray:
+    return np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+# === BENCHMARKS ===
+@pytest.mark.benchmark(group='depth')
+def test_depth_reference(benchmark, frames):
+    benchmark(reference_depth, frames['depth'])
+
+
+@pytest.mark.benchmark(group='depth')
+def test_depth_kernel(benchmark, frames, kernels, out):
+    result = benchmark(kernels.depth_to_log_grayscale, frames['depth'], out)
+    np.testing.assert_array_equal(result, reference_depth(frames['depth']))
+
+
+@pytest.mark.benchmark(group='instance')
+def test_instance_reference(benchmark, frames, colormap):
+    benchmark(reference_instance, frames['instance'], colormap)
+
+
+@pytest.mark.benchmark(group='instance')
+def test_instance_kernel(benchmark, frames, colormap, kernels, out):
+    result = benchmark(kernels.instance_colors, frames['instance'], colormap, out)
+    np.testing.assert_array_equal(result, reference_instance(frames['instance'], colormap))
+
+
+@pytest.mark.benchmark(group='masked edges')
+def test_masked_edges_reference(benchmark, frames, classes):
+    benchmark(reference_masked_edges, frames['rgb'], frames['semseg'], classes)
+
+
+@pytest.mark.benchmark(group='masked edges')
+def test_masked_edges_kernel(benchmark, frames, classes, kernels, out):
+    edges_out = np.empty_like(out)
+    masked, edges = benchmark(kernels.masked_edges, frames['rgb'], frames['semseg'], classes, out, edges_out)
+    expected_masked, expected_edges = reference_masked_edges(frames['rgb'], frames['semseg'], classes)
+    np.testing.assert_array_equal(masked, expected_masked)
+    np.testing.assert_array_equal(edges, expected_edges)
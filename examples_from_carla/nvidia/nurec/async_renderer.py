@@ -0,0 +1,266 @@
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Asynchronous NUREC Render Client Module
+
+This module provides a pipelined client for the NUREC rendering service. Instead of
+one blocking render_rgb call per camera inside the CARLA tick callback, requests are
+sent with the gRPC future API and several of them are kept in flight across cameras
+and frames.
+
+Key Classes:
+- AsyncNurecRenderer: Sends render requests built by a NurecRenderer without blocking,
+  decodes the responses in a worker pool and delivers the images to per-camera callbacks
+
+The module guarantees that:
+- At most max_in_flight requests are outstanding on the service, further requests wait
+  in a FIFO queue and are sent as soon as a slot frees up
+- Images of one camera are delivered in the order they were requested, even when
+  responses or decodes complete out of order
+- Callbacks of one camera are never run concurrently
+
+Callbacks are run from the decode worker threads, not from the CARLA tick callback.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import carla
+
+from nre.grpc.protos.sensorsim_pb2 import CameraSpec, RGBRenderRequest
+
+logger = logging.getLogger(__name__)
+
+
+class _CameraStream:
+    """
+    Ordering state of the requests of one camera.
+    """
+
+    def __init__(self, callback: Callable[[np.ndarray], None]):
+        self.callback = callback
+        self.next_seq = 0
+        self.next_delivery = 0
+        self.ready: Dict[int, Optional[np.ndarray]] = {}
+        self.lock = threading.Lock()
+
+
+class AsyncNurecRenderer:
+    """
+    Pipelined render client on top of a NurecRenderer.
+
+    The renderer builds the requests and decodes the images, this class only schedules
+    them: submit() returns as soon as the request is built and queued.
+    """
+
+    def __init__(
+        self,
+        renderer: Any,
+        max_in_flight: int = 4,
+        decode_workers: int = 2,
+        timeout: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        """
+        Initialize the asynchronous render client.
+
+        Args:
+            renderer: NurecRenderer whose gRPC stub, request building and decoding are used
+            max_in_flight: Maximum number of render requests outstanding on the service
+            decode_workers: Number of threads decoding the returned images
+            timeout: Optional deadline in seconds of each render request
+            max_pending: Optional bound on the requests waiting for a slot. When exceeded
+                the oldest waiting request is dropped, so a slow service adds lag
+                instead of unbounded memory.
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        self.renderer = renderer
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._decode_pool = ThreadPoolExecutor(
+            max_workers=decode_workers, thread_name_prefix="nurec-decode"
+        )
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._streams: Dict[Hashable, _CameraStream] = {}
+        self._pending: Deque[Tuple[_CameraStream, int, RGBRenderRequest]] = deque()
+        self._in_flight = 0
+        self._outstanding = 0
+        self._closed = False
+        self.dropped = 0
+        # Recent render round trip times, from sending a request to its response
+        self.round_trip_ms: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently sent to the service"""
+        return self._in_flight
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting for a free slot"""
+        return len(self._pending)
+
+    def submit(
+        self,
+        key: Hashable,
+        callback: Callable[[np.ndarray], None],
+        world_snapshot: carla.WorldSnapshot,
+        camera_spec: CameraSpec,
+        pose: np.ndarray,
+        resolution_ratio: float = 0.25,
+    ) -> None:
+        """
+        Build a render request from the current state and queue it without blocking.
+
+        Args:
+            key: Identifies the camera, images with the same key are delivered in order
+            callback: Function receiving the decoded image (RGB, HxWx3)
+            world_snapshot: CARLA world snapshot with the actor states to render
+            camera_spec: Camera specification including intrinsics
+            pose: 4x4 camera pose matrix
+            resolution_ratio: Resolution scaling factor
+        """
+        # The request captures the actor poses and the timestamp of this tick
+        request = self.renderer.build_request(
+            world_snapshot, camera_spec, pose, resolution_ratio
+        )
+        dropped = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AsyncNurecRenderer is closed")
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = _CameraStream(callback)
+            stream.callback = callback
+            seq = stream.next_seq
+            stream.next_seq += 1
+            self._outstanding += 1
+
+            if self._in_flight >= self.max_in_flight:
+                self._pending.append((stream, seq, request))
+                if self.max_pending is not None and len(self._pending) > self.max_pending:
+                    dropped = self._pending.popleft()
+                    self.dropped += 1
+                request = None
+            else:
+                self._in_flight += 1
+
+        if dropped is not None:
+            logger.warning("Render queue full, dropping the oldest pending request")
+            self._complete(dropped[0], dropped[1], None)
+        if request is not None:
+            self._send(stream, seq, request)
+
+    def _send(self, stream: _CameraStream, seq: int, request: RGBRenderRequest) -> None:
+        sent_at = time.perf_counter()
+        try:
+            future = self.renderer.client_service.render_rgb.future(
+                request, timeout=self.timeout
+            )
+        except Exception as e:
+            logger.error(f"Failed to send render request: {e}")
+            self._release_slot()
+            self._complete(stream, seq, None)
+            return
+        future.add_done_callback(
+            lambda f: self._on_response(stream, seq, sent_at, f)
+        )
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the next waiting request, if any
+        with self._lock:
+            if self._pending:
+                next_request = self._pending.popleft()
+            else:
+                self._in_flight -= 1
+                return
+        self._send(*next_request)
+
+    def _on_response(
+        self, stream: _CameraStream, seq: int, sent_at: float, future: Any
+    ) -> None:
+        # Runs on a gRPC thread: free the slot first so the service stays busy while we decode
+        self._release_slot()
+        try:
+            response = future.result()
+        except Exception as e:
+            logger.error(f"Render request failed: {e}")
+            self._complete(stream, seq, None)
+            return
+        round_trip_ms = (time.perf_counter() - sent_at) * 1000
+        self.round_trip_ms.append(round_trip_ms)
+        logger.debug(f"Render round trip {round_trip_ms:.1f} ms")
+        try:
+            self._decode_pool.submit(self._decode, stream, seq, response.image_bytes)
+        except RuntimeError:
+            # Pool already shut down
+            self._complete(stream, seq, None)
+
+    def _decode(self, stream: _CameraStream, seq: int, image_bytes: bytes) -> None:
+        image = None
+        try:
+            image = self.renderer.decode(image_bytes)
+        except Exception as e:
+            logger.error(f"Failed to decode rendered image: {e}")
+        self._complete(stream, seq, image)
+
+    def _complete(
+        self, stream: _CameraStream, seq: int, image: Optional[np.ndarray]
+    ) -> None:
+        """
+        Record the result of a request and deliver every image of the camera that is
+        now in order. Failed or dropped requests (image None) are skipped.
+        """
+        with stream.lock:
+            stream.ready[seq] = image
+            while stream.next_delivery in stream.ready:
+                ready_image = stream.ready.pop(stream.next_delivery)
+                stream.next_delivery += 1
+                if ready_image is None:
+                    continue
+                try:
+                    stream.callback(ready_image)
+                except Exception as e:
+                    logger.error(f"Error in render callback: {e}")
+
+        with self._lock:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every submitted request has been delivered or dropped.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever
+
+        Returns:
+            bool: True if all requests are done, False on timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def close(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting requests and shut down the decode workers.
+
+        Args:
+            wait: If True, deliver the outstanding requests first
+            timeout: Maximum time to wait for the outstanding requests in seconds
+        """
+        with self._lock:
+            self._closed = True
+        if wait and not self.wait(timeout):
+            logger.warning("Closing renderer with render requests still in flight")
+        self._decode_pool.shutdown(wait=wait)
@@ -131,4 +131,29 @@ class BlueprintLibrary:
             offset_matrix[:3, 3] = offset
 
         # Apply offset
-        return pose_matrix @ offset_matrix
\ No newline at end of file
+        return pose_matrix @ offset_matrix
+
+    def apply_offsets_to_poses(
+        self, poses: np.ndarray, blueprint_ids: List[Optional[str]], inverse: bool = False
+    ) -> np.ndarray:
+        """
+        Apply the offsets of several blueprints to a batch of poses at once.
+
+        Args:
+            poses (np.ndarray): (N, 4, 4) transformation matrices
+            blueprint_ids (list): Blueprint ID of each pose, None for no offset
+            inverse (bool): If True, applies the inverse offsets (from rear axle to bounding box center)
+
+        Returns:
+            np.ndarray: (N, 4, 4) transformation matrices with the offsets applied
+        """
+        poses = np.asarray(poses, dtype=np.float64)
+        offsets = np.array(
+            [self.get_offset(blueprint_id) for blueprint_id in blueprint_ids], dtype=np.float64
+        ).reshape(-1, 3)
+        if inverse:
+            offsets = -offsets
+        # pose @ [[I, offset], [0, 1]] only moves the translation by R @ offset
+        result = poses.copy()
+        result[:, :3, 3] += np.einsum("nij,nj->ni", poses[:, :3, :3], offsets)
+        return result
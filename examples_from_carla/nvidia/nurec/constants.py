@@ -31,4 +31,8 @@ SPECTATOR_FLAG = "SPECTATOR"
 MAX_MESSAGE_LENGTH = 10_000_000
 
 # Conversion factor from m/s to km/h
-KPH_PER_MPS = 3.6
\ No newline at end of file
+KPH_PER_MPS = 3.6
+
+# Decoded images a camera callback may keep referencing after it returns, e.g. the
+# PygameDisplay queue (10) plus the image being displayed and the one being queued
+DECODE_HELD_FRAMES = 12
\ No newline at end of file
@@ -277,6 +277,27 @@ def main() -> None:
     argparser.add_argument(
         "--move-spectator", action="store_true", help="move spectator camera"
     )
+    argparser.add_argument(
+        "--max-in-flight",
+        metavar="N",
+        default=0,
+        type=int,
+        help="render requests kept in flight, 0 renders synchronously (default: 0)",
+    )
+    argparser.add_argument(
+        "--decoder",
+        default="auto",
+        choices=["auto", "nvimgcodec", "cpu", "opencv", "pillow"],
+        help="image decoder backend (default: auto)",
+    )
+    argparser.add_argument(
+        "--decode-reuse-buffers",
+        metavar="N",
+        default=None,
+        type=int,
+        help="output buffers per resolution reused by the CPU decoder, 0 allocates every "
+        "frame (default: max-in-flight + decode workers + frames held by the display)",
+    )
     args = argparser.parse_args()
 
     client = carla.Client(args.host, args.port)
@@ -289,6 +310,9 @@ def main() -> None:
         port=args.nurec_port,
         move_spectator=args.move_spectator,
         fps=30,
+        max_in_flight=args.max_in_flight,
+        decoder=args.decoder,
+        decode_reuse_buffers=args.decode_reuse_buffers,
     ) as scenario:
         spectator: Optional[carla.Actor] = None
         display: Optional[PygameDisplay] = None
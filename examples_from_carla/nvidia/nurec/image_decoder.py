@@ -0,0 +1,297 @@
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Image Decoder Module
+
+This module provides pluggable decoders for the JPEG images returned by the NUREC
+rendering service, so that replay also runs on machines without a GPU.
+
+Key Classes:
+- ImageDecoder: Base class measuring per-frame decode latency and decoding batches in a thread pool
+- NvImgCodecDecoder: GPU decoding with nvImageCodec
+- CpuDecoder: libjpeg-turbo decoding through OpenCV or Pillow, optionally converting into reused buffers
+
+Key Functions:
+- create_decoder: Build a decoder from a backend name, "auto" prefers nvImageCodec and
+  falls back to the CPU when it is not installed or no GPU is available
+
+All decoders return RGB uint8 arrays of shape (H, W, 3).
+"""
+
+import io
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _to_uint8(image: np.ndarray) -> np.ndarray:
+    return image if image.dtype == np.uint8 else image.astype(np.uint8)
+
+
+class ImageDecoder:
+    """
+    Base class of the decoders. Subclasses implement _decode for a single image.
+    """
+
+    name = "base"
+
+    def __init__(self, workers: int = 4, latency_window: int = 1000):
+        """
+        Initialize the decoder.
+
+        Args:
+            workers: Number of threads used by decode_many
+            latency_window: Number of recent decode latencies kept for latency_stats
+        """
+        self.workers = workers
+        self.latencies_ms: deque = deque(maxlen=latency_window)
+        self.last_latency_ms = 0.0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _decode(self, image_bytes: bytes) -> np.ndarray:
+        raise NotImplementedError
+
+    def _record(self, seconds: float) -> None:
+        self.last_latency_ms = seconds * 1000.0
+        self.latencies_ms.append(self.last_latency_ms)
+
+    def decode(self, image_bytes: bytes) -> np.ndarray:
+        """
+        Decode one image and record its latency.
+
+        Args:
+            image_bytes: Encoded image
+
+        Returns:
+            np.ndarray: RGB image (H, W, 3) uint8
+        """
+        start = time.perf_counter()
+        image = self._decode(image_bytes)
+        self._record(time.perf_counter() - start)
+        return image
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-decode"
+                )
+            return self._pool
+
+    def decode_many(self, images: Sequence[bytes]) -> List[np.ndarray]:
+        """
+        Decode several images, e.g. the responses of all cameras of a frame, in parallel.
+
+        Args:
+            images: Encoded images
+
+        Returns:
+            list: Decoded images in the order of the input
+        """
+        if len(images) <= 1 or self.workers <= 1:
+            return [self.decode(image_bytes) for image_bytes in images]
+        return list(self._get_pool().map(self.decode, images))
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Statistics of the recent per-frame decode latencies in milliseconds.
+
+        Returns:
+            dict: count, mean_ms, p50_ms, p95_ms, max_ms and last_ms
+        """
+        latencies = np.array(self.latencies_ms)
+        if len(latencies) == 0:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        return {
+            "count": len(latencies),
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "max_ms": float(latencies.max()),
+            "last_ms": self.last_latency_ms,
+        }
+
+    def close(self) -> None:
+        """Shut down the worker threads"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+class NvImgCodecDecoder(ImageDecoder):
+    """
+    GPU JPEG decoding with nvImageCodec.
+    """
+
+    name = "nvimgcodec"
+
+    def __init__(self, workers: int = 1, latency_window: int = 1000):
+        # Imported here so that the module loads on machines without nvImageCodec
+        import nvidia.nvimgcodec as nvimgcodec
+
+        super().__init__(workers, latency_window)
+        self._decoder = nvimgcodec.Decoder()
+
+    def _decode(self, image_bytes: bytes) -> np.ndarray:
+        return _to_uint8(np.asarray(self._decoder.decode(image_bytes).cpu()))
+
+    def decode_many(self, images: Sequence[bytes]) -> List[np.ndarray]:
+        """
+        Decode several images with a single batched nvImageCodec call.
+        The recorded per-frame latency is the batch time divided by the batch size.
+        """
+        if len(images) <= 1:
+            return [self.decode(image_bytes) for image_bytes in images]
+        start = time.perf_counter()
+        decoded = self._decoder.decode(list(images))
+        result = [_to_uint8(np.asarray(image.cpu())) for image in decoded]
+        per_frame = (time.perf_counter() - start) / len(images)
+        for _ in images:
+            self._record(per_frame)
+        return result
+
+
+class CpuDecoder(ImageDecoder):
+    """
+    CPU JPEG decoding with libjpeg-turbo through OpenCV, or Pillow if OpenCV is not installed.
+
+    Neither OpenCV nor Pillow can decode into a caller provided array from Python, so the
+    JPEG decode itself always allocates a frame. OpenCV versions with IMREAD_COLOR_RGB
+    decode straight to RGB, which is then the only allocation and the image is returned
+    as is. Otherwise the decoded frame has to be converted (BGR to RGB) or copied (Pillow),
+    and with reuse_buffers > 0 that output goes into a ring of preallocated arrays per
+    resolution instead of a second new array. A returned image is then overwritten by the
+    reuse_buffers-th following decode of the same resolution, so the ring must be larger
+    than the number of images a consumer holds on to at a time.
+    """
+
+    name = "cpu"
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        workers: int = 4,
+        reuse_buffers: int = 0,
+        latency_window: int = 1000,
+    ):
+        """
+        Initialize the CPU decoder.
+
+        Args:
+            backend: "opencv", "pillow" or "auto" (OpenCV if available, else Pillow)
+            workers: Number of threads used by decode_many
+            reuse_buffers: Size of the ring of conversion buffers per resolution, 0 allocates per frame
+            latency_window: Number of recent decode latencies kept for latency_stats
+        """
+        super().__init__(workers, latency_window)
+        self._cv2 = None
+        self._pil_image = None
+        if backend in ("auto", "opencv"):
+            try:
+                import cv2
+
+                self._cv2 = cv2
+            except ImportError:
+                if backend == "opencv":
+                    raise
+        if self._cv2 is None:
+            if backend not in ("auto", "pillow"):
+                raise ValueError(f"Unsupported CPU decoder backend: {backend}")
+            try:
+                from PIL import Image
+            except ImportError:
+                raise RuntimeError(
+                    "cannot import cv2 or PIL, install opencv-python or Pillow for CPU decoding"
+                )
+            self._pil_image = Image
+        self.backend = "opencv" if self._cv2 is not None else "pillow"
+        # OpenCV >= 4.11 decodes to RGB directly, skipping the conversion
+        self._cv2_rgb_flag = getattr(self._cv2, "IMREAD_COLOR_RGB", None)
+
+        self.reuse_buffers = reuse_buffers
+        self._buffers: Dict[Tuple[int, ...], List[np.ndarray]] = {}
+        self._next_buffer: Dict[Tuple[int, ...], int] = {}
+        self._buffers_lock = threading.Lock()
+
+    def _output_buffer(self, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        if self.reuse_buffers <= 0:
+            return None
+        with self._buffers_lock:
+            ring = self._buffers.get(shape)
+            if ring is None:
+                ring = self._buffers[shape] = [
+                    np.empty(shape, dtype=np.uint8) for _ in range(self.reuse_buffers)
+                ]
+                self._next_buffer[shape] = 0
+            i = self._next_buffer[shape]
+            self._next_buffer[shape] = (i + 1) % len(ring)
+            return ring[i]
+
+    def _decode(self, image_bytes: bytes) -> np.ndarray:
+        if self._cv2 is not None:
+            cv2 = self._cv2
+            buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+            if self._cv2_rgb_flag is not None:
+                rgb = cv2.imdecode(buffer, self._cv2_rgb_flag)
+                if rgb is None:
+                    raise ValueError("Failed to decode image")
+                return rgb
+            bgr = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            if bgr is None:
+                raise ValueError("Failed to decode image")
+            out = self._output_buffer(bgr.shape)
+            if out is None:
+                return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=out)
+
+        with self._pil_image.open(io.BytesIO(image_bytes)) as image:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            out = self._output_buffer((image.height, image.width, 3))
+            if out is None:
+                return np.array(image)
+            out[...] = np.asarray(image)
+            return out
+
+
+def create_decoder(
+    backend: Union[str, ImageDecoder] = "auto", **kwargs
+) -> ImageDecoder:
+    """
+    Create an image decoder.
+
+    Args:
+        backend: "auto", "nvimgcodec", "cpu", "opencv", "pillow" or an ImageDecoder instance
+        **kwargs: Passed to the decoder constructor (e.g. workers, reuse_buffers)
+
+    Returns:
+        ImageDecoder: The decoder
+    """
+    if isinstance(backend, ImageDecoder):
+        return backend
+    # nvImageCodec decodes into new device buffers, reuse_buffers only applies to the CPU
+    gpu_kwargs = {k: v for k, v in kwargs.items() if k != "reuse_buffers"}
+    if backend == "nvimgcodec":
+        return NvImgCodecDecoder(**gpu_kwargs)
+    if backend in ("cpu", "opencv", "pillow"):
+        cpu_backend = "auto" if backend == "cpu" else backend
+        return CpuDecoder(cpu_backend, **kwargs)
+    if backend != "auto":
+        raise ValueError(f"Unsupported decoder backend: {backend}")
+
+    try:
+        return NvImgCodecDecoder(**gpu_kwargs)
+    except Exception as e:
+        logger.info(f"nvImageCodec not available ({e}), decoding images on the CPU")
+        return CpuDecoder(**kwargs)
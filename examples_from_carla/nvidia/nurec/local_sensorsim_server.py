@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Local SensorsimService Stand-in
+
+This module provides a lightweight gRPC server implementing the parts of the NUREC
+SensorsimService used by the CARLA integration, so the client side (NurecScenario,
+NurecRenderer, NurecSensor) can be run and measured on a machine without a GPU or
+the NUREC container.
+
+Implemented RPCs:
+- get_available_cameras: Cameras of the calibrations in a USDZ file, or a default camera
+- render_rgb: Synthetic JPEG of the requested resolution after a configurable latency
+
+Every other RPC answers UNIMPLEMENTED. The synthetic images are encoded once per
+resolution with OpenCV or Pillow and then reused, so the server costs almost no CPU.
+
+Example usage:
+    python local_sensorsim_server.py --port 46435 --usdz-filename /path/to/scenario.usdz --latency-ms 30
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent import futures
+from typing import Dict, Optional, Tuple
+
+import grpc
+import numpy as np
+
+from constants import MAX_MESSAGE_LENGTH
+from nre.grpc.protos.sensorsim_pb2_grpc import (
+    SensorsimServiceServicer,
+    add_SensorsimServiceServicer_to_server,
+)
+from nre.grpc.protos.sensorsim_pb2 import (
+    AvailableCamerasReturn,
+    CameraSpec,
+    FthetaCameraParam,
+    LinearCde,
+    RGBRenderReturn,
+    ShutterType,
+)
+from scenario import extract_json_from_usdz, get_camera_calibrations
+
+logger = logging.getLogger(__name__)
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+    """
+    Encode an RGB uint8 image as JPEG with OpenCV, or Pillow if OpenCV is not installed.
+    """
+    try:
+        import cv2
+
+        ok, data = cv2.imencode(
+            ".jpg", image[..., ::-1], [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        )
+        if not ok:
+            raise ValueError("Failed to encode image")
+        return data.tobytes()
+    except ImportError:
+        pass
+
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def synthetic_image(height: int, width: int, seed: int = 0) -> np.ndarray:
+    """
+    Smooth gradients with some noise, compressing roughly like a rendered street scene.
+    """
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    image = np.empty((height, width, 3), dtype=np.float32)
+    image[..., 0] = 255.0 * x
+    image[..., 1] = 255.0 * y
+    image[..., 2] = 127.5 * (1.0 + np.sin(8.0 * np.pi * x * y))
+    image += rng.normal(0.0, 8.0, size=image.shape).astype(np.float32)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def camera_specs_from_usdz(usdz_file: str) -> Dict[str, CameraSpec]:
+    """
+    Build the CameraSpec of every camera calibration stored in a USDZ file.
+
+    Args:
+        usdz_file: Path to the USDZ file
+
+    Returns:
+        dict: Logical camera name to CameraSpec
+    """
+    json_array = extract_json_from_usdz(usdz_file, ["rig_trajectories.json"])
+    specs = {}
+    for calibration in get_camera_calibrations(json_array).values():
+        parameters = calibration.camera_model.parameters
+        spec = CameraSpec(
+            logical_id=calibration.logical_sensor_name,
+            trajectory_idx=0,
+            resolution_w=int(parameters.resolution[0]),
+            resolution_h=int(parameters.resolution[1]),
+            shutter_type=ShutterType.GLOBAL,
+        )
+        if calibration.camera_model.type == "ftheta":
+            reference_poly = parameters.reference_poly
+            if isinstance(reference_poly, str):
+                reference_poly = FthetaCameraParam.PolynomialType.Value(reference_poly.upper())
+            ftheta_param = FthetaCameraParam(
+                principal_point_x=parameters.principal_point[0],
+                principal_point_y=parameters.principal_point[1],
+                reference_poly=reference_poly,
+                pixeldist_to_angle_poly=parameters.pixeldist_to_angle_poly,
+                angle_to_pixeldist_poly=parameters.angle_to_pixeldist_poly,
+                max_angle=parameters.max_angle,
+            )
+            if parameters.linear_cde:
+                ftheta_param.linear_cde.CopyFrom(LinearCde(
+                    linear_c=parameters.linear_cde[0],
+                    linear_d=parameters.linear_cde[1],
+                    linear_e=parameters.linear_cde[2],
+                ))
+            spec.ftheta_param.CopyFrom(ftheta_param)
+        specs[calibration.logical_sensor_name] = spec
+    return specs
+
+
+def default_camera_specs() -> Dict[str, CameraSpec]:
+    """A single 1920x1080 F-theta camera, used when no USDZ file is given"""
+    return {
+        "camera_front_wide_120fov": CameraSpec(
+            logical_id="camera_front_wide_120fov",
+            resolution_w=1920,
+            resolution_h=1080,
+            shutter_type=ShutterType.GLOBAL,
+            ftheta_param=FthetaCameraParam(
+                principal_point_x=960.0,
+                principal_point_y=540.0,
+                reference_poly=FthetaCameraParam.PIXELDIST_TO_ANGLE,
+                max_angle=np.pi,
+            ),
+        )
+    }
+
+
+class LocalSensorsimService(SensorsimServiceServicer):
+    """
+    SensorsimService answering render requests with synthetic JPEG images.
+    """
+
+    def __init__(
+        self,
+        cameras: Optional[Dict[str, CameraSpec]] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        quality: int = 90,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            cameras: Logical camera name to CameraSpec, default_camera_specs() if None
+            latency_ms: Time each render_rgb call takes before answering
+            jitter_ms: Uniformly distributed extra latency in [0, jitter_ms]
+            quality: JPEG quality of the synthetic images
+        """
+        self.cameras = cameras if cameras is not None else default_camera_specs()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.quality = quality
+        self.requests = 0
+        self._images: Dict[Tuple[int, int], bytes] = {}
+        self._lock = threading.Lock()
+
+    def _image_bytes(self, height: int, width: int) -> bytes:
+        key = (height, width)
+        with self._lock:
+            data = self._images.get(key)
+        if data is None:
+            data = encode_jpeg(synthetic_image(height, width), self.quality)
+            with self._lock:
+                self._images[key] = data
+        return data
+
+    def get_available_cameras(self, request, context) -> AvailableCamerasReturn:
+        return AvailableCamerasReturn(
+            available_cameras=[
+                AvailableCamerasReturn.AvailableCamera(
+                    intrinsics=spec,
+                    logical_id=logical_id,
+                    trajectory_idx=spec.trajectory_idx,
+                )
+                for logical_id, spec in self.cameras.items()
+            ]
+        )
+
+    def render_rgb(self, request, context) -> RGBRenderReturn:
+        start = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+        height = max(1, int(request.resolution_h))
+        width = max(1, int(request.resolution_w))
+        data = self._image_bytes(height, width)
+
+        delay = (self.latency_ms + random.uniform(0.0, self.jitter_ms)) / 1000.0
+        remaining = delay - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+        return RGBRenderReturn(image_bytes=data)
+
+
+def serve(
+    service: LocalSensorsimService,
+    port: int = 0,
+    host: str = "localhost",
+    max_workers: int = 16,
+) -> Tuple[grpc.Server, int]:
+    """
+    Start a gRPC server for the service.
+
+    Args:
+        service: The service to serve
+        port: Port to listen on, 0 picks a free port
+        host: Interface to listen on
+        max_workers: Number of threads answering requests, i.e. how many renders run concurrently
+
+    Returns:
+        tuple: (server, port) - the started server and the port it listens on
+    """
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        options=[
+            ("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
+            ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH),
+        ],
+    )
+    add_SensorsimServiceServicer_to_server(service, server)
+    port = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    logger.info(f"Local SensorsimService listening on {host}:{port}")
+    return server, port
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument(
+        "-np",
+        "--port",
+        metavar="P",
+        default=46435,
+        type=int,
+        help="port to listen on (default: 46435)",
+    )
+    argparser.add_argument(
+        "-u",
+        "--usdz-filename",
+        metavar="U",
+        default=None,
+        help="USDZ file whose camera calibrations are served (default: one generic camera)",
+    )
+    argparser.add_argument(
+        "--latency-ms",
+        default=0.0,
+        type=float,
+        help="render latency in milliseconds (default: 0)",
+    )
+    argparser.add_argument(
+        "--jitter-ms",
+        default=0.0,
+        type=float,
+        help="extra random render latency in milliseconds (default: 0)",
+    )
+    argparser.add_argument(
+        "--workers",
+        default=16,
+        type=int,
+        help="concurrent render requests (default: 16)",
+    )
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cameras = camera_specs_from_usdz(args.usdz_filename) if args.usdz_filename else None
+    service = LocalSensorsimService(cameras, args.latency_ms, args.jitter_ms)
+    server, _ = serve(service, args.port, host="[::]", max_workers=args.workers)
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(0)
+
+
+if __name__ == "__main__":
+    main()
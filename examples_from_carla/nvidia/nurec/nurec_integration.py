@@ -18,6 +18,7 @@ and CARLA simulation. It contains classes and functions for:
 Key Classes:
 - NurecScenario: Main class for loading and running NUREC scenarios in CARLA
 - NurecRenderer: Handles communication with NUREC rendering service
+- AsyncNurecRenderer: Pipelined rendering with several requests in flight (async_renderer)
 - NurecSensor: Camera sensor that renders images using NUREC
 - NurecActor: Wrapper for CARLA actors with NUREC track data
 - TimeKeeper: Abstract interface for time management
@@ -33,10 +34,11 @@ import logging
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 import zipfile
-from typing import Dict, List, Any, Optional, Set, Callable, Union, Tuple
+from typing import Dict, List, Any, Optional, Set, Callable, Union, Tuple, Sequence
 
 import carla
 from nurec_render_service import NuRecRenderService
+from async_renderer import AsyncNurecRenderer
 from scenario import Scenario
 from blueprint_library import BlueprintLibrary
 
@@ -57,9 +59,8 @@ from nre.grpc.protos.sensorsim_pb2 import (
     OpenCVFisheyeCameraParam,
     ShutterType,
 )
-from track import Track
-
-import nvidia.nvimgcodec as nvimgcodec
+from track import Track, interpolate_many
+from image_decoder import ImageDecoder, create_decoder
 
 
 from constants import (
@@ -68,6 +69,7 @@ from constants import (
     VEHICLE_LABELS,
     MAX_MESSAGE_LENGTH,
     KPH_PER_MPS,
+    DECODE_HELD_FRAMES,
 )
 from projection_functions import get_t_rig_enu_from_ecef
 from simple_trajectory_follower import SimpleTrajectoryFollower
@@ -75,6 +77,7 @@ from utils import (
     se3_to_grpc_pose,
     actor_to_grpc_pose,
     mat_to_carla_transform,
+    mats_to_carla_transforms,
     undo_carla_coordinate_transform,
     xyzeuler_to_carla_transform,
 )
@@ -344,6 +347,8 @@ class NurecRenderer:
         t_scenario_carla=np.eye(4),
         blueprint_library: Optional[BlueprintLibrary] = None,
         actor_blueprints: Optional[Dict[int, str]] = None,
+        decoder: Union[str, ImageDecoder] = "auto",
+        decode_reuse_buffers: int = 0,
     ):
         self.scenario = scenario
         self.host = host
@@ -354,7 +359,8 @@ class NurecRenderer:
             "start-timestamp_us"
         ]
         self.end_timestamp = self.scenario.metadata["pose-range"]["end-timestamp_us"]
-        self.jpeg_decoder = nvimgcodec.Decoder()
+        self.decoder = create_decoder(decoder, reuse_buffers=decode_reuse_buffers)
+        logger.debug(f"Decoding rendered images with {self.decoder.name}")
         self.t_carla_nurec = np.linalg.inv(t_scenario_carla)
         self._init_grpc()
 
@@ -387,13 +393,13 @@ class NurecRenderer:
         for available_camera in available_cameras.available_cameras:
             self.available_cameras[available_camera.logical_id] = available_camera
 
-    def render(self, world_snapshot: carla.WorldSnapshot, camera_spec: CameraSpec, pose: np.ndarray, resolution_ratio: float = 0.25) -> np.ndarray:
+    def build_request(self, world_snapshot: carla.WorldSnapshot, camera_spec: CameraSpec, pose: np.ndarray, resolution_ratio: float = 0.25) -> RGBRenderRequest:
         timestamp = int(self.scenario.tracks.current_time)
 
         # bound timestamp to the range of the scenario
         timestamp = min(timestamp, self.end_timestamp - 1)
 
-        request = generate_request(
+        return generate_request(
             self.scene_id,
             camera_spec,
             pose,
@@ -407,12 +413,39 @@ class NurecRenderer:
             self.blueprint_library,
             self.actor_blueprints,
         )
+
+    def decode(self, image_bytes: bytes) -> np.ndarray:
+        return self.decoder.decode(image_bytes)
+
+    def render(self, world_snapshot: carla.WorldSnapshot, camera_spec: CameraSpec, pose: np.ndarray, resolution_ratio: float = 0.25) -> np.ndarray:
+        request = self.build_request(world_snapshot, camera_spec, pose, resolution_ratio)
         response = self.client_service.render_rgb(request)
+        return self.decode(response.image_bytes)
+
+    def render_many(
+        self,
+        world_snapshot: carla.WorldSnapshot,
+        views: Sequence[Tuple[CameraSpec, np.ndarray, float]],
+    ) -> List[np.ndarray]:
+        """
+        Render several cameras of the same frame.
+
+        All requests are sent before waiting on any of them, and the responses are
+        decoded as one batch.
+
+        Args:
+            world_snapshot: CARLA world snapshot with the actor states to render
+            views: (camera_spec, pose, resolution_ratio) of each camera
 
-        image = self.jpeg_decoder.decode(response.image_bytes)
-        # convert to uint8
-        image = np.array(image.cpu()).astype(np.uint8)
-        return image
+        Returns:
+            list: RGB images in the order of views
+        """
+        requests = [
+            self.build_request(world_snapshot, camera_spec, pose, resolution_ratio)
+            for camera_spec, pose, resolution_ratio in views
+        ]
+        futures = [self.client_service.render_rgb.future(request) for request in requests]
+        return self.decoder.decode_many([future.result().image_bytes for future in futures])
 
     def get_camera_spec(self, camera_logical_id: str) -> CameraSpec:
         return self.available_cameras[camera_logical_id].intrinsics
@@ -462,6 +495,7 @@ class NurecSensor:
         time_keeper: TimeKeeper,
         framerate=2,
         resolution_ratio=0.25,
+        async_renderer: Optional[AsyncNurecRenderer] = None,
     ):
         self.parent_actor = parent_actor
         self.transform = np.array(transform)
@@ -476,6 +510,7 @@ class NurecSensor:
         self.translation = self.transform[:3, 3]
         self.resolution_ratio = resolution_ratio
         self.camera_spec = camera_spec
+        self.async_renderer = async_renderer
 
     def _should_render(self) -> bool:
         if not self.time_keeper.is_running():
@@ -489,27 +524,49 @@ class NurecSensor:
             self.last_timestamp = timestamp
         return True
 
-    def on_world_tick(self, world: carla.World) -> None:
+    def camera_pose(self, world: carla.World) -> Optional[np.ndarray]:
+        """
+        Returns the pose to render this tick, or None if the camera is not due.
+        """
         if not self._should_render():
-            return
+            return None
 
         actor = world.find(self.parent_actor.actor_inst.id)
         if actor is None:
             logger.warning(f"Parent actor {self.parent_actor} not found in world")
-            return
+            return None
 
         actor_transform = actor.get_transform().get_matrix()
         actor_transform = np.array(actor_transform)  # 4x4 matrix
-        camera_transform = (
-            undo_carla_coordinate_transform(actor_transform) @ self.transform
-        )
+        return undo_carla_coordinate_transform(actor_transform) @ self.transform
+
+    def on_world_tick(self, world: carla.World) -> None:
+        camera_transform = self.camera_pose(world)
+        if camera_transform is None:
+            return
+
+        if self.async_renderer is not None:
+            # Returns immediately, the image is delivered to on_image from a worker thread,
+            # which logs and drops exceptions of the callback
+            self.async_renderer.submit(
+                self,
+                self.on_image,
+                world,
+                self.camera_spec,
+                camera_transform,
+                self.resolution_ratio,
+            )
+            return
+
         image = self.renderer.render(
             world,
             self.camera_spec,
             camera_transform,
             self.resolution_ratio,
         )
+        self.on_image(image)
 
+    def on_image(self, image: np.ndarray) -> None:
         try:
             self.callback(image)
         except Exception as e:
@@ -531,11 +588,40 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
         fps: int = 10,
         image=None,
         reuse_container: bool = True,
+        max_in_flight: int = 0,
+        decode_workers: int = 2,
+        decoder: Union[str, ImageDecoder] = "auto",
+        decode_reuse_buffers: Optional[int] = None,
     ):
+        """
+        Args:
+            client: CARLA client
+            usdz_path: Path to the USDZ file of the NUREC scenario
+            port: Port of the NUREC rendering service
+            move_spectator: If True, the spectator follows the ego vehicle
+            fps: Replay rate of the scenario
+            image: Docker image of the NUREC rendering service
+            reuse_container: If True, keep the rendering service container running on exit
+            max_in_flight: Number of render requests kept in flight across cameras and frames.
+                0 renders synchronously inside the tick callback.
+            decode_workers: Number of image decoding threads when max_in_flight > 0
+            decoder: Image decoder backend, see image_decoder.create_decoder
+            decode_reuse_buffers: Size of the ring of output buffers per resolution the CPU
+                decoder reuses, 0 allocates every frame. None sizes it for the images that can
+                be alive at once: max_in_flight + decode_workers + DECODE_HELD_FRAMES. Callbacks
+                keeping more images than DECODE_HELD_FRAMES must copy them or pass 0.
+        """
         NuRecRenderService.__init__(self, usdz_path, port, image, reuse_container)
         self.client = client
         self.scenario: Optional[Scenario] = None
         self.renderer: Optional[NurecRenderer] = None
+        self.async_renderer: Optional[AsyncNurecRenderer] = None
+        self.max_in_flight = max_in_flight
+        self.decode_workers = decode_workers
+        self.decoder = decoder
+        if decode_reuse_buffers is None:
+            decode_reuse_buffers = max_in_flight + decode_workers + DECODE_HELD_FRAMES
+        self.decode_reuse_buffers = decode_reuse_buffers
         self.cameras: List[NurecSensor] = []
         self.blueprint_library = BlueprintLibrary()
         self.last_time = 0
@@ -725,10 +811,17 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
             self.t_scenario_carla,
             self.blueprint_library,
             self.actor_blueprints,
+            self.decoder,
+            self.decode_reuse_buffers,
         )
 
         self._warm_cache()
 
+        if self.max_in_flight > 0:
+            self.async_renderer = AsyncNurecRenderer(
+                self.renderer, self.max_in_flight, self.decode_workers
+            )
+
         world = self.client.get_world()
         world.on_tick(lambda snapshot: self.render(snapshot))
         world.on_tick(lambda snapshot: self.update(snapshot))
@@ -736,6 +829,14 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
         self.tick()
         return self
 
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.async_renderer is not None:
+            self.async_renderer.close(wait=exc_type is None, timeout=10.0)
+            self.async_renderer = None
+        if self.renderer is not None:
+            self.renderer.decoder.close()
+        return super().__exit__(exc_type, exc_val, exc_tb)
+
     def _warm_cache(self) -> None:
         """
         Renders an initial image at the ego's starting position before the scenario starts.
@@ -810,29 +911,42 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
         if self.scenario is None:
             return
         actors_done_idx = 0
+        commands = []
         try:
-            for i, actor in enumerate(self.actors_to_disable_physics):
+            actors = self.actors_to_disable_physics
+            current_time = self.scenario.tracks.current_time
+            alive = [actor for actor in actors if actor.alive]
+            poses, valid = interpolate_many([actor.track for actor in alive], current_time)
+            poses = self.blueprint_library.apply_offsets_to_poses(
+                poses[valid],
+                [actor.blueprint_id for actor, has_pose in zip(alive, valid) if has_pose],
+                inverse=True,
+            )
+            transforms = iter(mats_to_carla_transforms(poses))
+            valid = iter(valid)
+
+            # One batch for the whole tick, executed in order on the server
+            for i, actor in enumerate(actors):
                 actors_done_idx = i
                 if not actor.alive:
                     continue
                 if not actor.physics:
-                    actor.actor_inst.set_simulate_physics(False)
+                    commands.append(
+                        carla.command.SetSimulatePhysics(actor.actor_inst.id, False)
+                    )
                 else:
                     if self.default_follow_path:
                         self.set_follow_path(actor.track.track_id)
-                        actor.set_physics(
-                            True, self.scenario.tracks.current_time + 100_000
-                        )
+                        actor.set_physics(True, current_time + 100_000)
 
-                next_pose = actor.track.interpolate_pose_matrix(
-                    self.scenario.tracks.current_time
-                )
-                next_pose = self.blueprint_library.apply_offset_to_pose(
-                    next_pose, actor.blueprint_id, inverse=True
+                if not next(valid):
+                    # Retry from this actor on the next tick
+                    raise ValueError(
+                        f"No pose for track {actor.track.track_id} at {current_time}"
+                    )
+                commands.append(
+                    carla.command.ApplyTransform(actor.actor_inst.id, next(transforms))
                 )
-                next_pose = mat_to_carla_transform(next_pose)
-
-                actor.actor_inst.set_transform(next_pose)
         except Exception as e:
             logger.error(f"Error disabling physics for actors: {e}")
             logger.error(e)
@@ -841,6 +955,13 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
                 actors_done_idx:
             ]
 
+        # Commands prepared before a failure are still sent, as the per-actor calls were
+        if commands:
+            try:
+                self.client.apply_batch(commands)
+            except Exception as e:
+                logger.error(f"Error disabling physics for actors: {e}")
+
     def _update_actors(self, time_step: float) -> None:
         if self.scenario is None:
             return
@@ -864,36 +985,42 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
         current_time = self.get_sim_time()
         next_ego_pose = None
 
-        for actor in self.actor_mapping.values():
-            if not actor.physics and actor.alive and actor.track.dynamic:
-
-                # Apply offset for vehicle actors
-                if (
-                    actor.track.label in VEHICLE_LABELS
-                    and actor.blueprint_id is not None
-                ):
-                    next_pose = actor.track.interpolate_pose_matrix(current_time)
-                    if next_pose is None:
-                        continue
-                    # Apply offset using helper method
-                    next_pose_matrix = self.blueprint_library.apply_offset_to_pose(
-                        next_pose, actor.blueprint_id, inverse=True
-                    )
-                    carla_transform = mat_to_carla_transform(next_pose_matrix)
+        moving_actors = [
+            actor
+            for actor in self.actor_mapping.values()
+            if not actor.physics and actor.alive and actor.track.dynamic
+        ]
+        # Interpolate all the tracks at once instead of one SLERP per actor
+        next_poses, valid = interpolate_many(
+            [actor.track for actor in moving_actors], current_time
+        )
 
-                    if actor.track.ego:
-                        next_ego_pose = next_pose_matrix
-                else:
-                    next_pose = actor.track.interpolate_pose_matrix(current_time)
-                    if next_pose is None:
-                        continue
-                    carla_transform = mat_to_carla_transform(next_pose)
-                    if actor.track.ego:
-                        next_ego_pose = actor.track.interpolate_pose_matrix(
-                            current_time
-                        )
+        moving_actors = [actor for actor, has_pose in zip(moving_actors, valid) if has_pose]
+        next_poses = next_poses[valid]
 
-                actor.actor_inst.set_transform(carla_transform)
+        # Apply offset for vehicle actors
+        next_poses = self.blueprint_library.apply_offsets_to_poses(
+            next_poses,
+            [
+                actor.blueprint_id if actor.track.label in VEHICLE_LABELS else None
+                for actor in moving_actors
+            ],
+            inverse=True,
+        )
+        for actor, next_pose in zip(moving_actors, next_poses):
+            if actor.track.ego:
+                next_ego_pose = next_pose
+
+        # A single ApplyTransform batch per tick instead of one set_transform call per actor
+        if moving_actors:
+            self.client.apply_batch(
+                [
+                    carla.command.ApplyTransform(actor.actor_inst.id, transform)
+                    for actor, transform in zip(
+                        moving_actors, mats_to_carla_transforms(next_poses)
+                    )
+                ]
+            )
 
         if self.move_spectator and self.running:
             spectator = self.client.get_world().get_spectator()
@@ -1044,6 +1171,7 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
                 self,
                 framerate,
                 resolution_ratio,
+                self.async_renderer,
             )
         )
 
@@ -1054,8 +1182,25 @@ class NurecScenario(TimeKeeper, NuRecRenderService):
     def render(self, snapshot: carla.WorldSnapshot) -> None:
         if self.seconds_since_start() == 0:
             return
+        if self.async_renderer is not None or self.renderer is None:
+            for camera in self.cameras:
+                camera.on_world_tick(snapshot)
+            return
+
+        # Render the cameras due this tick together and decode their images as a batch
+        due = []
         for camera in self.cameras:
-            camera.on_world_tick(snapshot)
+            pose = camera.camera_pose(snapshot)
+            if pose is not None:
+                due.append((camera, pose))
+        if not due:
+            return
+        images = self.renderer.render_many(
+            snapshot,
+            [(camera.camera_spec, pose, camera.resolution_ratio) for camera, pose in due],
+        )
+        for (camera, _), image in zip(due, images):
+            camera.on_image(image)
 
     def get_sim_time(self) -> int:
         """
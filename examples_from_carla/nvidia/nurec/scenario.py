@@ -12,6 +12,10 @@ camera calibrations, and metadata from NUREC reconstructions.
 Key Classes:
 - Scenario: Main class representing a complete NUREC scenario with tracks and metadata
 - Tracks: Collection manager for handling track activation/deactivation over time
+- IntervalIndex: Static interval tree finding the tracks alive at a timestamp
+- TrackStore: Poses and timestamps of all tracks packed into flat arrays
+- TrackRecord: Metadata of a track whose Track object is only built when it is activated
+- ScenarioData: Everything read from a USDZ file, saved to and loaded from the cached sidecar
 - CameraCalibration: Dataclass for camera calibration parameters
 - CameraModel: Dataclass for camera model specifications
 - CameraModelParameters: Dataclass for detailed camera parameters
@@ -22,6 +26,7 @@ Key Functions:
 - get_best_camera: Select optimal camera from available options
 - get_spectator: Create spectator track from ego and camera data
 - get_camera_calibrations: Parse camera calibration data
+- load_scenario_data: Read the scenario data from a USDZ file or its cached sidecar
 
 The module supports:
 - Loading NUREC scenarios from USDZ files
@@ -30,6 +35,9 @@ The module supports:
 - Coordinate system transformations between world and local frames
 - Ego vehicle and spectator camera management
 - Track filtering based on minimum lifetime requirements
+- Seeking to an arbitrary timestamp of the replay
+- Caching the parsed tracks in a binary sidecar next to the USDZ file, so that a
+  scenario opens without parsing its JSON again
 
 NUREC scenarios contain reconstructed 3D environments with tracked objects,
 camera trajectories, and calibration data that can be replayed in CARLA
@@ -38,11 +46,15 @@ with photorealistic neural rendering.
 
 import zipfile
 import json
+import hashlib
+import heapq
+import os
+import tempfile
 import numpy as np
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Union
 from dataclasses import dataclass
-from track import Track, PoseType
+from track import Track, PoseType, interpolate_many, lowpass_filter_vertical_component_batched
 from constants import (
     EGO_TRACK_ID,
     EGO_LABEL,
@@ -52,6 +64,7 @@ from constants import (
     SPECTATOR_LABEL,
     SPECTATOR_FLAG,
     DYNAMIC_FLAG,
+    CONTROLLABLE_FLAG,
 )
 
 logging.basicConfig(level=logging.DEBUG)
@@ -125,35 +138,467 @@ def extract_poses_from_json(json_array: Dict[str, Any], filter_vertical_poses: b
     return track_data
 
 
+# Bump when the layout of the cached sidecar files changes
+_CACHE_VERSION = 2
+
+SCENARIO_JSON_FILES = ["rig_trajectories.json", "sequence_tracks.json", "data_info.json"]
+
+
+class TrackRecord:
+    """
+    Metadata of one track of a TrackStore. The poses stay in the store's packed arrays
+    until load() builds the Track, which is what Tracks does when the track is activated.
+    """
+
+    def __init__(self, store: "TrackStore", index: int):
+        self.store = store
+        self.index = index
+        self.track_id = store.track_ids[index]
+        self.label = store.labels[index]
+        self.flags = store.flags[index]
+        self.dims = store.dims[index]
+        self.dynamic = DYNAMIC_FLAG in self.flags
+        self.controllable = CONTROLLABLE_FLAG in self.flags
+        self.ego = EGO_FLAG in self.flags
+        self.spectator = SPECTATOR_FLAG in self.flags
+        begin, end = store.offsets[index], store.offsets[index + 1]
+        self._start_time = store.timestamps[begin] if end > begin else 0
+        self._end_time = store.timestamps[end - 1] if end > begin else 0
+
+    def start_time(self) -> float:
+        return self._start_time
+
+    def end_time(self) -> float:
+        return self._end_time
+
+    def load(self) -> Track:
+        """
+        Build the Track of this record.
+        """
+        return self.store.load_track(self.index)
+
+
+class TrackStore:
+    """
+    Poses and timestamps of all the tracks of a scenario, concatenated into flat arrays.
+    Track i owns rows offsets[i]:offsets[i + 1] of timestamps and poses.
+    """
+
+    def __init__(
+        self,
+        track_ids: List[str],
+        labels: List[str],
+        flags: List[List[str]],
+        dims: List[Optional[List[float]]],
+        offsets: np.ndarray,
+        timestamps: np.ndarray,
+        poses: np.ndarray,
+        filter_vertical_poses: bool = False,
+    ):
+        """
+        Args:
+            track_ids: Track identifiers
+            labels: Class label of each track
+            flags: Flags of each track
+            dims: Dimensions of each track, or None
+            offsets: (n_tracks + 1,) start row of each track in timestamps and poses
+            timestamps: (n_poses,) timestamps in microseconds
+            poses: (n_poses, 7) poses as [x, y, z, qx, qy, qz, qw]
+            filter_vertical_poses: Whether the vertical component of the poses has been filtered
+        """
+        self.track_ids = track_ids
+        self.labels = labels
+        self.flags = flags
+        self.dims = dims
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.poses = poses
+        self.filter_vertical_poses = filter_vertical_poses
+
+    @classmethod
+    def from_json(cls, json_array: Dict[str, Any], filter_vertical_poses: bool = False) -> "TrackStore":
+        """
+        Pack the tracks of sequence_tracks.json into flat arrays.
+
+        The vertical filtering of all tracks is done here in one batch, so building a
+        Track later costs no filtering.
+
+        Args:
+            json_array (dict): Dictionary containing parsed JSON data with track information
+            filter_vertical_poses (bool): If True, filter the vertical component of all tracks
+        """
+        chunk = json_array["sequence_tracks.json"]["dummy_chunk_id"]
+        tracks_data = chunk["tracks_data"]
+        track_ids = list(tracks_data["tracks_id"])
+
+        pose_arrays = [
+            np.asarray(poses, dtype=np.float64).reshape(-1, 7)
+            for poses in tracks_data["tracks_poses"]
+        ]
+        timestamp_arrays = [
+            np.asarray(timestamps).reshape(-1) for timestamps in tracks_data["tracks_timestamps_us"]
+        ]
+        offsets = np.zeros(len(track_ids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(timestamps) for timestamps in timestamp_arrays])
+        poses = np.concatenate(pose_arrays) if pose_arrays else np.empty((0, 7))
+        if filter_vertical_poses:
+            poses[:, :3] = lowpass_filter_vertical_component_batched(poses[:, :3], offsets)
+
+        return cls(
+            track_ids,
+            list(tracks_data["tracks_label_class"]),
+            [list(flags) for flags in tracks_data["tracks_flags"]],
+            list(chunk["cuboidtracks_data"]["cuboids_dims"]),
+            offsets,
+            np.concatenate(timestamp_arrays) if timestamp_arrays else np.empty(0),
+            poses,
+            filter_vertical_poses,
+        )
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def records(self) -> List[TrackRecord]:
+        return [TrackRecord(self, i) for i in range(len(self))]
+
+    def load_track(self, index: int) -> Track:
+        """
+        Build the Track object of track `index`.
+        """
+        begin, end = self.offsets[index], self.offsets[index + 1]
+        return Track(
+            self.track_ids[index],
+            self.poses[begin:end],
+            self.timestamps[begin:end],
+            self.dims[index],
+            self.labels[index],
+            self.flags[index],
+        )
+
+
+class ScenarioData:
+    """
+    Everything a Scenario reads from its USDZ file, in compact form.
+    """
+
+    def __init__(
+        self,
+        store: TrackStore,
+        metadata: Dict[str, Any],
+        rig_trajectories: Dict[str, Any],
+        ego_poses: np.ndarray,
+        ego_timestamps: np.ndarray,
+    ):
+        """
+        Args:
+            store: Packed tracks of the scenario
+            metadata: Content of data_info.json
+            rig_trajectories: rig_trajectories.json without the rig trajectories themselves
+            ego_poses: (N, 4, 4) poses of the first rig trajectory
+            ego_timestamps: (N,) timestamps of the ego poses in microseconds
+        """
+        self.store = store
+        self.metadata = metadata
+        self.rig_trajectories = rig_trajectories
+        self.ego_poses = ego_poses
+        self.ego_timestamps = ego_timestamps
+
+    @classmethod
+    def from_usdz(cls, usdz_file: str, filter_vertical_poses: bool = False) -> "ScenarioData":
+        """
+        Parse the scenario JSON files of a USDZ archive.
+        """
+        json_array = extract_json_from_usdz(usdz_file, SCENARIO_JSON_FILES)
+        rig_json = json_array["rig_trajectories.json"]
+        rig_trajectory = rig_json["rig_trajectories"][0]
+        return cls(
+            TrackStore.from_json(json_array, filter_vertical_poses),
+            json_array["data_info.json"],
+            {key: value for key, value in rig_json.items() if key != "rig_trajectories"},
+            np.asarray(rig_trajectory["T_rig_worlds"], dtype=np.float64).reshape(-1, 4, 4),
+            np.asarray(rig_trajectory["T_rig_world_timestamps_us"]).reshape(-1),
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the data to an uncompressed npz file, atomically.
+        """
+        store = self.store
+        header = {
+            "version": _CACHE_VERSION,
+            "filter_vertical_poses": store.filter_vertical_poses,
+            "track_ids": store.track_ids,
+            "labels": store.labels,
+            "flags": store.flags,
+            "dims": store.dims,
+            "metadata": self.metadata,
+            "rig_trajectories": self.rig_trajectories,
+        }
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".scenario_", suffix=".npz.tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    header=np.array(json.dumps(header)),
+                    offsets=store.offsets,
+                    timestamps=store.timestamps,
+                    poses=store.poses,
+                    ego_poses=self.ego_poses,
+                    ego_timestamps=self.ego_timestamps,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "ScenarioData":
+        """
+        Read data written by save().
+
+        Raises:
+            ValueError: If the file was written with another cache version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            if header.get("version") != _CACHE_VERSION:
+                raise ValueError(f"Unsupported cache version {header.get('version')}")
+            store = TrackStore(
+                header["track_ids"],
+                header["labels"],
+                header["flags"],
+                header["dims"],
+                data["offsets"],
+                data["timestamps"],
+                data["poses"],
+                header["filter_vertical_poses"],
+            )
+            return cls(
+                store,
+                header["metadata"],
+                header["rig_trajectories"],
+                data["ego_poses"],
+                data["ego_timestamps"],
+            )
+
+
+def usdz_content_key(usdz_file: str, filter_vertical_poses: bool = False) -> str:
+    """
+    Key of the scenario content of a USDZ file.
+
+    Hashes the CRC32 and size of the scenario JSON members recorded in the zip
+    directory, so the (possibly very large) archive is never read in full.
+    """
+    h = hashlib.sha1()
+    with zipfile.ZipFile(usdz_file, "r") as zip_ref:
+        for name in SCENARIO_JSON_FILES:
+            info = zip_ref.getinfo(name)
+            h.update(f"{name}:{info.CRC}:{info.file_size};".encode())
+    h.update(f"filter={filter_vertical_poses};version={_CACHE_VERSION}".encode())
+    return h.hexdigest()
+
+
+def load_scenario_data(
+    usdz_file: str,
+    filter_vertical_poses: bool = False,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True,
+) -> ScenarioData:
+    """
+    Read the scenario data of a USDZ file, from its cached sidecar when there is one.
+
+    The first time a scenario is opened its JSON files are parsed and the result is
+    written to <cache_dir>/<usdz name>.<content key>.npz. Later opens only load the
+    arrays of that file.
+
+    Args:
+        usdz_file (str): Path to the USDZ file
+        filter_vertical_poses (bool): If True, filter the vertical component of the tracks
+        cache_dir (str): Directory of the sidecar files, defaults to the directory of the USDZ file
+        use_cache (bool): If False, always parse the USDZ file and write no sidecar
+
+    Returns:
+        ScenarioData: The parsed scenario data
+    """
+    if not use_cache:
+        return ScenarioData.from_usdz(usdz_file, filter_vertical_poses)
+
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(usdz_file))
+    key = usdz_content_key(usdz_file, filter_vertical_poses)
+    cache_path = os.path.join(
+        cache_dir, f"{os.path.basename(usdz_file)}.{key[:16]}.npz"
+    )
+
+    if os.path.exists(cache_path):
+        try:
+            data = ScenarioData.load(cache_path)
+            logger.debug(f"Loaded scenario data from {cache_path}")
+            return data
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable scenario cache {cache_path}: {e}")
+
+    data = ScenarioData.from_usdz(usdz_file, filter_vertical_poses)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        data.save(cache_path)
+        logger.debug(f"Saved scenario data to {cache_path}")
+    except OSError as e:
+        logger.warning(f"Could not write scenario cache {cache_path}: {e}")
+    return data
+
+
+class IntervalIndex:
+    """
+    Static centered interval tree over [start, end] intervals, answering which intervals
+    contain a timestamp in O(log n + k) for k results.
+
+    Every node keeps the intervals containing its center, sorted by start and by end.
+    Intervals entirely before the center go to the left subtree, the ones entirely
+    after it to the right subtree.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        """
+        Args:
+            starts: (n,) start of each interval
+            ends: (n,) end of each interval, not smaller than its start
+        """
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        # Flat node storage: center, then by-start and by-end orders of the node's intervals
+        self._centers: List[float] = []
+        self._by_start: List[np.ndarray] = []
+        self._sorted_starts: List[np.ndarray] = []
+        self._by_end: List[np.ndarray] = []
+        self._sorted_ends: List[np.ndarray] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(np.arange(len(self.starts)))
+
+    def _build(self, indices: np.ndarray) -> int:
+        if len(indices) == 0:
+            return -1
+        starts, ends = self.starts[indices], self.ends[indices]
+        center = float(np.median(np.concatenate([starts, ends])))
+        before = ends < center
+        after = starts > center
+        here = indices[~(before | after)]
+
+        node = len(self._centers)
+        self._centers.append(center)
+        by_start = here[np.argsort(self.starts[here], kind="stable")]
+        by_end = here[np.argsort(-self.ends[here], kind="stable")]
+        self._by_start.append(by_start)
+        self._sorted_starts.append(self.starts[by_start])
+        self._by_end.append(by_end)
+        # Negated so that it is ascending for searchsorted
+        self._sorted_ends.append(-self.ends[by_end])
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(indices[before])
+        self._right[node] = self._build(indices[after])
+        return node
+
+    def stab(self, timestamp: float) -> np.ndarray:
+        """
+        Indices of the intervals with start <= timestamp <= end, in ascending order.
+        """
+        found = []
+        node = self._root
+        while node >= 0:
+            center = self._centers[node]
+            if timestamp < center:
+                count = np.searchsorted(self._sorted_starts[node], timestamp, side="right")
+                found.append(self._by_start[node][:count])
+                node = self._left[node]
+            else:
+                count = np.searchsorted(self._sorted_ends[node], -timestamp, side="right")
+                found.append(self._by_end[node][:count])
+                node = self._right[node] if timestamp > center else -1
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+
 class Tracks:
     """
     Manages a collection of track objects, handling their activation and deactivation over time.
     Provides methods to update track states based on time progression.
+
+    Entries can be Track objects or TrackRecords. A TrackRecord is turned into its Track
+    when the track becomes active and released again when it expires.
+
+    Activation walks the tracks sorted by start time, active tracks expire through a
+    heap ordered by end time, so an update only touches the tracks that start or end.
+    seek() jumps to any timestamp through an IntervalIndex of the track lifetimes.
     """
-    def __init__(self, track_data, zero_time):
+    def __init__(self, track_data: List[Union[Track, TrackRecord]], zero_time):
         """
         Initialize the Tracks collection.
         
         Args:
-            track_data (list): List of Track objects to manage
+            track_data (list): List of Track or TrackRecord objects to manage
             zero_time (float): Reference time in microseconds to use as the starting point
         """
         track_data.sort(key=lambda x: x.start_time())
         self.track_data = track_data
+        self.tracks_by_id = {track.track_id: track for track in track_data}
+        self.start_times = np.array([track.start_time() for track in track_data], dtype=np.float64)
+        self.end_times = np.array([track.end_time() for track in track_data], dtype=np.float64)
+        self.lifetimes = self.end_times - self.start_times
+        self._interval_index: Optional[IntervalIndex] = None
+        self._loaded: Dict[str, Track] = {}
+        self.view_transform: Optional[np.ndarray] = None
         self.zero_time = zero_time
         self.current_time = self.zero_time
-        self.active_tracks = []
+        # Active tracks by index into track_data, in activation order
+        self._active: Dict[int, Track] = {}
+        # (end time, index) of the active tracks
+        self._expiry: List[Tuple[float, int]] = []
         self.track_index = 0
         self.min_lifetime = 1 / 10
 
+    @property
+    def active_tracks(self) -> List[Track]:
+        """Currently active tracks, in activation order"""
+        return list(self._active.values())
+
     def reset(self) -> None:
         """
         Reset the tracks collection to its initial state, setting current time to zero time
         and clearing active tracks.
         """
         self.current_time = self.zero_time
-        self.active_tracks = []
+        self._active = {}
+        self._expiry = []
         self.track_index = 0
+        self._loaded = {}
+
+    def get_track(self, track_id: str) -> Track:
+        """
+        Get the Track object of a track, building it if it is not loaded.
+        
+        Args:
+            track_id (str): ID of the track
+            
+        Returns:
+            Track: The track
+        """
+        track = self._loaded.get(track_id)
+        if track is not None:
+            return track
+        entry = self.tracks_by_id[track_id]
+        if isinstance(entry, TrackRecord):
+            track = entry.load()
+            if self.view_transform is not None:
+                track.set_transform(self.view_transform)
+        else:
+            track = entry
+        self._loaded[track_id] = track
+        return track
 
     def update(self, time_step: float) -> Tuple[List[Track], List[Track]]:
         """
@@ -168,29 +613,86 @@ class Tracks:
         """
         self.current_time += time_step
 
-        tracks_to_remove = []
-        for track in self.active_tracks:
-            if self.current_time > track.end_time():
-                tracks_to_remove.append(track)
-
-        for track in tracks_to_remove:
-            self.active_tracks.remove(track)
+        expired = []
+        while self._expiry and self._expiry[0][0] < self.current_time:
+            expired.append(heapq.heappop(self._expiry)[1])
+        # Tracks are activated in index order, so this keeps the activation order
+        expired.sort()
+        tracks_to_remove = [self._deactivate(index) for index in expired]
 
+        end_index = int(np.searchsorted(self.start_times, self.current_time, side="right"))
         new_tracks = []
+        if end_index > self.track_index:
+            for index in self._eligible(np.arange(self.track_index, end_index)).tolist():
+                new_tracks.append(self._activate(index))
+                heapq.heappush(self._expiry, (self.end_times[index], index))
+            self.track_index = end_index
 
-        while (
-            self.track_index < len(self.track_data)
-            and self.track_data[self.track_index].start_time() <= self.current_time
-        ):
-            next_track = self.track_data[self.track_index]
-            lifetime = next_track.end_time() - next_track.start_time()
-            if lifetime > self.min_lifetime:
-                self.active_tracks.append(next_track)
-                new_tracks.append(next_track)
-            self.track_index += 1
+        return new_tracks, tracks_to_remove
 
+    def seek(self, timestamp: float) -> Tuple[List[Track], List[Track]]:
+        """
+        Jump to a timestamp, e.g. to restart a replay part way through, without walking
+        through the time in between. The tracks active afterwards are the ones alive at
+        the timestamp (start <= timestamp <= end) and longer than the minimum lifetime.
+        
+        Args:
+            timestamp (float): Absolute time in microseconds
+            
+        Returns:
+            tuple: (new_tracks, tracks_to_remove) - Lists of Track objects that became active
+                  and inactive compared to the state before the seek
+        """
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(self.start_times, self.end_times)
+        alive = set(self._eligible(self._interval_index.stab(timestamp)).tolist())
+
+        tracks_to_remove = [
+            self._deactivate(index) for index in list(self._active) if index not in alive
+        ]
+        new_tracks = [
+            self._activate(index) for index in sorted(alive) if index not in self._active
+        ]
+        self._expiry = [(self.end_times[index], index) for index in self._active]
+        heapq.heapify(self._expiry)
+
+        self.current_time = timestamp
+        self.track_index = int(np.searchsorted(self.start_times, timestamp, side="right"))
         return new_tracks, tracks_to_remove
 
+    def _eligible(self, indices: np.ndarray) -> np.ndarray:
+        return indices[self.lifetimes[indices] > self.min_lifetime]
+
+    def _activate(self, index: int) -> Track:
+        track = self.get_track(self.track_data[index].track_id)
+        self._active[index] = track
+        return track
+
+    def _deactivate(self, index: int) -> Track:
+        track = self._active.pop(index)
+        self._loaded.pop(track.track_id, None)
+        return track
+
+    def interpolate_many(
+        self, track_ids: List[str], timestamp: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate the poses of several tracks at one timestamp in a single vectorized call.
+        
+        Args:
+            track_ids (list): IDs of the tracks to interpolate
+            timestamp (float): Timestamp in microseconds, defaults to the current time
+            
+        Returns:
+            tuple: (poses, valid) - (M, 4, 4) array of transformation matrices and (M,)
+                  boolean mask of the tracks that have a pose at the timestamp
+        """
+        if timestamp is None:
+            timestamp = self.current_time
+        return interpolate_many(
+            [self.get_track(track_id) for track_id in track_ids], timestamp
+        )
+
     def get_current_time_seconds(self) -> float:
         """
         Return the current time in seconds relative to zero time
@@ -212,8 +714,12 @@ class Tracks:
     def get_all_possible_tracks(self) -> List[Track]:
         """
         Get all possible tracks in the scenario that are longer than the minimum lifetime.
+        This builds the Track objects of all of them.
         """
-        return [track for track in self.track_data if track.end_time() - track.start_time() > self.min_lifetime]
+        return [
+            self.get_track(self.track_data[index].track_id)
+            for index in self._eligible(np.arange(len(self.track_data)))
+        ]
 
     def set_view_transform(self, transform: np.ndarray) -> None:
         """
@@ -222,7 +728,11 @@ class Tracks:
         Args:
             transform (numpy.ndarray): Transformation matrix to apply
         """
+        self.view_transform = transform
         for track in self.track_data:
+            if isinstance(track, Track):
+                track.set_transform(transform)
+        for track in self._loaded.values():
             track.set_transform(transform)
 
 
@@ -343,39 +853,39 @@ class Scenario:
     """
     Represents a NUREC scenario loaded from a USDZ file, containing track data,
     ego vehicle poses, and spectator information.
+
+    Object tracks are kept packed in a TrackStore, their Track objects are only
+    built when Tracks activates them.
     """
-    def __init__(self, usdz_file: str) -> None:
+    def __init__(self, usdz_file: str, cache_dir: Optional[str] = None, use_cache: bool = True) -> None:
         """
         Initialize a scenario from a USDZ file.
         
         Args:
             usdz_file (str): Path to the USDZ file containing scenario data
+            cache_dir (str): Directory of the parsed scenario cache, defaults to the directory of the USDZ file
+            use_cache (bool): If False, always parse the USDZ file and write no cache
         """
-        json_array = extract_json_from_usdz(
-            usdz_file,
-            ["rig_trajectories.json", "sequence_tracks.json", "data_info.json"],
+        data = load_scenario_data(
+            usdz_file, filter_vertical_poses=True, cache_dir=cache_dir, use_cache=use_cache
         )
-        track_data = extract_poses_from_json(json_array, filter_vertical_poses=True)
-        self.metadata = json_array["data_info.json"]
-        self.camera_calibrations : Dict[str, CameraCalibration] = get_camera_calibrations(json_array)
-        self.t_world_base = np.array(
-            json_array["rig_trajectories.json"]["T_world_base"]
+        self.metadata = data.metadata
+        self.camera_calibrations : Dict[str, CameraCalibration] = get_camera_calibrations(
+            {"rig_trajectories.json": data.rig_trajectories}
         )
+        self.t_world_base = np.array(data.rig_trajectories["T_world_base"])
         self.ego_poses = Track(
             EGO_TRACK_ID,
-            json_array["rig_trajectories.json"]["rig_trajectories"][0]["T_rig_worlds"],
-            json_array["rig_trajectories.json"]["rig_trajectories"][0][
-                "T_rig_world_timestamps_us"
-            ],
+            data.ego_poses,
+            data.ego_timestamps,
             EGO_DIMS,
             EGO_LABEL,
             [EGO_FLAG, DYNAMIC_FLAG],
             PoseType.TRANSFORM_MATRIX,
         )
 
-        self.spectator = get_spectator(
-            json_array["rig_trajectories.json"], self.ego_poses
-        )
+        self.spectator = get_spectator(data.rig_trajectories, self.ego_poses)
+        track_data = data.store.records()
         self.controllable_tracks = set()
         for track in track_data:
             if track.controllable:
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+NUREC Client Benchmark
+
+Replays a NUREC scenario against the local SensorsimService stand-in (or any running
+NUREC service) without CARLA, and reports the client-side cost of each tick:
+
+- tracks: activation and deactivation of tracks (Tracks.update)
+- interpolation: pose interpolation of all active tracks
+- actor transforms: conversion of the poses to CARLA transforms, as seen by the renderer
+- request building: generation of the render requests of all cameras
+- render wait: time the tick blocks on the service (synchronous mode only)
+- decode: per-frame image decode latency
+
+together with ticks/s and the render round-trip time. The tick loop runs as fast as
+possible, so ticks/s is the throughput limit of the client, not a real-time replay.
+
+Run it from the nurec directory, the blueprint size files are read from there:
+    python tools/benchmark_nurec_client.py --usdz-filename /path/to/scenario.usdz --latency-ms 30 --max-in-flight 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_renderer import AsyncNurecRenderer
+from blueprint_library import BlueprintLibrary
+from constants import VEHICLE_LABELS
+from local_sensorsim_server import LocalSensorsimService, camera_specs_from_usdz, serve
+from nurec_integration import NurecRenderer
+from scenario import Scenario
+from track import interpolate_many
+from utils import mats_to_carla_transforms
+
+logger = logging.getLogger("benchmark_nurec_client")
+
+
+class ReplayActor:
+    """
+    Stand-in for a carla.ActorSnapshot, carrying the id and transform read by generate_request.
+    """
+
+    __slots__ = ("id", "transform")
+
+    def __init__(self, actor_id, transform):
+        self.id = actor_id
+        self.transform = transform
+
+    def get_transform(self):
+        return self.transform
+
+
+def summarize(name: str, values_ms: List[float]) -> str:
+    if not values_ms:
+        return f"{name:<20} {'-':>9}"
+    values = np.array(values_ms)
+    return (
+        f"{name:<20} {values.mean():9.3f} {np.percentile(values, 50):9.3f} "
+        f"{np.percentile(values, 95):9.3f} {values.max():9.3f}"
+    )
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("-u", "--usdz-filename", required=True, help="USDZ file of the scenario to replay")
+    argparser.add_argument("--host", default=None, help="host of a running NUREC service, by default a local stand-in is started")
+    argparser.add_argument("-np", "--nurec-port", default=0, type=int, help="port of the NUREC service (default: free port for the stand-in)")
+    argparser.add_argument("--latency-ms", default=20.0, type=float, help="render latency of the stand-in (default: 20)")
+    argparser.add_argument("--jitter-ms", default=5.0, type=float, help="extra random render latency of the stand-in (default: 5)")
+    argparser.add_argument("--fps", default=30, type=float, help="replay ticks per scenario second (default: 30)")
+    argparser.add_argument("--ticks", default=0, type=int, help="number of ticks, 0 replays the whole scenario (default: 0)")
+    argparser.add_argument("--cameras", default="all", help="comma separated logical camera names (default: all)")
+    argparser.add_argument("--render-every", default=1, type=int, help="render the cameras every N ticks (default: 1)")
+    argparser.add_argument("--resolution-ratio", default=0.25, type=float, help="render resolution scale (default: 0.25)")
+    argparser.add_argument("--max-in-flight", default=0, type=int, help="render requests in flight, 0 renders synchronously (default: 0)")
+    argparser.add_argument("--decode-workers", default=2, type=int, help="decode threads in asynchronous mode (default: 2)")
+    argparser.add_argument("--decoder", default="auto", help="image decoder backend (default: auto)")
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Scenario loading logs every track at debug level
+    logging.getLogger().setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    scenario = Scenario(args.usdz_filename)
+    load_s = time.perf_counter() - start
+    tracks = scenario.tracks
+    tracks.set_mininmum_lifetime(1 / 10)
+    scenario.ego_poses.set_ignore_out_of_bounds(True)
+
+    server = None
+    host, port = args.host, args.nurec_port
+    if host is None:
+        service = LocalSensorsimService(
+            camera_specs_from_usdz(args.usdz_filename), args.latency_ms, args.jitter_ms
+        )
+        server, port = serve(service, port, max_workers=max(16, 2 * args.max_in_flight))
+        host = "localhost"
+
+    blueprint_library = BlueprintLibrary()
+    active_actors: Dict[int, str] = {}
+    actor_blueprints: Dict[int, str] = {}
+    renderer = NurecRenderer(
+        scenario, host, port, active_actors, np.eye(4), blueprint_library, actor_blueprints, args.decoder
+    )
+    async_renderer = None
+    if args.max_in_flight > 0:
+        async_renderer = AsyncNurecRenderer(renderer, args.max_in_flight, args.decode_workers)
+
+    camera_transforms = {
+        calibration.logical_sensor_name: np.array(calibration.T_sensor_rig)
+        for calibration in scenario.camera_calibrations.values()
+    }
+    camera_names = list(camera_transforms) if args.cameras == "all" else args.cameras.split(",")
+    cameras = [
+        (name, renderer.get_camera_spec(name), camera_transforms[name]) for name in camera_names
+    ]
+
+    tick_us = 1e6 / args.fps
+    scenario_end = scenario.metadata["pose-range"]["end-timestamp_us"]
+    max_ticks = args.ticks if args.ticks > 0 else int((scenario_end - tracks.zero_time) / tick_us)
+
+    timings = defaultdict(list)
+    round_trips_ms: List[float] = []
+    frames = {"delivered": 0}
+    track_actors: Dict[str, ReplayActor] = {}
+    next_actor_id = 1
+
+    def count_frame(image):
+        frames["delivered"] += 1
+
+    logger.info(
+        f"Replaying {max_ticks} ticks with {len(cameras)} cameras, "
+        f"{'max %d in flight' % args.max_in_flight if async_renderer else 'synchronous rendering'}, "
+        f"decoder {renderer.decoder.name}"
+    )
+    run_start = time.perf_counter()
+    for tick in range(max_ticks):
+        t0 = time.perf_counter()
+        new_tracks, removed_tracks = tracks.update(tick_us)
+        for track in removed_tracks:
+            actor = track_actors.pop(track.track_id, None)
+            if actor is not None:
+                del active_actors[actor.id]
+        for track in new_tracks:
+            if not (track.label in VEHICLE_LABELS or track.label == "person"):
+                continue
+            blueprint = blueprint_library.get_best_fit_blueprint(track.dims, track.label != "person")
+            actor = ReplayActor(next_actor_id, None)
+            next_actor_id += 1
+            track_actors[track.track_id] = actor
+            active_actors[actor.id] = track.track_id
+            actor_blueprints[actor.id] = blueprint.id
+
+        t1 = time.perf_counter()
+        moving = [tracks.get_track(track_id) for track_id in track_actors]
+        poses, valid = interpolate_many(moving + [scenario.ego_poses], tracks.current_time)
+
+        t2 = time.perf_counter()
+        placed = [track for track, has_pose in zip(moving, valid[:-1]) if has_pose]
+        snapshot = [track_actors[track.track_id] for track in placed]
+        actor_poses = blueprint_library.apply_offsets_to_poses(
+            poses[:-1][valid[:-1]],
+            [actor_blueprints[actor.id] if track.label in VEHICLE_LABELS else None for track, actor in zip(placed, snapshot)],
+            inverse=True,
+        )
+        for actor, transform in zip(snapshot, mats_to_carla_transforms(actor_poses)):
+            actor.transform = transform
+        ego_pose = poses[-1]
+
+        t3 = time.perf_counter()
+        timings["tracks"].append((t1 - t0) * 1000)
+        timings["interpolation"].append((t2 - t1) * 1000)
+        timings["actor transforms"].append((t3 - t2) * 1000)
+
+        if tick % args.render_every == 0 and cameras:
+            if async_renderer is not None:
+                for name, camera_spec, transform in cameras:
+                    async_renderer.submit(
+                        name, count_frame, snapshot, camera_spec, ego_pose @ transform, args.resolution_ratio
+                    )
+                timings["request building"].append((time.perf_counter() - t3) * 1000)
+            else:
+                requests = [
+                    renderer.build_request(snapshot, camera_spec, ego_pose @ transform, args.resolution_ratio)
+                    for _, camera_spec, transform in cameras
+                ]
+                t4 = time.perf_counter()
+                sent = time.perf_counter()
+                futures = [renderer.client_service.render_rgb.future(request) for request in requests]
+                responses = []
+                for future in futures:
+                    responses.append(future.result())
+                    round_trips_ms.append((time.perf_counter() - sent) * 1000)
+                t5 = time.perf_counter()
+                for image in renderer.decoder.decode_many([response.image_bytes for response in responses]):
+                    count_frame(image)
+                timings["request building"].append((t4 - t3) * 1000)
+                timings["render wait"].append((t5 - t4) * 1000)
+
+        timings["tick"].append((time.perf_counter() - t0) * 1000)
+
+    loop_s = time.perf_counter() - run_start
+    if async_renderer is not None:
+        async_renderer.close(wait=True)
+        round_trips_ms = list(async_renderer.round_trip_ms)
+    drain_s = time.perf_counter() - run_start
+    renderer.decoder.close()
+    if server is not None:
+        server.stop(0)
+
+    decode = renderer.decoder.latency_stats()
+    print()
+    print(f"scenario load        {load_s:9.3f} s")
+    print(f"ticks                {max_ticks:9d}")
+    print(f"ticks/s              {max_ticks / loop_s:9.1f}")
+    print(f"frames delivered     {frames['delivered']:9d} ({frames['delivered'] / drain_s:.1f} frames/s incl. drain)")
+    print()
+    print(f"{'per tick [ms]':<20} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name in ("tick", "tracks", "interpolation", "actor transforms", "request building", "render wait"):
+        print(summarize(name, timings[name]))
+    print()
+    print(f"{'per frame [ms]':<20} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    print(summarize("render round trip", round_trips_ms))
+    print(
+        f"{'decode':<20} {decode['mean_ms']:9.3f} {decode['p50_ms']:9.3f} "
+        f"{decode['p95_ms']:9.3f} {decode['max_ms']:9.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
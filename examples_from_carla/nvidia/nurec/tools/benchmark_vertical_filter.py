@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# SPDX-FileCopyrightText: © 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Vertical Filter Benchmark
+
+Times the grade-based vertical filtering done for every track when a scenario is
+loaded, comparing:
+
+- reference: the previous per-step Python loop implementation, kept below
+- per-track: lowpass_filter_vertical_component called once per track
+- batched: lowpass_filter_vertical_component_batched over all tracks at once
+
+and reports the largest difference of the filtered z positions to the reference.
+The tracks are read from a USDZ file, or generated with the sizes of a typical clip
+(a few hundred tracks of up to 20 s at 10 Hz, some of them parked).
+
+Run it from the nurec directory:
+    python tools/benchmark_vertical_filter.py --usdz-filename /path/to/scenario.usdz
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import List, Tuple
+
+import numpy as np
+from scipy.interpolate import interp1d
+from scipy.signal import butter, filtfilt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from track import lowpass_filter_vertical_component, lowpass_filter_vertical_component_batched
+
+
+def reference_filter(
+    poses: np.ndarray,
+    threshold: float = 0.01,
+    max_slope: float = 0.25,
+    window_size: int = 5,
+    cutoff_freq: float = 0.05,
+) -> np.ndarray:
+    """
+    The previous loop implementation of lowpass_filter_vertical_component, without its logging.
+    """
+    if len(poses) < 3:
+        return poses
+    positions = poses[:, :3, 3]
+
+    horizontal_distances_list = []
+    grades_list = []
+    for i in range(len(poses) - 1):
+        dx = positions[i + 1, 0] - positions[i, 0]
+        dy = positions[i + 1, 1] - positions[i, 1]
+        dz = positions[i + 1, 2] - positions[i, 2]
+        horizontal_distance = np.sqrt(dx**2 + dy**2)
+        horizontal_distances_list.append(horizontal_distance)
+        grades_list.append(dz / horizontal_distance if horizontal_distance > threshold else 0.0)
+    horizontal_distances = np.array(horizontal_distances_list)
+    grades = np.array(grades_list)
+
+    constrained_grades = np.copy(grades)
+    for i in range(len(grades)):
+        if abs(constrained_grades[i]) > max_slope:
+            constrained_grades[i] = np.sign(constrained_grades[i]) * max_slope
+
+    filtered_grades = constrained_grades.copy()
+    if len(constrained_grades) > 10:
+        cumulative_distances = np.cumsum(np.concatenate([[0], horizontal_distances]))
+        if window_size > 1:
+            kernel = np.ones(window_size) / window_size
+            filtered_grades = np.convolve(constrained_grades, kernel, mode="same")
+        if len(filtered_grades) > 20:
+            distances_for_interp = cumulative_distances[1:]
+            if len(np.unique(distances_for_interp)) < len(distances_for_interp):
+                epsilon = 1e-6
+                fixed_distances = distances_for_interp.copy()
+                for i in range(1, len(fixed_distances)):
+                    if fixed_distances[i] <= fixed_distances[i - 1]:
+                        fixed_distances[i] = fixed_distances[i - 1] + epsilon
+                        epsilon += 1e-6
+                distances_for_interp = fixed_distances
+            total_distance = distances_for_interp[-1] - distances_for_interp[0]
+            n_uniform = len(filtered_grades)
+            uniform_distances = np.linspace(distances_for_interp[0], distances_for_interp[-1], n_uniform)
+            uniform_grades = interp1d(
+                distances_for_interp, filtered_grades, kind="linear",
+                bounds_error=False, fill_value="extrapolate",
+            )(uniform_distances)
+            fft_data = np.fft.fft(uniform_grades)
+            freqs = np.fft.fftfreq(len(uniform_grades), d=total_distance / n_uniform)
+            uniform_filtered = np.real(np.fft.ifft(fft_data * (np.abs(freqs) <= 1.0 / 40.0)))
+            filtered_grades = interp1d(
+                uniform_distances, uniform_filtered, kind="linear",
+                bounds_error=False, fill_value="extrapolate",
+            )(distances_for_interp)
+        elif cutoff_freq > 0 and cutoff_freq < 0.5:
+            b, a = butter(2, cutoff_freq, btype="low")
+            filtered_grades = filtfilt(b, a, filtered_grades)
+
+    middle_idx = len(poses) // 2
+    original_z_positions = poses[:, 2, 3]
+    filtered_z_positions = np.zeros(len(poses))
+    filtered_z_positions[middle_idx] = np.median(
+        original_z_positions[max(0, middle_idx - 2) : min(len(poses), middle_idx + 3)]
+    )
+    for i in range(middle_idx, len(filtered_grades)):
+        displacement = filtered_grades[i] * horizontal_distances[i] if horizontal_distances[i] > threshold else 0.0
+        filtered_z_positions[i + 1] = filtered_z_positions[i] + displacement
+    for i in range(middle_idx - 1, -1, -1):
+        displacement = filtered_grades[i] * horizontal_distances[i] if horizontal_distances[i] > threshold else 0.0
+        filtered_z_positions[i] = filtered_z_positions[i + 1] - displacement
+
+    filtered_poses = []
+    for i in range(len(poses)):
+        new_pose = poses[i].copy()
+        new_pose[2, 3] = filtered_z_positions[i]
+        filtered_poses.append(new_pose)
+    return np.array(filtered_poses)
+
+
+def synthetic_positions(n_tracks: int, max_poses: int, seed: int) -> List[np.ndarray]:
+    """
+    Random walks on a gently sloped road, a quarter of them parked for part of the clip.
+    """
+    rng = np.random.default_rng(seed)
+    tracks = []
+    for k in range(n_tracks):
+        n = int(rng.integers(3, max_poses + 1))
+        heading = rng.uniform(0, 2 * np.pi)
+        speed = rng.uniform(0, 15) / 10  # m per pose at 10 Hz
+        xy = np.cumsum(np.column_stack([np.cos(heading), np.sin(heading)]) * speed
+                       + rng.normal(scale=0.05, size=(n, 2)), axis=0)
+        z = 0.03 * xy[:, 0] + rng.normal(scale=0.05, size=n)
+        positions = np.column_stack([xy, z])
+        if k % 4 == 0:
+            positions[n // 3 : 2 * n // 3] = positions[n // 3]
+        tracks.append(positions)
+    return tracks
+
+
+def usdz_positions(usdz_file: str) -> List[np.ndarray]:
+    from scenario import extract_json_from_usdz
+
+    tracks_data = extract_json_from_usdz(usdz_file, ["sequence_tracks.json"])[
+        "sequence_tracks.json"
+    ]["dummy_chunk_id"]["tracks_data"]
+    return [np.asarray(poses, dtype=np.float64).reshape(-1, 7)[:, :3] for poses in tracks_data["tracks_poses"]]
+
+
+def timed(function, repeat: int) -> Tuple[float, object]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("-u", "--usdz-filename", default=None, help="USDZ file whose tracks are filtered (default: synthetic tracks)")
+    argparser.add_argument("--tracks", default=400, type=int, help="number of synthetic tracks (default: 400)")
+    argparser.add_argument("--max-poses", default=200, type=int, help="maximum poses of a synthetic track (default: 200)")
+    argparser.add_argument("--repeat", default=3, type=int, help="runs of each variant, the best one is reported (default: 3)")
+    argparser.add_argument("--seed", default=0, type=int, help="seed of the synthetic tracks (default: 0)")
+    args = argparser.parse_args()
+
+    # The filters warn about every track with fewer than 3 poses
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.usdz_filename:
+        tracks = usdz_positions(args.usdz_filename)
+    else:
+        tracks = synthetic_positions(args.tracks, args.max_poses, args.seed)
+    matrices = []
+    for positions in tracks:
+        poses = np.tile(np.eye(4), (len(positions), 1, 1))
+        poses[:, :3, 3] = positions
+        matrices.append(poses)
+    offsets = np.concatenate([[0], np.cumsum([len(positions) for positions in tracks])])
+    packed = np.concatenate(tracks) if tracks else np.empty((0, 3))
+    lengths = offsets[1:] - offsets[:-1]
+
+    reference_ms, reference = timed(lambda: [reference_filter(poses) for poses in matrices], args.repeat)
+    per_track_ms, per_track = timed(
+        lambda: [np.array(lowpass_filter_vertical_component(list(poses))) for poses in matrices], args.repeat
+    )
+    batched_ms, batched = timed(lambda: lowpass_filter_vertical_component_batched(packed, offsets), args.repeat)
+
+    reference_z = np.concatenate([poses[:, 2, 3] for poses in reference])
+    per_track_z = np.concatenate([poses[:, 2, 3] for poses in per_track])
+
+    print(f"tracks               {len(tracks):9d}")
+    print(f"poses                {len(packed):9d} (mean {lengths.mean():.0f}, max {lengths.max()} per track)")
+    print()
+    print(f"{'variant':<20} {'ms':>9} {'speedup':>9} {'max |dz| to reference':>24}")
+    print(f"{'reference':<20} {reference_ms:9.1f} {1.0:9.1f} {0.0:24.3g}")
+    print(f"{'per-track':<20} {per_track_ms:9.1f} {reference_ms / per_track_ms:9.1f} "
+          f"{np.abs(per_track_z - reference_z).max(initial=0.0):24.3g}")
+    print(f"{'batched':<20} {batched_ms:9.1f} {reference_ms / batched_ms:9.1f} "
+          f"{np.abs(batched[:, 2] - reference_z).max(initial=0.0):24.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ Key Classes:
 The module supports:
 - Conversion between pose formats (4x4 matrices, xyz+quaternion, euler angles)
 - Smooth interpolation using linear interpolation for translation and SLERP for rotation
+- Batched interpolation of many tracks at one timestamp (interpolate_many)
+- Grade-based lowpass filtering of the vertical component, per track or for all tracks
+  of a scenario at once (lowpass_filter_vertical_component_batched)
 - Coordinate system transformations
 - Path generation for CARLA waypoint following
 - Track metadata management (ego vehicle, dynamic objects, controllable actors)
@@ -31,279 +34,405 @@ import numpy as np
 import logging
 from scipy.spatial.transform import Rotation
 from scipy.signal import butter, filtfilt
-from scipy.interpolate import interp1d
 from utils import mat_to_carla_transform
-from typing import List, Union, Optional, Tuple
+from typing import List, Union, Optional, Tuple, Sequence
 import carla
 
 logger = logging.getLogger(__name__)
 
 
-def lowpass_filter_vertical_component(
-    poses: List[np.ndarray],
-    threshold: float = 0.01,
-    max_slope: float = 0.25,
-    window_size: int = 5,
-    cutoff_freq: float = 0.05,
-) -> List[np.ndarray]:
+def _horizontal_grades(
+    positions: np.ndarray, threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Filter vertical component based on grade (slope) filtering for realistic road characteristics.
-
-    Args:
-        poses: List of 4x4 transformation matrices
-        threshold: Minimum horizontal movement to calculate grade (m)
-        max_slope: Maximum allowed road grade (default 0.25 = 25%)
-        window_size: Window size for moving average filter
-        cutoff_freq: Cutoff frequency for lowpass filter (normalized, 0-1)
-
-    Returns:
-        List of filtered 4x4 transformation matrices
+    Horizontal distance, moving mask and grade (dz / horizontal distance) of each step
+    between consecutive positions. The grade is 0 for steps shorter than threshold.
     """
-    if len(poses) < 3:
-        logger.warning("Not enough poses for filtering, returning original poses")
-        return poses
+    delta = np.diff(positions, axis=0)
+    horizontal_distances = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+    moving = horizontal_distances > threshold
+    grades = np.zeros(len(delta))
+    np.divide(delta[:, 2], horizontal_distances, out=grades, where=moving)
+    return horizontal_distances, moving, grades
 
-    poses_array = np.array(poses)
-    n_poses = len(poses_array)
 
-    # Step 1: Extract positions (assume z-axis is up)
-    logger.debug(
-        f"Filtering vertical component using grade-based approach for {n_poses} poses"
-    )
-    positions = poses_array[:, :3, 3]  # Extract x, y, z positions
+def _separate_repeated_distances(distances: np.ndarray) -> np.ndarray:
+    """
+    Make non-decreasing cumulative distances strictly increasing for the interpolation.
 
-    # Step 2: Calculate horizontal distances and vertical displacements
-    horizontal_distances_list = []
-    grades_list = []
+    Each repeated distance is moved to the previous one plus an epsilon that starts
+    at 1 micrometer and grows by 1 micrometer with every fix. The fixes are a
+    sequential recurrence, so every run of them is evaluated with cumulative sums
+    (which numpy accumulates sequentially, giving the same rounding as a loop).
+    """
+    fixed = distances.copy()
+    n = len(fixed)
+    stalled = np.flatnonzero(distances[1:] <= distances[:-1]) + 1
+    epsilon = 1e-6
+    k = 0
+    while k < len(stalled):
+        i = stalled[k]
+        chunk = 64
+        while i < n:
+            length = min(chunk, n - i)
+            epsilons = np.cumsum(np.concatenate([[epsilon], np.full(length, 1e-6)]))
+            candidates = np.cumsum(np.concatenate([[fixed[i - 1]], epsilons[:length]]))
+            # Step m is fixed while distances[i + m] <= the value fixed at step m - 1
+            ends = np.flatnonzero(distances[i : i + length] > candidates[:length])
+            m = ends[0] if len(ends) else length
+            fixed[i : i + m] = candidates[1 : m + 1]
+            epsilon = epsilons[m]
+            i += m
+            if m < length:
+                break
+            chunk *= 2
+        # Past a run, fixed equals distances again until the next stalled index
+        k = np.searchsorted(stalled, i + 1)
+    return fixed
 
-    for i in range(n_poses - 1):
-        dx = positions[i + 1, 0] - positions[i, 0]
-        dy = positions[i + 1, 1] - positions[i, 1]
-        dz = positions[i + 1, 2] - positions[i, 2]
 
-        # Calculate horizontal distance moved
-        horizontal_distance = np.sqrt(dx**2 + dy**2)
-        horizontal_distances_list.append(horizontal_distance)
+def _interp_linear(x: np.ndarray, y: np.ndarray, x_new: np.ndarray) -> np.ndarray:
+    """
+    Linear interpolation with linear extrapolation, computing the same values as
+    interp1d(x, y, kind="linear", fill_value="extrapolate") for increasing x without
+    building the interpolator.
+    """
+    hi = np.searchsorted(x, x_new)
+    hi = np.minimum(np.maximum(hi, 1), len(x) - 1)
+    lo = hi - 1
+    slope = (y[hi] - y[lo]) / (x[hi] - x[lo])
+    return slope * (x_new - x[lo]) + y[lo]
+
+
+def _smooth_grades(
+    grades: np.ndarray,
+    horizontal_distances: np.ndarray,
+    window_size: int,
+    cutoff_freq: float,
+) -> np.ndarray:
+    """
+    Moving average followed by a spatial lowpass filter of the capped grades of one track.
+    """
+    filtered_grades = grades.copy()
+    if len(grades) <= 10:
+        return filtered_grades
+
+    # Calculate cumulative distance for each pose
+    cumulative_distances = np.cumsum(np.concatenate([[0], horizontal_distances]))
+
+    # Apply moving average filter first for basic smoothing
+    if window_size > 1:
+        kernel = np.ones(window_size) / window_size
+        filtered_grades = np.convolve(grades, kernel, mode="same")
+
+    # Apply spatial frequency filtering using interpolation and uniform FFT
+    if len(filtered_grades) > 20:  # Need enough points for meaningful frequency analysis
+        try:
+            distances_for_interp = cumulative_distances[1:]  # Skip first zero
+            # Repeated distances (vehicle stationary between poses) would break the interpolation
+            distances_for_interp = _separate_repeated_distances(distances_for_interp)
+
+            # Create uniform distance sampling for FFT
+            total_distance = distances_for_interp[-1] - distances_for_interp[0]
+            n_uniform = len(filtered_grades)
+            uniform_distances = np.linspace(
+                distances_for_interp[0], distances_for_interp[-1], n_uniform
+            )
 
-        # Calculate grade (slope)
-        if horizontal_distance > threshold:
-            grade = dz / horizontal_distance
-        else:
-            grade = 0.0  # No grade when not moving horizontally
+            # Interpolate grades to uniform spacing
+            uniform_grades = _interp_linear(distances_for_interp, filtered_grades, uniform_distances)
 
-        grades_list.append(grade)
+            # Apply FFT-based lowpass filter
+            fft_data = np.fft.fft(uniform_grades)
+            freqs = np.fft.fftfreq(len(uniform_grades), d=total_distance / n_uniform)
 
-    horizontal_distances = np.array(horizontal_distances_list)
-    grades = np.array(grades_list)
+            # Preserve grade changes over distances longer than 40m
+            spatial_cutoff_freq = 1.0 / 40.0  # 0.025 cycles per meter (40m wavelength)
 
-    logger.debug(
-        f"Original grade statistics: mean={np.mean(grades):.4f}, std={np.std(grades):.4f}, max={np.max(np.abs(grades)):.4f}"
-    )
+            # Lowpass filter and transform back to the spatial domain
+            fft_filtered = fft_data * (np.abs(freqs) <= spatial_cutoff_freq)
+            uniform_filtered = np.real(np.fft.ifft(fft_filtered))
 
-    # Step 3: Apply grade constraints (cap unrealistic grades)
-    constrained_grades = np.copy(grades)
+            # Interpolate back to original non-uniform spacing
+            filtered_grades = _interp_linear(uniform_distances, uniform_filtered, distances_for_interp)
 
-    for i in range(len(grades)):
-        if abs(constrained_grades[i]) > max_slope:
-            # Cap the grade to maximum allowed, preserving sign
-            constrained_grades[i] = np.sign(constrained_grades[i]) * max_slope
-            logger.debug(
-                f"Capped grade at index {i}: {grades[i]:.4f} -> {constrained_grades[i]:.4f}"
+        except Exception as e:
+            logger.warning(
+                f"Failed to apply spatial frequency filter to grades: {e}, using moving average only"
             )
 
-    # Step 4: Apply spatial frequency filtering to grades
-    filtered_grades = constrained_grades.copy()
-
-    if len(constrained_grades) > 10:
-        # Calculate cumulative distance for each pose
-        cumulative_distances = np.cumsum(np.concatenate([[0], horizontal_distances]))
-
-        # Apply moving average filter first for basic smoothing
-        if window_size > 1:
-            kernel = np.ones(window_size) / window_size
-            filtered_grades = np.convolve(constrained_grades, kernel, mode="same")
-            logger.debug(
-                f"Applied moving average filter to grades with window size {window_size}"
-            )
+    # Additional Butterworth filter as backup/supplement if specified
+    elif cutoff_freq > 0 and cutoff_freq < 0.5 and len(filtered_grades) > 10:
+        try:
+            b, a = butter(2, cutoff_freq, btype="low")
+            filtered_grades = filtfilt(b, a, filtered_grades)
+        except Exception as e:
+            logger.warning(f"Failed to apply Butterworth filter to grades: {e}")
 
-        # Apply spatial frequency filtering using interpolation and uniform FFT
-        if (
-            len(filtered_grades) > 20
-        ):  # Need enough points for meaningful frequency analysis
-            try:
-                # Check for repeated values in cumulative_distances that would break interp1d
-                distances_for_interp = cumulative_distances[1:]  # Skip first zero
-                unique_distances, unique_indices = np.unique(
-                    distances_for_interp, return_index=True
-                )
+    return filtered_grades
 
-                if len(unique_distances) < len(distances_for_interp):
-                    # We have repeated distances (vehicle stationary between poses)
-                    num_duplicates = len(distances_for_interp) - len(unique_distances)
-                    logger.debug(
-                        f"Found {num_duplicates} repeated cumulative distances, adding epsilon values"
-                    )
-
-                    # Add small incremental epsilon to make distances unique
-                    epsilon = 1e-6  # 1 micrometer
-                    fixed_distances = distances_for_interp.copy()
-
-                    for i in range(1, len(fixed_distances)):
-                        if fixed_distances[i] <= fixed_distances[i - 1]:
-                            fixed_distances[i] = fixed_distances[i - 1] + epsilon
-                            epsilon += 1e-6  # Increment epsilon for each fix
-
-                    distances_for_interp = fixed_distances
-
-                # Create uniform distance sampling for FFT
-                total_distance = distances_for_interp[-1] - distances_for_interp[0]
-                n_uniform = len(filtered_grades)
-                uniform_distances = np.linspace(
-                    distances_for_interp[0], distances_for_interp[-1], n_uniform
-                )
 
-                # Interpolate grades to uniform spacing
-                interp_func = interp1d(
-                    distances_for_interp,
-                    filtered_grades,
-                    kind="linear",
-                    bounds_error=False,
-                    fill_value="extrapolate",
-                )
-                uniform_grades = interp_func(uniform_distances)
+def _integrate_vertical_positions(
+    z_positions: np.ndarray,
+    horizontal_distances: np.ndarray,
+    moving: np.ndarray,
+    filtered_grades: np.ndarray,
+) -> np.ndarray:
+    """
+    Rebuild the z positions of one track from its filtered grades, anchored at the
+    median z of the 5 poses around the middle of the track.
+    """
+    n_poses = len(z_positions)
+    middle_idx = n_poses // 2
+    middle_z = np.sort(z_positions[max(0, middle_idx - 2) : min(n_poses, middle_idx + 3)])
+    if len(middle_z) % 2:
+        local_median_z = middle_z[len(middle_z) // 2]
+    else:
+        local_median_z = np.median(middle_z)
+
+    displacements = np.where(moving, filtered_grades * horizontal_distances, 0.0)
+
+    # Integrate forward from the middle to the end and backward from the middle to the
+    # start. Cumulative sums starting at the median add in the same order as a loop would.
+    filtered_z_positions = np.empty(n_poses)
+    filtered_z_positions[middle_idx:] = np.cumsum(
+        np.concatenate([[local_median_z], displacements[middle_idx:]])
+    )
+    filtered_z_positions[:middle_idx + 1] = np.cumsum(
+        np.concatenate([[local_median_z], -displacements[:middle_idx][::-1]])
+    )[::-1]
+    return filtered_z_positions
+
+
+def _filter_vertical_positions(
+    positions: np.ndarray,
+    horizontal_distances: np.ndarray,
+    moving: np.ndarray,
+    grades: np.ndarray,
+    max_slope: float,
+    window_size: int,
+    cutoff_freq: float,
+) -> np.ndarray:
+    """
+    Filtered z positions of one track, from its precomputed step geometry.
+    """
+    constrained_grades = np.minimum(np.maximum(grades, -max_slope), max_slope)
+    filtered_grades = _smooth_grades(
+        constrained_grades, horizontal_distances, window_size, cutoff_freq
+    )
+    filtered_z = _integrate_vertical_positions(
+        positions[:, 2], horizontal_distances, moving, filtered_grades
+    )
 
-                # Apply FFT-based lowpass filter
-                fft_data = np.fft.fft(uniform_grades)
-                freqs = np.fft.fftfreq(
-                    len(uniform_grades), d=total_distance / n_uniform
-                )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Vertical filtering of {len(positions)} poses: "
+            f"capped {np.sum(np.abs(grades) > max_slope)} grades, "
+            f"max grade correction {np.max(np.abs(filtered_grades - grades)):.4f}, "
+            f"z std {np.std(positions[:, 2]):.4f}m -> {np.std(filtered_z):.4f}m"
+        )
+    return filtered_z
 
-                # Define spatial frequency cutoff for grade changes
-                # Preserve grade changes over distances longer than 40m
-                spatial_cutoff_freq = (
-                    1.0 / 40.0
-                )  # 0.025 cycles per meter (40m wavelength)
-
-                # Create lowpass filter mask
-                filter_mask = np.abs(freqs) <= spatial_cutoff_freq
-                fft_filtered = fft_data * filter_mask
-
-                # Transform back to spatial domain
-                uniform_filtered = np.real(np.fft.ifft(fft_filtered))
-
-                # Interpolate back to original non-uniform spacing
-                interp_back = interp1d(
-                    uniform_distances,
-                    uniform_filtered,
-                    kind="linear",
-                    bounds_error=False,
-                    fill_value="extrapolate",
-                )
-                filtered_grades = interp_back(distances_for_interp)
 
-                logger.debug(
-                    f"Applied spatial frequency filter to grades with cutoff {spatial_cutoff_freq:.4f} cycles/m (wavelength ≥ {1/spatial_cutoff_freq:.1f}m)"
-                )
+def lowpass_filter_vertical_component(
+    poses: List[np.ndarray],
+    threshold: float = 0.01,
+    max_slope: float = 0.25,
+    window_size: int = 5,
+    cutoff_freq: float = 0.05,
+) -> List[np.ndarray]:
+    """
+    Filter vertical component based on grade (slope) filtering for realistic road characteristics.
 
-            except Exception as e:
-                logger.warning(
-                    f"Failed to apply spatial frequency filter to grades: {e}, using moving average only"
-                )
+    Args:
+        poses: List of 4x4 transformation matrices
+        threshold: Minimum horizontal movement to calculate grade (m)
+        max_slope: Maximum allowed road grade (default 0.25 = 25%)
+        window_size: Window size for moving average filter
+        cutoff_freq: Cutoff frequency for lowpass filter (normalized, 0-1)
 
-        # Additional Butterworth filter as backup/supplement if specified
-        elif cutoff_freq > 0 and cutoff_freq < 0.5 and len(filtered_grades) > 10:
-            try:
-                b, a = butter(2, cutoff_freq, btype="low")
-                filtered_grades = filtfilt(b, a, filtered_grades)
-                logger.debug(
-                    f"Applied additional Butterworth lowpass filter to grades with cutoff {cutoff_freq}"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to apply Butterworth filter to grades: {e}")
+    Returns:
+        List of filtered 4x4 transformation matrices
+    """
+    if len(poses) < 3:
+        logger.warning("Not enough poses for filtering, returning original poses")
+        return poses
 
-    logger.debug(
-        f"Filtered grade statistics: mean={np.mean(filtered_grades):.4f}, std={np.std(filtered_grades):.4f}, max={np.max(np.abs(filtered_grades)):.4f}"
+    filtered_poses = np.array(poses, dtype=np.float64)
+    positions = filtered_poses[:, :3, 3]
+    filtered_poses[:, 2, 3] = _filter_vertical_positions(
+        positions,
+        *_horizontal_grades(positions, threshold),
+        max_slope,
+        window_size,
+        cutoff_freq,
     )
+    return list(filtered_poses)
 
-    # Step 5: Reconstruct vertical positions from filtered grades
-    logger.debug(
-        "Reconstructing poses from filtered grades using local median z-position"
-    )
 
-    filtered_poses = []
+def lowpass_filter_vertical_component_batched(
+    positions: np.ndarray,
+    offsets: np.ndarray,
+    threshold: float = 0.01,
+    max_slope: float = 0.25,
+    window_size: int = 5,
+    cutoff_freq: float = 0.05,
+) -> np.ndarray:
+    """
+    Apply lowpass_filter_vertical_component to all tracks of a scenario at once.
 
-    # Find middle pose index
-    middle_idx = len(poses_array) // 2
+    The tracks are given as a ragged array: track i owns rows offsets[i]:offsets[i + 1]
+    of positions. Step distances and grades of all tracks are computed in one pass,
+    only the smoothing and the integration run per track. The result of each track
+    is identical to lowpass_filter_vertical_component, tracks with fewer than 3 poses
+    are returned unchanged.
 
-    # Calculate median z-position from middle 5 values of the sequence
-    original_z_positions = poses_array[:, 2, 3]
-    start_idx = max(0, middle_idx - 2)
-    end_idx = min(len(original_z_positions), middle_idx + 3)
-    middle_z_values = original_z_positions[start_idx:end_idx]
-    local_median_z = np.median(middle_z_values)
+    Args:
+        positions: (N, 3) x, y, z positions of all tracks
+        offsets: (n_tracks + 1,) start row of each track
+        threshold: Minimum horizontal movement to calculate grade (m)
+        max_slope: Maximum allowed road grade (default 0.25 = 25%)
+        window_size: Window size for moving average filter
+        cutoff_freq: Cutoff frequency for lowpass filter (normalized, 0-1)
 
-    logger.debug(
-        f"Using local median z-position: {local_median_z:.4f}m from middle 5 values at pose index: {middle_idx}"
-    )
+    Returns:
+        (N, 3) array of positions with filtered z
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    filtered = positions.copy()
+    if len(positions) < 2:
+        return filtered
+
+    # Step i is positions[i] -> positions[i + 1], the steps across track boundaries are never read
+    horizontal_distances, moving, grades = _horizontal_grades(positions, threshold)
+
+    skipped = 0
+    for begin, end in zip(offsets[:-1], offsets[1:]):
+        if end - begin < 3:
+            skipped += end > begin
+            continue
+        filtered[begin:end, 2] = _filter_vertical_positions(
+            positions[begin:end],
+            horizontal_distances[begin : end - 1],
+            moving[begin : end - 1],
+            grades[begin : end - 1],
+            max_slope,
+            window_size,
+            cutoff_freq,
+        )
+    if skipped:
+        logger.debug(f"Not enough poses for filtering {skipped} tracks, kept their original poses")
+    return filtered
 
-    # Create array to store all filtered z-positions
-    filtered_z_positions = np.zeros(len(poses_array))
-    filtered_z_positions[middle_idx] = local_median_z
 
-    # Integrate grades forward from middle to end
-    for i in range(middle_idx, len(filtered_grades)):
-        horizontal_dist = horizontal_distances[i]
-        if horizontal_dist > threshold:
-            vertical_displacement = filtered_grades[i] * horizontal_dist
-        else:
-            vertical_displacement = 0.0
+class PoseType(Enum):
+    """
+    Enum defining the supported pose representation formats.
 
-        filtered_z_positions[i + 1] = filtered_z_positions[i] + vertical_displacement
+    TRANSFORM_MATRIX: 4x4 transformation matrix
+    XYZ_QUAT: 7-element array [x, y, z, qx, qy, qz, qw] with position and quaternion
+    """
 
-    # Integrate grades backward from middle to start
-    for i in range(middle_idx - 1, -1, -1):
-        horizontal_dist = horizontal_distances[i]
-        if horizontal_dist > threshold:
-            vertical_displacement = filtered_grades[i] * horizontal_dist
-        else:
-            vertical_displacement = 0.0
+    TRANSFORM_MATRIX = "transform_matrix"
+    XYZ_QUAT = "xyz_quat"
 
-        # Going backward, so subtract the displacement
-        filtered_z_positions[i] = filtered_z_positions[i + 1] - vertical_displacement
 
-    # Create filtered poses with new z-positions
-    for i in range(len(poses_array)):
-        new_pose = poses_array[i].copy()
-        new_pose[2, 3] = filtered_z_positions[i]
-        filtered_poses.append(new_pose)
+def slerp_quaternions(q0: np.ndarray, q1: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    Spherical linear interpolation between two batches of quaternions.
 
-    # Step 6: Prepare data for plotting and calculate statistics
-    original_positions = poses_array[:, :3, 3]
-    filtered_positions = np.array([pose[:3, 3] for pose in filtered_poses])
+    Args:
+        q0: (M, 4) start quaternions [qx, qy, qz, qw]
+        q1: (M, 4) end quaternions [qx, qy, qz, qw]
+        t: (M,) interpolation factors between 0 and 1
 
-    original_z_std = np.std(original_positions[:, 2])
-    filtered_z_std = np.std(filtered_positions[:, 2])
-    max_grade_correction = np.max(np.abs(filtered_grades - grades))
+    Returns:
+        (M, 4) array of unit quaternions
+    """
+    dot = np.einsum("ij,ij->i", q0, q1)
+    # Interpolate along the shortest arc, q and -q are the same rotation
+    q1 = np.where(dot[:, None] < 0.0, -q1, q1)
+    theta = np.arccos(np.clip(np.abs(dot), 0.0, 1.0))
+    sin_theta = np.sin(theta)
+    small = sin_theta < 1e-9
+    sin_theta[small] = 1.0
+    w0 = np.where(small, 1.0 - t, np.sin((1.0 - t) * theta) / sin_theta)
+    w1 = np.where(small, t, np.sin(t * theta) / sin_theta)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def quaternions_to_matrices(quats: np.ndarray) -> np.ndarray:
+    """
+    Convert a batch of unit quaternions to rotation matrices.
 
-    # Log statistics
-    logger.debug(f"Original Z-position std: {original_z_std:.4f}m")
-    logger.debug(f"Filtered Z-position std: {filtered_z_std:.4f}m")
-    logger.debug(f"Maximum grade correction: {max_grade_correction:.4f}")
-    logger.debug(f"Poses with capped grades: {np.sum(np.abs(grades) > max_slope)}")
+    Args:
+        quats: (M, 4) quaternions [qx, qy, qz, qw]
 
-    return filtered_poses
+    Returns:
+        (M, 3, 3) array of rotation matrices
+    """
+    x, y, z, w = quats[:, 0], quats[:, 1], quats[:, 2], quats[:, 3]
+    result = np.empty((len(quats), 3, 3))
+    result[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    result[:, 0, 1] = 2.0 * (x * y - z * w)
+    result[:, 0, 2] = 2.0 * (x * z + y * w)
+    result[:, 1, 0] = 2.0 * (x * y + z * w)
+    result[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    result[:, 1, 2] = 2.0 * (y * z - x * w)
+    result[:, 2, 0] = 2.0 * (x * z - y * w)
+    result[:, 2, 1] = 2.0 * (y * z + x * w)
+    result[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    return result
+
+
+def interpolate_many(
+    tracks: Sequence["InterpolatedPoses"], timestamp: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolate the poses of several tracks at the same timestamp in one vectorized pass.
 
+    Equivalent to calling interpolate_pose_matrix on every track, but the SLERP and the
+    matrix products are done once for the whole batch.
 
-class PoseType(Enum):
-    """
-    Enum defining the supported pose representation formats.
+    Args:
+        tracks: Tracks (or any InterpolatedPoses) to interpolate
+        timestamp: The timestamp to interpolate for
 
-    TRANSFORM_MATRIX: 4x4 transformation matrix
-    XYZ_QUAT: 7-element array [x, y, z, qx, qy, qz, qw] with position and quaternion
+    Returns:
+        tuple: (poses, valid) where poses is an (M, 4, 4) array of transformation matrices
+               and valid an (M,) boolean mask. Rows of tracks that have no pose at the
+               timestamp are NaN and False in valid.
     """
-
-    TRANSFORM_MATRIX = "transform_matrix"
-    XYZ_QUAT = "xyz_quat"
+    n = len(tracks)
+    q0 = np.zeros((n, 4))
+    q1 = np.zeros((n, 4))
+    q0[:, 3] = q1[:, 3] = 1.0
+    p0 = np.zeros((n, 3))
+    p1 = np.zeros((n, 3))
+    t = np.zeros(n)
+    transforms = np.empty((n, 4, 4))
+    valid = np.zeros(n, dtype=bool)
+
+    for k, track in enumerate(tracks):
+        transforms[k] = track.transform
+        bracket = track._bracket(timestamp)
+        if bracket is None:
+            continue
+        i, j, t[k] = bracket
+        q0[k] = track.quaternions[i]
+        q1[k] = track.quaternions[j]
+        p0[k] = track.translations[i]
+        p1[k] = track.translations[j]
+        valid[k] = True
+
+    result = np.zeros((n, 4, 4))
+    result[:, :3, :3] = quaternions_to_matrices(slerp_quaternions(q0, q1, t))
+    result[:, :3, 3] = p0 + t[:, None] * (p1 - p0)
+    result[:, 3, 3] = 1.0
+    result = transforms @ result
+    result[~valid] = np.nan
+    return result, valid
 
 
 class InterpolatedPoses:
@@ -330,10 +459,18 @@ class InterpolatedPoses:
             filter_vertical_poses: If True, filter out poses where the z-axis is vertical
         """
         # Convert all poses to 4x4 matrices regardless of input format
-        self.poses: List[np.ndarray] = []
+        self.poses: np.ndarray = np.empty((0, 4, 4))
         self._convert_poses_to_mats(poses, pose_type, filter_vertical_poses)
 
+        # Per-pose translations and quaternions, so interpolation never rebuilds Rotation objects
+        self.translations = self.poses[:, :3, 3].copy()
+        if len(self.poses):
+            self.quaternions = Rotation.from_matrix(self.poses[:, :3, :3]).as_quat()
+        else:
+            self.quaternions = np.empty((0, 4))
+
         self.timestamps = timestamps
+        self._times = np.asarray(timestamps, dtype=np.float64)
         self.ignore_out_of_bounds = False
         self.transform = np.eye(4)
 
@@ -344,7 +481,7 @@ class InterpolatedPoses:
         filter_vertical_poses: bool = False,
     ) -> None:
         """
-        Convert input poses to 4x4 transformation matrices.
+        Convert input poses to an (N, 4, 4) array of transformation matrices.
 
         Args:
             poses: List of poses in the specified format
@@ -353,38 +490,34 @@ class InterpolatedPoses:
         Raises:
             ValueError: If poses have invalid format or unsupported pose type
         """
-        for pose in poses:
-            if pose_type == PoseType.TRANSFORM_MATRIX:
-                # If already a matrix, ensure it's a proper 4x4
-                matrix = np.array(pose)
-                if matrix.shape != (4, 4):
-                    raise ValueError(
-                        f"Expected 4x4 matrix but got shape {matrix.shape}"
-                    )
-                self.poses.append(matrix)
-            elif pose_type == PoseType.XYZ_QUAT:
-                # Convert from [x, y, z, qx, qy, qz, qw] to 4x4 matrix
-                pose_array = np.array(pose)
-
-                # Extract translation and quaternion
-                translation = pose_array[:3]
-                quaternion = pose_array[3:7]  # [qx, qy, qz, qw]
-
-                # Create rotation matrix from quaternion
-                rot_matrix = Rotation.from_quat(quaternion).as_matrix()
-
-                # Build 4x4 transformation matrix
-                transform = np.eye(4)
-                transform[:3, :3] = rot_matrix
-                transform[:3, 3] = translation
-
-                self.poses.append(transform)
-            else:
-                raise ValueError(f"Unsupported pose type: {pose_type}")
+        if pose_type not in (PoseType.TRANSFORM_MATRIX, PoseType.XYZ_QUAT):
+            raise ValueError(f"Unsupported pose type: {pose_type}")
+        if len(poses) == 0:
+            self.poses = np.empty((0, 4, 4))
+            return
+
+        pose_array = np.array(poses, dtype=np.float64)
+        if pose_type == PoseType.TRANSFORM_MATRIX:
+            # If already matrices, ensure they are proper 4x4
+            if pose_array.shape[1:] != (4, 4):
+                raise ValueError(
+                    f"Expected 4x4 matrices but got shape {pose_array.shape[1:]}"
+                )
+            self.poses = pose_array
+        else:
+            # Convert from [x, y, z, qx, qy, qz, qw] rows to 4x4 matrices
+            if pose_array.ndim != 2 or pose_array.shape[1] < 7:
+                raise ValueError(
+                    f"Expected [x, y, z, qx, qy, qz, qw] poses but got shape {pose_array.shape}"
+                )
+            self.poses = np.zeros((len(pose_array), 4, 4))
+            self.poses[:, :3, :3] = Rotation.from_quat(pose_array[:, 3:7]).as_matrix()
+            self.poses[:, :3, 3] = pose_array[:, :3]
+            self.poses[:, 3, 3] = 1.0
 
         # Apply vertical filtering after all poses are converted
         if filter_vertical_poses:
-            self.poses = lowpass_filter_vertical_component(self.poses)
+            self.poses = np.array(lowpass_filter_vertical_component(self.poses))
 
     def set_ignore_out_of_bounds(self, ignore_out_of_bounds: bool) -> None:
         """
@@ -404,54 +537,39 @@ class InterpolatedPoses:
         """
         self.transform = transform
 
-    def _get_interpolation_params(
-        self, timestamp: float
-    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], float]:
+    def _bracket(self, timestamp: float) -> Optional[Tuple[int, int, float]]:
         """
-        Common function to determine interpolation parameters.
+        Find the poses surrounding a timestamp with a binary search.
 
         Args:
             timestamp (float): The timestamp to interpolate for
 
         Returns:
-            tuple: (prev_pose, next_pose, t_factor) where t_factor is interpolation factor
-                  Returns (None, None, None) if timestamp is outside the track's time range.
+            tuple: (prev_idx, next_idx, t_factor) where t_factor is the interpolation factor
+                   between the two poses. Returns None if the timestamp is outside the
+                   track's time range.
         """
-        # Check if the timestamp is within the track's time range
-        if self.ignore_out_of_bounds and timestamp > self.timestamps[-1]:
-            return self.poses[-2], self.poses[-1], 1.0
-        elif timestamp < self.timestamps[0] or timestamp > self.timestamps[-1]:
-            logger.error(
-                f"Timestamp {timestamp} is outside the track's time range {self.timestamps[0]} - {self.timestamps[-1]}"
-            )
-            return None, None, 0.0
-
-        # Find the index of the previous timestamp
-        prev_timestamp_idx = 0
-        for i in range(len(self.timestamps)):
-            if self.timestamps[i] > timestamp:
-                break
-            prev_timestamp_idx = i
-
-        next_timestamp_idx = prev_timestamp_idx + 1
+        times = self._times
+        last = len(times) - 1
+        if last < 0:
+            return None
 
-        # If at last timestamp, return the last pose
-        if next_timestamp_idx >= len(self.timestamps):
-            logger.warning(
-                f"Timestamp {timestamp} is outside the track's time range {self.timestamps[0]} - {self.timestamps[-1]}"
+        # Beyond the end hold the last pose
+        if self.ignore_out_of_bounds and timestamp > times[last]:
+            return last, last, 0.0
+        if timestamp < times[0] or timestamp > times[last]:
+            logger.error(
+                f"Timestamp {timestamp} is outside the track's time range {times[0]} - {times[last]}"
             )
-            return self.poses[prev_timestamp_idx], None, 0.0
-
-        # Calculate interpolation factor (t) between 0 and 1
-        t = (timestamp - self.timestamps[prev_timestamp_idx]) / (
-            self.timestamps[next_timestamp_idx] - self.timestamps[prev_timestamp_idx]
-        )
+            return None
 
-        # Get the poses to interpolate between
-        start_pose = self.poses[prev_timestamp_idx]
-        end_pose = self.poses[next_timestamp_idx]
+        prev_idx = int(np.searchsorted(times, timestamp, side="right")) - 1
+        if prev_idx >= last:
+            return last, last, 0.0
 
-        return start_pose, end_pose, t
+        next_idx = prev_idx + 1
+        t = (timestamp - times[prev_idx]) / (times[next_idx] - times[prev_idx])
+        return prev_idx, next_idx, float(t)
 
     def interpolate_pose_matrix(self, timestamp: float) -> Optional[np.ndarray]:
         """
@@ -463,47 +581,28 @@ class InterpolatedPoses:
         Returns:
             4x4 numpy array transformation matrix, or None if timestamp is out of range
         """
-        # Get interpolation parameters
-        start_pose, end_pose, t = self._get_interpolation_params(timestamp)
+        bracket = self._bracket(timestamp)
 
-        if start_pose is None:
+        if bracket is None:
             logger.warning(
                 f"Start pose is None for timestamp {timestamp}, likly out of bounds"
             )
             return None
 
-        if end_pose is None:
-            return start_pose
-
-        # Extract rotation matrices and translations
-        start_rotation_matrix = start_pose[:3, :3]
-        start_translation = start_pose[:3, 3]
-
-        end_rotation_matrix = end_pose[:3, :3]
-        end_translation = end_pose[:3, 3]
+        i, j, t = bracket
 
-        # Linear interpolation of translation
+        # Linear interpolation of translation, SLERP of rotation
+        start_translation = self.translations[i]
         interp_translation = start_translation + t * (
-            end_translation - start_translation
+            self.translations[j] - start_translation
+        )
+        interp_quat = slerp_quaternions(
+            self.quaternions[i : i + 1], self.quaternions[j : j + 1], np.array([t])
         )
-
-        # Convert matrices to Rotation objects
-        start_rotation = Rotation.from_matrix(start_rotation_matrix)
-        end_rotation = Rotation.from_matrix(end_rotation_matrix)
-
-        # Create a Slerp object
-        # key_rotations = Rotation.concatenate([start_rotation, end_rotation])
-        # key_times = np.array([0, 1])
-        # slerp = Slerp(key_times, key_rotations)
-        rotvec = (start_rotation.inv() * end_rotation).as_rotvec()
-        slerp_result = start_rotation * Rotation.from_rotvec(rotvec * t)
-
-        # Interpolate rotation
-        interp_rotation_matrix = slerp_result.as_matrix()
 
         # Create the interpolated transformation matrix
         result = np.eye(4)
-        result[:3, :3] = interp_rotation_matrix
+        result[:3, :3] = quaternions_to_matrices(interp_quat)[0]
         result[:3, 3] = interp_translation
 
         result = self.transform @ result
@@ -13,6 +13,7 @@ Key Functions:
 - undo_carla_coordinate_transform: Handle coordinate system differences between CARLA and NUREC
 - actor_to_grpc_pose: Convert CARLA actor poses to gRPC format with blueprint offsets
 - mat_to_carla_transform: Convert 4x4 matrices to CARLA Transform objects
+- mats_to_carla_transforms: Convert a batch of 4x4 matrices to CARLA Transform objects at once
 - xyzquat_to_carla_transform: Convert xyz+quaternion to CARLA Transform
 - xyzeuler_to_carla_transform: Convert xyz+euler angles to CARLA Transform
 - handle_exception: Handle timeout exceptions and write stack traces to temp files
@@ -28,7 +29,7 @@ from nre.grpc.protos import common_pb2 as grpc_types
 import carla
 from scipy.spatial.transform import Rotation as R
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from blueprint_library import BlueprintLibrary
 import tempfile
 import traceback
@@ -172,6 +173,30 @@ def mat_to_carla_transform(mat: np.ndarray) -> carla.Transform:
     )
 
 
+def mats_to_carla_transforms(mats: np.ndarray) -> List[carla.Transform]:
+    """
+    Convert an (N, 4, 4) array of matrices to CARLA transforms, like mat_to_carla_transform
+    but with a single rotation conversion for all of them.
+    """
+    mats = np.asarray(mats, dtype=np.float64).reshape(-1, 4, 4)
+    if len(mats) == 0:
+        return []
+    euler_angles = R.from_matrix(mats[:, :3, :3]).as_euler("zyx", degrees=False)
+    pitch = (-euler_angles[:, 2] * 180 / np.pi).tolist()
+    yaw = (-euler_angles[:, 0] * 180 / np.pi).tolist()
+    roll = (-euler_angles[:, 1] * 180 / np.pi).tolist()
+    x = mats[:, 0, 3].tolist()
+    y = (-mats[:, 1, 3]).tolist()
+    z = mats[:, 2, 3].tolist()
+    return [
+        carla.Transform(
+            carla.Location(x=x[i], y=y[i], z=z[i]),
+            carla.Rotation(pitch=pitch[i], yaw=yaw[i], roll=roll[i]),
+        )
+        for i in range(len(mats))
+    ]
+
+
 def mat_to_carla_transform2(mat: np.ndarray) -> carla.Transform:
     euler_angles = R.from_matrix(mat[:3, :3]).as_euler("xyz", degrees=False)
     return carla.Transform(